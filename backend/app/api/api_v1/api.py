@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import tasks, projects, users, ai, photos, admin
+from app.api.api_v1.endpoints import tasks, projects, users, ai, photos, admin, files
 
 api_router = APIRouter()
 
@@ -9,3 +9,4 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
 api_router.include_router(photos.router, prefix="/photos", tags=["photos"])
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+api_router.include_router(files.router, prefix="/files", tags=["files"])
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import timedelta
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
+from app.core.responses import ORJSONResponse
 from app.services.auth import get_current_user
 from app.models.user import User, UserRole
 from app.models.approval import ApprovalRequest, ApprovalStatus
 from app.crud.user import user_crud
 from app.crud.approval import approval_crud
 from app.schemas.user import UserCreate, UserResponse
-from app.schemas.approval import ApprovalResponse, ApprovalReview
+from app.schemas.approval import ApprovalResponse, ApprovalReview, ApprovalBatchReview
+from app.services.notifications import notification_service
+from app.services.archive import task_archiver
 
 router = APIRouter()
 
@@ -21,7 +25,7 @@ def get_admin_users(
     if current_user.role != UserRole.CREATOR:
         raise HTTPException(status_code=403, detail="Доступ запрещен")
     
-    return user_crud.get_all(db)
+    return ORJSONResponse(user_crud.get_all_rows(db))
 
 @router.post("/users", response_model=UserResponse)
 def add_user(
@@ -86,7 +90,50 @@ def review_approval(
     if approval.approver_id != current_user.id:
         raise HTTPException(status_code=403, detail="Нет прав для одобрения этого запроса")
     
-    return approval_crud.review(db, approval_id, review_data.status, review_data.comment)
+    try:
+        reviewed = approval_crud.review(db, approval_id, current_user.id, review_data.status, review_data.comment)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if reviewed is None:
+        raise HTTPException(status_code=409, detail="Запрос уже рассмотрен")
+    return reviewed
+
+@router.post("/approvals/review-batch", response_model=List[ApprovalResponse])
+def review_approvals_batch(
+    batch: ApprovalBatchReview,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Пакетное одобрение/отклонение запросов одной транзакцией (только для создателя).
+
+    Применяются либо все решения, либо ни одно.
+    """
+    if current_user.role != UserRole.CREATOR:
+        raise HTTPException(status_code=403, detail="Доступ запрещен")
+    
+    ids = [decision.id for decision in batch.decisions]
+    approvals = approval_crud.lock_pending(db, ids, current_user.id)
+    if len(approvals) != len(ids):
+        db.rollback()
+        found = {approval.id: approval for approval in approval_crud.get_many(db, ids)}
+        missing = [i for i in ids if i not in found]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Запросы не найдены: {missing}")
+        foreign = [i for i in ids if found[i].approver_id != current_user.id]
+        if foreign:
+            raise HTTPException(status_code=403, detail=f"Нет прав для одобрения запросов: {foreign}")
+        reviewed = [i for i in ids if found[i].status != ApprovalStatus.PENDING]
+        raise HTTPException(status_code=409, detail=f"Запросы уже рассмотрены: {reviewed}")
+    
+    try:
+        reviewed = approval_crud.review_batch(db, approvals, batch.decisions)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    # Уведомления авторам - после ответа, все сразу
+    background_tasks.add_task(notification_service.notify_approval_results, reviewed)
+    return reviewed
 
 @router.patch("/users/{user_id}/status")
 def toggle_user_status(
@@ -169,3 +216,15 @@ def get_admin_stats(
         "foremen_count": user_crud.count_by_role(db, UserRole.FOREMAN),
         "workers_count": user_crud.count_by_role(db, UserRole.WORKER)
     }
+
+@router.post("/archive/run")
+def run_archive(
+    older_than_days: Optional[int] = Query(None, ge=0, description="По умолчанию - ARCHIVE_AFTER_DAYS"),
+    current_user: User = Depends(get_current_user)
+):
+    """Внеочередная архивация завершенных задач (только для создателя)"""
+    if current_user.role != UserRole.CREATOR:
+        raise HTTPException(status_code=403, detail="Доступ запрещен")
+    
+    age = timedelta(days=older_than_days) if older_than_days is not None else None
+    return {"archived": task_archiver.run_once(age)}
@@ -1,130 +1,136 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response
+from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session
-from typing import Dict, Any
-import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import json
 import os
+import uuid
+from app.core.config import settings
 from app.core.database import get_db
 from app.services.auth import get_current_user
+from app.services.ai_jobs import ai_job_queue, hash_audio, hash_text
 from app.models.user import User
-from app.services.ai import generate_task_from_audio, analyze_task_request
+from app.models.ai_job import AIJob, AIJobKind, AIJobStatus
+from app.crud.ai_job import ai_job_crud
 from app.crud.project import project_crud
 from app.crud.task import task_crud
-from app.schemas.task import TaskCreate
+from app.schemas.ai_job import AIJobResponse, AITextJobCreate
 
 router = APIRouter()
 
 
-@router.post("/process-audio")
+def _reusable_job(db: Session, user: User, input_hash: str) -> Optional[AIJob]:
+    """Та же задача, отправленная недавно (повтор апдейта Telegram, двойное нажатие)"""
+    since = datetime.now(timezone.utc) - timedelta(seconds=settings.AI_JOB_DEDUPE_SECONDS)
+    return ai_job_crud.get_reusable(db, user.id, input_hash, since)
+
+
+def _projects_info(db: Session, user: User, requested: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Проекты пользователя для AI задачи - только из БД.
+
+    Список клиента (бот сужает его до упомянутого проекта) лишь ограничивает
+    выбор среди проектов, в которых пользователь состоит.
+    """
+    projects = [
+        {"id": p.id, "name": p.name}
+        for p in project_crud.get_user_projects(db=db, user_id=user.id, user_role=user.role)
+    ]
+    requested_ids = {p.get("id") for p in requested or []}
+    narrowed = [p for p in projects if p["id"] in requested_ids]
+    return narrowed or projects
+
+
+def _submit_job(db: Session, job: AIJob) -> AIJob:
+    """Постановка задачи в очередь воркеров"""
+    if not ai_job_queue.submit(job.id):
+        job.status = AIJobStatus.FAILED
+        job.error = "Очередь AI задач переполнена"
+        db.commit()
+        if job.input_path and os.path.exists(job.input_path):
+            os.unlink(job.input_path)
+        raise HTTPException(status_code=503, detail="Сервис AI перегружен, попробуйте позже")
+    return job
+
+
+@router.post("/process-audio", response_model=AIJobResponse, status_code=202)
 async def process_audio_message(
+    response: Response,
     audio_file: UploadFile = File(...),
+    notify: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
-) -> Dict[str, Any]:
-    """Обработка голосового сообщения для создания задачи"""
+):
+    """Постановка голосового сообщения в очередь на создание задачи"""
+    content = await audio_file.read()
+    input_hash = hash_audio(content)
     
-    # Сохраняем временный файл
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as temp_file:
-        content = await audio_file.read()
-        temp_file.write(content)
-        temp_file_path = temp_file.name
+    # Повторная отправка того же файла не тарифицируется заново
+    existing = _reusable_job(db, current_user, input_hash)
+    if existing:
+        response.status_code = 200
+        return existing
     
-    try:
-        # Получаем проекты пользователя
-        user_projects = project_crud.get_user_projects(
-            db=db, 
-            user_id=current_user.id, 
-            user_role=current_user.role
-        )
-        projects_info = [{"id": p.id, "name": p.name} for p in user_projects]
-        
-        # Обрабатываем аудио через AI
-        task_data = await generate_task_from_audio(temp_file_path, projects_info)
-        
-        # Если есть уточняющие вопросы, возвращаем их
-        if task_data.get("questions"):
-            return {
-                "status": "questions_needed",
-                "original_text": task_data.get("original_text"),
-                "questions": task_data["questions"],
-                "suggested_task": {
-                    "title": task_data.get("title"),
-                    "description": task_data.get("description"),
-                    "priority": task_data.get("priority")
-                }
-            }
-        
-        # Создаем задачу
-        task_create = TaskCreate(
-            title=task_data["title"],
-            description=task_data["description"],
-            priority=task_data["priority"],
-            project_id=task_data.get("project_id"),
-            deadline=task_data.get("deadline")
-        )
-        
-        task = task_crud.create(db=db, task=task_create, created_by=current_user.id)
-        
-        return {
-            "status": "task_created",
-            "task": task,
-            "original_text": task_data.get("original_text")
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Ошибка обработки аудио: {str(e)}")
+    # Сохраняем файл до обработки воркером
+    jobs_dir = Path(settings.AI_JOBS_DIR)
+    jobs_dir.mkdir(parents=True, exist_ok=True)
+    audio_path = jobs_dir / f"{uuid.uuid4().hex}.ogg"
+    audio_path.write_bytes(content)
     
-    finally:
-        # Удаляем временный файл
-        if os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
+    # Получаем проекты пользователя
+    projects_info = _projects_info(db, current_user)
+    
+    job = ai_job_crud.create(
+        db,
+        user_id=current_user.id,
+        kind=AIJobKind.AUDIO,
+        input_hash=input_hash,
+        input_path=str(audio_path),
+        input_projects=json.dumps(projects_info, ensure_ascii=False),
+        notify=notify,
+    )
+    return _submit_job(db, job)
 
 
-@router.post("/create-task-from-text")
+@router.post("/create-task-from-text", response_model=AIJobResponse, status_code=202)
 async def create_task_from_text(
-    request: Dict[str, Any],
+    request: AITextJobCreate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
-) -> Dict[str, Any]:
-    """Создание задачи из текста через AI"""
+):
+    """Постановка текста в очередь на создание задачи через AI"""
+    projects_info = _projects_info(db, current_user, request.user_projects)
+    input_hash = hash_text(request.text, projects_info)
     
-    try:
-        # Извлекаем данные из запроса
-        text = request.get("text", "")
-        user_projects = request.get("user_projects", [])
-        
-        # Анализируем текст
-        task_data = await analyze_task_request(text, user_projects)
-        
-        # Если есть уточняющие вопросы, возвращаем их
-        if task_data.get("questions"):
-            return {
-                "status": "questions_needed",
-                "questions": task_data["questions"],
-                "suggested_task": {
-                    "title": task_data.get("title"),
-                    "description": task_data.get("description"),
-                    "priority": task_data.get("priority")
-                }
-            }
-        
-        # Создаем задачу
-        task_create = TaskCreate(
-            title=task_data["title"],
-            description=task_data["description"],
-            priority=task_data["priority"],
-            project_id=task_data.get("project_id"),
-            deadline=task_data.get("deadline")
-        )
-        
-        task = task_crud.create(db=db, task=task_create, created_by=current_user.id)
-        
-        return {
-            "status": "task_created",
-            "task": task
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Ошибка анализа текста: {str(e)}")
+    existing = _reusable_job(db, current_user, input_hash)
+    if existing:
+        response.status_code = 200
+        return existing
+    
+    job = ai_job_crud.create(
+        db,
+        user_id=current_user.id,
+        kind=AIJobKind.TEXT,
+        input_hash=input_hash,
+        input_text=request.text,
+        input_projects=json.dumps(projects_info, ensure_ascii=False),
+        notify=request.notify,
+    )
+    return _submit_job(db, job)
+
+
+@router.get("/jobs/{job_id}", response_model=AIJobResponse)
+def get_ai_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Статус и результат AI задачи"""
+    job = ai_job_crud.get(db, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="AI задача не найдена")
+    return job
 
 
 @router.post("/upload-image-to-task/{task_id}")
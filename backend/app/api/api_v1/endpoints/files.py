@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+from app.core.config import settings
+from app.services.storage import storage, LocalStorage, StorageError
+import aiofiles
+
+router = APIRouter()
+
+
+def _local_path(method: str, key: str, expires: int, signature: str):
+    """Проверка подписанной ссылки локального хранилища"""
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Файл не найден")
+
+    if not storage.verify(method, key, expires, signature):
+        raise HTTPException(status_code=403, detail="Ссылка недействительна или истекла")
+
+    try:
+        return storage.path_for(key)
+    except StorageError:
+        raise HTTPException(status_code=400, detail="Недопустимый ключ файла")
+
+
+@router.put("/{key:path}")
+async def upload_file(key: str, expires: int, signature: str, request: Request):
+    """Прием файла по подписанной ссылке (локальное хранилище)"""
+    path = _local_path("PUT", key, expires, signature)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    written = 0
+    async with aiofiles.open(path, "wb") as out:
+        async for chunk in request.stream():
+            written += len(chunk)
+            if written > settings.STORAGE_MAX_UPLOAD_SIZE:
+                await out.close()
+                path.unlink(missing_ok=True)
+                raise HTTPException(status_code=413, detail="Файл слишком большой")
+            await out.write(chunk)
+
+    return {"key": key, "size": written}
+
+
+@router.get("/{key:path}")
+async def download_file(key: str, expires: int, signature: str):
+    """Отдача файла по подписанной ссылке (локальное хранилище)"""
+    path = _local_path("GET", key, expires, signature)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Файл не найден")
+    return FileResponse(path)
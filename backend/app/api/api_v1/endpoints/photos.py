@@ -1,18 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.task import Task
-from app.models.user import User
+from app.models.task import Task, TaskAttachment
+from app.models.user import User, UserRole
 from app.services.auth import get_current_user
-import os
-import shutil
-from pathlib import Path
+from app.services.storage import storage, StorageError
+from app.crud.task import task_crud
+from app.schemas.task import (
+    TaskAttachment as TaskAttachmentSchema,
+    TaskAttachmentCreate,
+    TaskAttachmentUploadRequest,
+    TaskAttachmentUploadURL,
+)
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Папка для хранения фото
-PHOTOS_DIR = Path("uploads/photos")
-PHOTOS_DIR.mkdir(parents=True, exist_ok=True)
+
+def _get_task_for_user(db: Session, task_id: int, current_user: User) -> Task:
+    """Получение задачи с проверкой прав доступа"""
+    task = task_crud.get(db=db, task_id=task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+
+    if (current_user.role != UserRole.CREATOR and
+        task.created_by != current_user.id and
+        task.assigned_to != current_user.id):
+        raise HTTPException(status_code=403, detail="Нет доступа к этой задаче")
+
+    return task
+
+
+@router.post("/tasks/{task_id}/upload-url", response_model=TaskAttachmentUploadURL)
+def create_upload_url(
+    task_id: int,
+    upload: TaskAttachmentUploadRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Выдача подписанной ссылки для прямой загрузки файла в хранилище"""
+    _get_task_for_user(db, task_id, current_user)
+
+    if upload.file_size and upload.file_size > settings.STORAGE_MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="Файл слишком большой")
+
+    key = storage.build_key(f"tasks/{task_id}", upload.filename)
+    return {"key": key, **storage.presign_upload(key, upload.content_type)}
+
+
+@router.post("/tasks/{task_id}/attachments", response_model=TaskAttachmentSchema)
+async def confirm_upload(
+    task_id: int,
+    attachment: TaskAttachmentCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Регистрация метаданных файла после прямой загрузки"""
+    _get_task_for_user(db, task_id, current_user)
+
+    if not attachment.key.startswith(f"tasks/{task_id}/"):
+        raise HTTPException(status_code=400, detail="Ключ не относится к этой задаче")
+
+    try:
+        file_size = await storage.size(attachment.key)
+    except StorageError as e:
+        logger.error(f"Ошибка проверки файла {attachment.key}: {e}")
+        raise HTTPException(status_code=502, detail="Хранилище недоступно")
+
+    if file_size is None:
+        raise HTTPException(status_code=400, detail="Файл не загружен в хранилище")
+
+    return task_crud.add_attachment(
+        db=db,
+        task_id=task_id,
+        uploaded_by=current_user.id,
+        filename=attachment.filename,
+        file_path=attachment.key,
+        file_size=file_size,
+        mime_type=attachment.mime_type,
+    )
+
+
+@router.get("/attachments/{attachment_id}/download-url")
+def get_download_url(
+    attachment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Выдача подписанной ссылки для прямого скачивания файла"""
+    attachment = task_crud.get_attachment(db=db, attachment_id=attachment_id)
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Файл не найден")
+
+    _get_task_for_user(db, attachment.task_id, current_user)
+
+    return {
+        "attachment_id": attachment.id,
+        "url": storage.presign_download(attachment.file_path),
+        "expires_in": settings.STORAGE_PRESIGN_EXPIRE_SECONDS,
+    }
+
 
 @router.post("/tasks/{task_id}/photo/")
 async def upload_task_photo(
@@ -21,76 +111,62 @@ async def upload_task_photo(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Загрузка фото для задачи"""
-    
-    # Проверяем, что задача существует
-    task = db.query(Task).filter(Task.id == task_id).first()
-    
-    if not task:
-        raise HTTPException(status_code=404, detail="Задача не найдена")
-    
-    # Проверяем права доступа (только создатель или создатель задачи)
-    from app.models.user import UserRole
-    if current_user.role != UserRole.CREATOR and task.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Нет прав для изменения этой задачи")
-    
+    """Загрузка фото для задачи через API (устаревший путь, используйте upload-url)"""
+    task = _get_task_for_user(db, task_id, current_user)
+
     # Проверяем тип файла
-    if not photo.content_type.startswith('image/'):
+    if not photo.content_type or not photo.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="Файл должен быть изображением")
-    
-    # Генерируем уникальное имя файла
-    file_extension = Path(photo.filename).suffix
-    filename = f"task_{task_id}_{current_user.id}{file_extension}"
-    file_path = PHOTOS_DIR / filename
-    
+
+    key = storage.build_key(f"tasks/{task.id}", photo.filename)
+
     try:
-        # Сохраняем файл
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(photo.file, buffer)
-        
-        # Обновляем задачу (можно добавить поле photo_url в модель Task)
-        # task.photo_url = str(file_path)  # Пока просто сохраняем путь
-        
-        print(f"Photo saved for task {task_id}: {file_path}")
-        
-        return {
-            "message": "Фото успешно загружено",
-            "task_id": task_id,
-            "photo_path": str(file_path)
-        }
-        
+        file_size = await storage.save(key, photo.file, photo.content_type)
     except Exception as e:
-        print(f"Error saving photo: {e}")
+        logger.error(f"Ошибка сохранения фото: {e}")
         raise HTTPException(status_code=500, detail="Ошибка сохранения фото")
 
+    attachment = task_crud.add_attachment(
+        db=db,
+        task_id=task.id,
+        uploaded_by=current_user.id,
+        filename=photo.filename or key,
+        file_path=key,
+        file_size=file_size,
+        mime_type=photo.content_type,
+    )
+
+    return {
+        "message": "Фото успешно загружено",
+        "task_id": task_id,
+        "attachment_id": attachment.id,
+        "photo_path": key
+    }
+
+
 @router.get("/tasks/{task_id}/photo/")
 async def get_task_photo(
     task_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Получение фото задачи"""
-    
-    # Проверяем, что задача существует и принадлежит пользователю
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.created_by == current_user.id
-    ).first()
-    
-    if not task:
-        raise HTTPException(status_code=404, detail="Задача не найдена")
-    
-    # Ищем фото для задачи
-    photo_pattern = f"task_{task_id}_{current_user.id}.*"
-    photos = list(PHOTOS_DIR.glob(photo_pattern))
-    
-    if not photos:
+    """Получение ссылки на фото задачи"""
+    task = _get_task_for_user(db, task_id, current_user)
+
+    photo_key = task.photo_url
+    if not photo_key:
+        attachment = db.query(TaskAttachment).filter(
+            TaskAttachment.task_id == task_id,
+            TaskAttachment.mime_type.like("image/%")
+        ).order_by(TaskAttachment.uploaded_at.desc()).first()
+        photo_key = attachment.file_path if attachment else None
+
+    if not photo_key:
         raise HTTPException(status_code=404, detail="Фото не найдено")
-    
-    photo_path = photos[0]
-    
+
     return {
         "task_id": task_id,
         "photo_exists": True,
-        "photo_path": str(photo_path)
+        "photo_path": photo_key,
+        "photo_url": storage.presign_download(photo_key)
     }
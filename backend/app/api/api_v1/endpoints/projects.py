@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
+import asyncio
+import json
+import logging
+from app.core.config import settings
 from app.core.database import get_db
-from app.services.auth import get_current_user
-from app.models.user import User
-from app.crud.project import project_crud
+from app.core.profiling import query_budget
+from app.core.responses import ORJSONResponse, sparse_fields
+from app.services.auth import get_current_user, get_current_user_for_stream
+from app.services.events import event_broker
+from app.models.user import User, UserRole
+from app.crud.project import project_crud, project_rows
 from app.schemas.project import Project, ProjectCreate, ProjectUpdate
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -17,27 +27,31 @@ def create_project(
     current_user: User = Depends(get_current_user)
 ):
     """Создание нового проекта"""
-    print(f"Creating project: {project.name} for user: {current_user.id}")
+    logger.info(f"Создание проекта «{project.name}» пользователем {current_user.id}")
     return project_crud.create(db=db, project=project, owner_id=current_user.id)
 
 
-@router.get("/", response_model=List[Project])
+@router.get("/", response_model=List[Project], dependencies=[query_budget(3)])
 def get_projects(
+    fields: Optional[Tuple[str, ...]] = sparse_fields(Project),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получение списка проектов пользователя"""
-    return project_crud.get_user_projects(db=db, user_id=current_user.id, user_role=current_user.role)
+    return ORJSONResponse(project_crud.get_user_project_rows(
+        db=db, user_id=current_user.id, user_role=current_user.role, fields=fields
+    ))
 
 
-@router.get("/{project_id}", response_model=Project)
+@router.get("/{project_id}", response_model=Project, dependencies=[query_budget(4)])
 def get_project(
     project_id: int,
+    fields: Optional[Tuple[str, ...]] = sparse_fields(Project),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получение проекта по ID"""
-    project = project_crud.get(db=db, project_id=project_id)
+    project = project_crud.get(db=db, project_id=project_id, fields=fields)
     if not project:
         raise HTTPException(status_code=404, detail="Проект не найден")
     
@@ -46,6 +60,8 @@ def get_project(
     if project not in user_projects:
         raise HTTPException(status_code=403, detail="Нет доступа к этому проекту")
     
+    if fields:
+        return ORJSONResponse(project_rows.only(fields).from_object(project))
     return project
 
 
@@ -90,3 +106,63 @@ def delete_project(
         raise HTTPException(status_code=400, detail="Не удалось удалить проект")
     
     return {"message": "Проект удален"}
+
+
+def stream_subscriber(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_for_stream)
+) -> Tuple[int, bool]:
+    """Проверка доступа к потоку событий проекта: (ID пользователя, создатель ли он).
+
+    Синхронная зависимость выполняется в пуле потоков и не блокирует event loop.
+    """
+    project = project_crud.get(db=db, project_id=project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Проект не найден")
+    
+    # Проверка доступа к проекту
+    user_projects = project_crud.get_user_projects(db=db, user_id=current_user.id, user_role=current_user.role)
+    if project not in user_projects:
+        raise HTTPException(status_code=403, detail="Нет доступа к этому проекту")
+    
+    subscriber = (current_user.id, current_user.role == UserRole.CREATOR)
+    # Соединение с БД не нужно на все время жизни потока
+    db.close()
+    return subscriber
+
+
+@router.get("/{project_id}/events")
+async def project_events(
+    project_id: int,
+    request: Request,
+    subscriber: Tuple[int, bool] = Depends(stream_subscriber)
+):
+    """Поток событий проекта (Server-Sent Events): изменения задач и одобрений.
+
+    Возобновление по Last-Event-ID не поддерживается: события не хранятся,
+    после переподключения клиент догружает пропущенное через /tasks/changes.
+    """
+    user_id, is_creator = subscriber
+    
+    async def event_stream():
+        async with event_broker.subscribe(project_id, user_id, is_creator) as subscription:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=settings.EVENTS_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                payload = {k: v for k, v in event.items() if k != "visible_to"}
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,38 +1,101 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.profiling import query_budget
+from app.core.responses import ORJSONResponse, sparse_fields
 from app.services.auth import get_current_user
 from app.models.user import User, UserRole
-from app.models.approval import ApprovalRequest, ActionType, ApprovalStatus
-from app.crud.task import task_crud
-from app.crud.approval import approval_crud
-from app.crud.user import user_crud
-from app.schemas.task import Task, TaskCreate, TaskUpdate, TaskComment, TaskCommentCreate
-from app.schemas.approval import ApprovalCreate
-from app.services.notifications import notification_service
-import json
+from app.crud.task import task_crud, task_rows
+from app.crud.archive import archive_crud
+from app.schemas.task import Task, TaskChanges, TaskCreate, TaskUpdate, TaskComment, TaskCommentCreate
+from app.services.search import task_search
+from app.services.task_submission import (
+    ApproverNotFound, TaskCreationForbidden, announce_submission, submit_task
+)
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Task])
+@router.get("/", response_model=List[Task], dependencies=[query_budget(3)])
 def get_tasks(
+    fields: Optional[Tuple[str, ...]] = sparse_fields(Task),
+    include_archived: bool = Query(False, description="Добавить задачи из архива"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получение всех задач пользователя"""
-    return task_crud.get_by_user(db=db, user_id=current_user.id, user_role=current_user.role)
+    # Строки из БД уже соответствуют схеме Task - отдаем их без валидации
+    rows = task_crud.get_rows_by_user(
+        db=db, user_id=current_user.id, user_role=current_user.role, fields=fields
+    )
+    if include_archived:
+        rows += archive_crud.get_rows(db=db, user_id=current_user.id, user_role=current_user.role, fields=fields)
+    return ORJSONResponse(rows)
 
 
-@router.get("/{task_id}", response_model=Task)
+@router.get("/changes", response_model=TaskChanges, dependencies=[query_budget(4)])
+def get_task_changes(
+    since: int = Query(0, ge=0, description="Курсор из предыдущего ответа (0 - полная выгрузка)"),
+    project_id: Optional[int] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Дельта-синхронизация: задачи, измененные после курсора, и удаленные ID"""
+    if settings.SHARDING_ENABLED and project_id is None:
+        # Курсор - номер изменения шарда, у разных проектов они несравнимы
+        raise HTTPException(
+            status_code=422,
+            detail="При шардировании синхронизация выполняется по одному проекту (project_id)"
+        )
+    return task_crud.get_changes(
+        db=db,
+        since=since,
+        user_id=current_user.id,
+        user_role=current_user.role,
+        project_id=project_id,
+        limit=limit
+    )
+
+
+@router.get("/search", response_model=List[Task], dependencies=[query_budget(4)])
+def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    project_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Полнотекстовый поиск по названиям, описаниям и комментариям задач"""
+    return task_search.search(
+        db=db,
+        query=q,
+        user_id=current_user.id,
+        user_role=current_user.role,
+        project_id=project_id,
+        limit=limit
+    )
+
+
+@router.get("/{task_id}", response_model=Task, dependencies=[query_budget(3)])
 def get_task(
     task_id: int,
+    fields: Optional[Tuple[str, ...]] = sparse_fields(Task),
+    include_archived: bool = Query(False, description="Искать задачу и в архиве"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получение конкретной задачи"""
-    task = task_crud.get(db=db, task_id=task_id)
+    # Для проверки прав нужен автор, даже если его не запросили
+    load_fields = fields and fields + ("created_by",)
+    task = task_crud.get(db=db, task_id=task_id, fields=load_fields)
+    if not task and include_archived:
+        task = archive_crud.get(db=db, task_id=task_id, fields=load_fields)
     if not task:
         raise HTTPException(status_code=404, detail="Задача не найдена")
     
@@ -40,6 +103,8 @@ def get_task(
     if current_user.role != UserRole.CREATOR and task.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="Нет доступа к этой задаче")
     
+    if fields:
+        return ORJSONResponse(task_rows.only(fields).from_object(task))
     return task
 
 
@@ -50,56 +115,30 @@ async def create_task(
     current_user: User = Depends(get_current_user)
 ):
     """Создание новой задачи"""
+    logger.debug(f"Создание задачи пользователем {current_user.id} ({current_user.role}): {task.title}")
     try:
-        print(f"Creating task: {task.dict()}")
-        print(f"Current user: {current_user.id}, role: {current_user.role}")
-        
-        # Проверяем права пользователя
-        if current_user.role not in [UserRole.CREATOR, UserRole.FOREMAN]:
-            raise HTTPException(status_code=403, detail="Недостаточно прав для создания задач")
-        
-        # Если создатель - создаем сразу
-        if current_user.role == UserRole.CREATOR:
-            print("Creating task as CREATOR")
-            result = task_crud.create(db=db, task=task, created_by=current_user.id)
-            print(f"Task created successfully: {result.id}")
-            return result
+        submission = submit_task(db, task, current_user)
+        db.commit()
+    except TaskCreationForbidden as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ApproverNotFound as e:
+        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
-        print(f"Error in create_task: {e}")
-        import traceback
-        traceback.print_exc()
+        db.rollback()
+        logger.error(f"Ошибка создания задачи: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
     
-    # Если прораб - создаем запрос на одобрение
-    creator = user_crud.get_by_telegram_id(db, 434532312)  # ID создателя
-    if not creator:
-        raise HTTPException(status_code=500, detail="Создатель не найден в системе")
-    
-    # Создаем запрос на одобрение
-    approval_data = ApprovalCreate(
-        requester_id=current_user.id,
-        approver_id=creator.id,
-        action_type=ActionType.CREATE_TASK,
-        entity_type="task",
-        entity_id=0,  # Будет обновлен после создания задачи
-        action_data=json.dumps({
-            "title": task.title,
-            "description": task.description,
-            "priority": task.priority,
-            "deadline": task.deadline.isoformat() if task.deadline else None,
-            "project_id": task.project_id
-        }),
-        project_id=task.project_id
-    )
-    
-    approval = approval_crud.create(db, approval_data)
+    await announce_submission(submission)
     
-    # Отправляем уведомление создателю
-    await notification_service.notify_approval_request(creator, approval)
+    # Если создатель - задача создана сразу
+    if submission.task is not None:
+        return submission.task
     
+    # Если прораб - задача ждет одобрения создателя
     raise HTTPException(
-        status_code=202, 
-        detail="Задача отправлена на одобрение создателю"
+        status_code=202,
+        detail="Задача уже ожидает одобрения создателя" if submission.duplicate
+        else "Задача отправлена на одобрение создателю"
     )
 
 
@@ -122,19 +161,48 @@ def update_task(
     return task_crud.update(db=db, task_id=task_id, task_update=task_update)
 
 
-@router.get("/project/{project_id}", response_model=List[Task])
+@router.get("/project/{project_id}", response_model=List[Task], dependencies=[query_budget(3)])
 def get_tasks_by_project(
     project_id: int,
+    fields: Optional[Tuple[str, ...]] = sparse_fields(Task),
+    include_archived: bool = Query(False, description="Добавить задачи из архива"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получение задач по проекту"""
-    return task_crud.get_by_project(
+    rows = task_crud.get_rows_by_project(
         db=db, 
         project_id=project_id, 
         user_role=current_user.role,
-        user_id=current_user.id
+        user_id=current_user.id,
+        fields=fields
     )
+    if include_archived:
+        rows += archive_crud.get_rows(
+            db=db, user_id=current_user.id, user_role=current_user.role, project_id=project_id, fields=fields
+        )
+    return ORJSONResponse(rows)
+
+
+@router.post("/{task_id}/restore", response_model=Task)
+def restore_task(
+    task_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Возврат задачи из архива"""
+    archived = archive_crud.get(db=db, task_id=task_id, fields=("created_by",))
+    if not archived:
+        raise HTTPException(status_code=404, detail="Задача не найдена в архиве")
+    
+    if current_user.role != UserRole.CREATOR and archived.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Нет доступа к этой задаче")
+    
+    task = archive_crud.restore(db=db, task_id=task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Задача не найдена в архиве")
+    task_crud.announce_created([task])
+    return task
 
 
 @router.get("/{task_id}", response_model=Task)
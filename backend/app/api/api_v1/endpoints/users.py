@@ -6,6 +6,9 @@ from app.services.auth import get_current_user, create_access_token
 from app.models.user import User, UserRole
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate, AuthRequest
 from app.crud.user import user_crud
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -31,22 +34,22 @@ def authenticate_user(
 ):
     """Аутентификация пользователя через Telegram ID"""
     telegram_id = request.telegram_id
-    print(f"Auth request for telegram_id: {telegram_id}")
+    logger.debug(f"Запрос авторизации: telegram_id={telegram_id}")
     
     if not telegram_id:
         raise HTTPException(status_code=400, detail="telegram_id обязателен")
     
     user = user_crud.get_by_telegram_id(db=db, telegram_id=telegram_id)
     if not user:
-        print(f"User not found for telegram_id: {telegram_id}")
+        logger.info(f"Авторизация: пользователь не найден: telegram_id={telegram_id}")
         raise HTTPException(status_code=404, detail="Пользователь не найден")
     
     if not user.is_active:
-        print(f"User {telegram_id} is not active")
+        logger.info(f"Авторизация: пользователь деактивирован: telegram_id={telegram_id}")
         raise HTTPException(status_code=400, detail="Пользователь деактивирован")
     
     access_token = create_access_token(telegram_id=telegram_id)
-    print(f"Token created for user {telegram_id}")
+    logger.info(f"Выдан токен: telegram_id={telegram_id}")
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -61,12 +64,10 @@ def check_user_access(
 ):
     """Проверка доступа пользователя к боту"""
     try:
-        print(f"Checking access for telegram_id: {telegram_id}")
         user = user_crud.get_by_telegram_id(db, telegram_id)
-        print(f"User found: {user}")
+        logger.debug(f"Проверка доступа: telegram_id={telegram_id}, найден={user is not None}")
         
         if not user:
-            print("User not found")
             return {"is_active": False, "message": "Пользователь не найден"}
         
         result = {
@@ -76,13 +77,10 @@ def check_user_access(
             "last_name": user.last_name,
             "username": user.username
         }
-        print(f"Returning result: {result}")
         return result
         
     except Exception as e:
-        print(f"Error in check_user_access: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"Ошибка проверки доступа: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
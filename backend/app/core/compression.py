@@ -0,0 +1,203 @@
+import time
+import zlib
+from typing import Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+from app.core import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Уже сжатые или потоковые типы: повторное сжатие только тратит CPU
+SKIP_CONTENT_TYPES = (
+    "image/", "video/", "audio/", "text/event-stream",
+    "application/zip", "application/gzip", "application/pdf", "application/octet-stream",
+)
+
+
+def _load_brotli():
+    try:
+        import brotli  # Необязательная зависимость
+    except ImportError:
+        logger.info("Пакет brotli не установлен, ответы сжимаются только gzip")
+        return None
+    return brotli
+
+
+def accepted_encoding(accept_encoding: str, supported: Tuple[str, ...]) -> Optional[str]:
+    """Кодировка из Accept-Encoding с наибольшим q; при равенстве - в порядке supported"""
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """ASGI middleware: сжатие ответов gzip/brotli по Accept-Encoding.
+
+    Ответы меньше COMPRESSION_MIN_SIZE, уже сжатые и медиа не трогаются.
+    Тело целиком больше COMPRESSION_THREAD_MIN_SIZE сжимается в пуле потоков,
+    чтобы не останавливать event loop; потоковые ответы сжимаются по частям.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.brotli = _load_brotli()
+        self.encodings = ("br", "gzip") if self.brotli else ("gzip",)
+        self.exclude_paths = tuple(
+            path.strip() for path in settings.COMPRESSION_EXCLUDE_PATHS.split(",") if path.strip()
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = accepted_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressedResponse(self, encoding, send).send)
+
+    def compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliStream(self.brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY))
+        return zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, encoding: str, body: bytes) -> Tuple[bytes, float]:
+        """Сжатие тела целиком; возвращает данные и затраченное процессорное время"""
+        started = time.thread_time()
+        if encoding == "br":
+            data = self.brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            compressor = self.compressor(encoding)
+            data = compressor.compress(body) + compressor.flush()
+        return data, time.thread_time() - started
+
+
+class _BrotliStream:
+    """Потоковый компрессор brotli с интерфейсом zlib (compress/flush)"""
+
+    def __init__(self, compressor):
+        self._compressor = compressor
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _CompressedResponse:
+    """Обертка send одного ответа: решение о сжатии принимается по первой части тела"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start = None
+        self.mode = None  # None - еще не решено, "plain", "stream"
+        self.compressor = None
+        self.original_size = 0
+        self.compressed_size = 0
+        self.cpu_time = 0.0
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.mode is None:
+            await self.first_body(message)
+        elif self.mode == "stream":
+            await self.stream_body(message)
+        else:
+            await self._send(message)
+
+    async def first_body(self, message):
+        headers = MutableHeaders(raw=self.start["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        content_type = headers.get("content-type", "")
+        if ("content-encoding" in headers or content_type.startswith(SKIP_CONTENT_TYPES)
+                or (not more_body and len(body) < settings.COMPRESSION_MIN_SIZE)):
+            self.mode = "plain"
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        if more_body:
+            self.mode = "stream"
+            self.compressor = self.middleware.compressor(self.encoding)
+            del headers["content-length"]
+            self.set_encoding(headers)
+            await self._send(self.start)
+            await self.stream_body(message)
+            return
+
+        self.mode = "plain"
+        if len(body) >= settings.COMPRESSION_THREAD_MIN_SIZE:
+            data, cpu_time = await run_in_threadpool(self.middleware.compress, self.encoding, body)
+        else:
+            data, cpu_time = self.middleware.compress(self.encoding, body)
+        self.observe(len(body), len(data), cpu_time)
+
+        if len(data) >= len(body):
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        headers["content-length"] = str(len(data))
+        self.set_encoding(headers)
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": data})
+
+    async def stream_body(self, message):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        started = time.thread_time()
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.flush()
+        self.cpu_time += time.thread_time() - started
+        self.original_size += len(body)
+        self.compressed_size += len(data)
+
+        if not more_body:
+            self.observe(self.original_size, self.compressed_size, self.cpu_time)
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def set_encoding(self, headers: MutableHeaders):
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+
+    def observe(self, original_size: int, compressed_size: int, cpu_time: float):
+        metrics.HTTP_COMPRESSION_CPU.labels(self.encoding).inc(cpu_time)
+        metrics.HTTP_COMPRESSION_BYTES.labels(self.encoding, "in").inc(original_size)
+        metrics.HTTP_COMPRESSION_BYTES.labels(self.encoding, "out").inc(compressed_size)
+        if original_size:
+            metrics.HTTP_COMPRESSION_RATIO.labels(self.encoding).observe(compressed_size / original_size)
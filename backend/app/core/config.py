@@ -23,8 +23,97 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str
     
+    # AI jobs
+    AI_JOB_WORKERS: int = 4
+    AI_JOB_QUEUE_SIZE: int = 100
+    AI_JOBS_DIR: str = "uploads/ai_jobs"
+    AI_JOB_STALE_SECONDS: int = 300  # RUNNING дольше - процесс, взявший задачу, считается упавшим
+    AI_JOB_DEDUPE_SECONDS: int = 600  # Тот же текст/аудио за это время возвращает прежнюю задачу, позже - создает новую
+    TASK_TIMEZONE: str = "Europe/Moscow"  # Часовой пояс для «завтра», «к 10» и т.п.
+    TASK_DEFAULT_DEADLINE_HOUR: int = 18  # Время дедлайна, если указана только дата
+    
+    # Approvals
+    APPROVAL_BATCH_MAX_SIZE: int = 200  # Решений в одном POST /admin/approvals/review-batch
+    
+    # File storage
+    STORAGE_BACKEND: str = "local"  # "local" или "s3"
+    STORAGE_LOCAL_DIR: str = "uploads"
+    STORAGE_PRESIGN_EXPIRE_SECONDS: int = 900
+    STORAGE_MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024
+    S3_ENDPOINT_URL: Optional[str] = None  # Например, http://minio:9000
+    S3_PUBLIC_ENDPOINT_URL: Optional[str] = None  # Адрес, доступный браузеру и боту
+    S3_BUCKET: str = "wepban"
+    S3_REGION: str = "us-east-1"
+    S3_ACCESS_KEY: Optional[str] = None
+    S3_SECRET_KEY: Optional[str] = None
+    
+    # Live events
+    EVENTS_BUS: str = "local"  # "local" (один процесс) или "redis"
+    REDIS_URL: Optional[str] = None
+    EVENTS_KEEPALIVE_SECONDS: int = 15
+    
+    # Deadline reminders
+    REMINDERS_ENABLED: bool = True
+    REMINDER_LEAD_MINUTES: int = 60
+    REMINDER_HORIZON_HOURS: int = 24
+    
+    # Архив завершенных задач
+    ARCHIVE_ENABLED: bool = True
+    ARCHIVE_AFTER_DAYS: int = 30  # DONE задачи без изменений дольше переносятся в архивные таблицы
+    ARCHIVE_BATCH_SIZE: int = 500  # Задач в одной транзакции переноса
+    ARCHIVE_BATCH_PAUSE_SECONDS: float = 0.5  # Пауза между пачками: запись пользователей не ждет всю архивацию
+    ARCHIVE_INTERVAL_SECONDS: int = 3600
+    
+    # Шардирование по проектам: задачи, комментарии и вложения проекта - в БД его шарда
+    SHARDING_ENABLED: bool = False  # Перед включением разделите базу: python split_shards.py
+    SHARD_BACKEND: str = "sqlite"  # "sqlite" - файл на шард, "schema" - схема PostgreSQL в основной БД
+    SHARD_DIR: str = "shards"  # Каталог файлов шардов SQLite
+    SHARD_DEFAULT: str = "main"  # Шард новых проектов
+    SHARD_PER_PROJECT: bool = False  # Каждому новому проекту - свой шард project_<id>
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" или "text"
+    LOG_LEVELS: str = "sqlalchemy.engine=WARNING,httpx=WARNING"  # Уровни по модулям: "модуль=УРОВЕНЬ,..."
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1  # Доля выводимых DEBUG записей
+    LOG_QUEUE_SIZE: int = 10000  # При переполнении записи отбрасываются
+    
+    # Сжатие ответов
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Меньшие ответы отдаются как есть
+    COMPRESSION_THREAD_MIN_SIZE: int = 64 * 1024  # Тела больше сжимаются в пуле потоков, а не в event loop
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # Нужен пакет brotli, иначе только gzip
+    COMPRESSION_EXCLUDE_PATHS: str = "/api/v1/files/,/api/v1/photos/"  # Файлы и фото уже сжаты
+    
     # Monitoring
     SENTRY_DSN: Optional[str] = None
+    METRICS_ENABLED: bool = True  # Prometheus /metrics
+    
+    # Профилирование SQL запросов
+    QUERY_PROFILER_ENABLED: bool = True
+    QUERY_PROFILER_HEADERS: bool = False  # Заголовки X-DB-* (в development включены всегда)
+    QUERY_SLOW_MS: float = 100.0  # Порог медленного запроса (логируется с EXPLAIN)
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 5  # Столько одинаковых SQL за запрос - признак N+1
+    QUERY_BUDGET_DEFAULT: Optional[int] = None  # Бюджет для эндпоинтов без query_budget()
+    QUERY_BUDGET_STRICT: bool = False  # Превышение бюджета - исключение (для тестов), иначе метрика и лог
+    
+    # Продакшен-сервер (gunicorn.conf.py)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0  # 0 - по числу ядер
+    SERVER_PRELOAD: bool = True  # Приложение импортируется в мастере до fork; новый код - только полным перезапуском
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE: int = 75  # Дольше keepalive_timeout upstream в nginx (60 с): простаивающие соединения закрывает прокси
+    SERVER_TIMEOUT: int = 60
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_MAX_REQUESTS: int = 10000  # Перезапуск воркера после стольких запросов (0 - никогда)
+    SERVER_MAX_REQUESTS_JITTER: int = 1000  # Чтобы воркеры не перезапускались одновременно
+    SERVER_MAX_MEMORY_MB: int = 0  # Перезапуск воркера при превышении RSS (0 - без ограничения)
+    SERVER_MEMORY_CHECK_SECONDS: int = 15
+    
+    # Каталог миграций для проверки схемы при запуске (по умолчанию migrations/versions в корне репозитория)
+    ALEMBIC_VERSIONS_DIR: Optional[str] = None
     
     # Environment
     ENVIRONMENT: str = "development"
@@ -1,13 +1,38 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL: чтение не блокирует запись - несколько процессов-воркеров работают с одним файлом
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def create_db_engine(url: str, **kwargs) -> Engine:
+    """Engine с настройками приложения (основная БД и шарды)"""
+    db_engine = create_engine(url, **kwargs)
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", _sqlite_pragmas)
+    return db_engine
+
+
+engine = create_db_engine(settings.database_url)
 
 Base = declarative_base()
 
+if settings.SHARDING_ENABLED:
+    # Задачи проектов - в БД шардов, сессия выбирает БД для каждого запроса
+    from app.core.sharding import RoutedSession
+    SessionLocal = sessionmaker(class_=RoutedSession, autocommit=False, autoflush=False)
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import time
+from typing import Callable, List, Tuple
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from prometheus_client.core import REGISTRY
+from sqlalchemy.engine import Engine
+from starlette.responses import Response
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Несколько процессов-воркеров (gunicorn.conf.py): значения пишутся в файлы
+# PROMETHEUS_MULTIPROC_DIR и объединяются при сборе. Переменная должна быть
+# задана до импорта prometheus_client.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP запроса",
+    ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Запросы в обработке", ["method"], multiprocess_mode="livesum"
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "Число SQL запросов на HTTP запрос", ["route"],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float("inf"))
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Суммарное время SQL запросов на HTTP запрос", ["route"]
+)
+DB_N_PLUS_ONE = Counter(
+    "db_n_plus_one_total", "Запросы с повторяющимися одинаковыми SQL (N+1)", ["route"]
+)
+DB_SLOW_QUERIES = Counter("db_slow_queries_total", "Медленные SQL запросы", ["route"])
+DB_QUERY_BUDGET_EXCEEDED = Counter(
+    "db_query_budget_exceeded_total", "Превышения бюджета SQL запросов", ["route"]
+)
+HTTP_COMPRESSION_RATIO = Histogram(
+    "http_compression_ratio", "Отношение размера сжатого ответа к исходному", ["encoding"],
+    buckets=(0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.7, 1.0, float("inf"))
+)
+HTTP_COMPRESSION_CPU = Counter(
+    "http_compression_cpu_seconds_total", "Процессорное время сжатия ответов", ["encoding"]
+)
+HTTP_COMPRESSION_BYTES = Counter(
+    "http_compression_bytes_total", "Байты ответов до (in) и после (out) сжатия", ["encoding", "stage"]
+)
+OPENAI_REQUEST_DURATION = Histogram(
+    "openai_request_duration_seconds", "Время запроса к OpenAI", ["operation"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+)
+OPENAI_TOKENS = Counter(
+    "openai_tokens_total", "Токены OpenAI", ["model", "type"]
+)
+NOTIFICATIONS_SENT = Counter(
+    "notifications_sent_total", "Уведомления в Telegram", ["status"]
+)
+AI_JOB_QUEUE_DEPTH = Gauge("ai_job_queue_depth", "Задачи в очереди AI воркеров", multiprocess_mode="livesum")
+EVENT_SUBSCRIBERS = Gauge("event_stream_subscribers", "Открытые SSE подписки", multiprocess_mode="livesum")
+STARTUP_DURATION = Gauge(
+    "app_startup_seconds", "Длительность этапов запуска приложения", ["phase"], multiprocess_mode="livemax"
+)
+# Каждый воркер держит напоминания по всем задачам - суммировать нельзя
+REMINDERS_PENDING = Gauge(
+    "deadline_reminders_pending", "Запланированные напоминания о дедлайнах", multiprocess_mode="livemax"
+)
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Пул соединений: выданные соединения", multiprocess_mode="livesum")
+DB_POOL_SIZE = Gauge("db_pool_size", "Пул соединений: размер", multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Пул соединений: сверх размера", multiprocess_mode="livesum")
+
+# Gauge, вычисляемые функцией; в режиме нескольких процессов их обновляет sample_tracked()
+_tracked: List[Tuple[Gauge, Callable[[], float]]] = []
+
+
+def observe_openai(operation: str, started: float, response=None):
+    """Время и токены запроса к OpenAI"""
+    OPENAI_REQUEST_DURATION.labels(operation).observe(time.perf_counter() - started)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        model = getattr(response, "model", "unknown")
+        OPENAI_TOKENS.labels(model, "prompt").inc(usage.prompt_tokens or 0)
+        OPENAI_TOKENS.labels(model, "completion").inc(usage.completion_tokens or 0)
+
+
+def track(gauge: Gauge, function: Callable[[], float]):
+    """Gauge со значением из функции.
+
+    В одном процессе функция вызывается при сборе метрик. В режиме нескольких
+    процессов сбор читает только файлы, поэтому каждый воркер периодически
+    записывает значение сам (sample_tracked).
+    """
+    if MULTIPROCESS:
+        _tracked.append((gauge, function))
+    else:
+        gauge.set_function(function)
+
+
+def track_pool(engine: Engine):
+    """Состояние пула соединений SQLAlchemy; пул читается заново - engine.dispose() его заменяет"""
+    for gauge, attr in ((DB_POOL_CHECKED_OUT, "checkedout"), (DB_POOL_SIZE, "size"), (DB_POOL_OVERFLOW, "overflow")):
+        if hasattr(engine.pool, attr):
+            track(gauge, lambda attr=attr: getattr(engine.pool, attr)())
+
+
+async def sample_tracked(interval: float = 5.0):
+    """Запись значений вычисляемых gauge в файлы метрик (только в режиме нескольких процессов)"""
+    while True:
+        for gauge, function in _tracked:
+            try:
+                gauge.set(function())
+            except Exception as e:
+                logger.debug(f"Не удалось обновить метрику {gauge._name}: {e}")
+        await asyncio.sleep(interval)
+
+
+def route_label(scope) -> str:
+    """Шаблон пути, который ставит роутер FastAPI; неизвестные пути не раздувают число меток"""
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class PrometheusMiddleware:
+    """ASGI middleware: латентность по шаблону маршрута и запросы в обработке"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_DURATION.labels(method, route_label(scope), str(status["code"])).observe(
+                time.perf_counter() - started
+            )
+
+
+def metrics_response() -> Response:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
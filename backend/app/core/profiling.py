@@ -0,0 +1,152 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+from app.core import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Эндпоинт выполнил больше SQL запросов, чем разрешает query_budget() (QUERY_BUDGET_STRICT)"""
+
+
+@dataclass
+class QueryProfile:
+    """SQL запросы одного HTTP запроса"""
+    count: int = 0
+    duration: float = 0.0
+    statements: Dict[str, int] = field(default_factory=dict)
+    slow: List[Tuple[str, Any, float]] = field(default_factory=list)
+    budget: Optional[int] = None
+
+    def record(self, statement: str, parameters: Any, elapsed: float, executemany: bool):
+        self.count += 1
+        self.duration += elapsed
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+        if elapsed * 1000 >= settings.QUERY_SLOW_MS:
+            self.slow.append((statement, None if executemany else parameters, elapsed))
+
+    def repeated(self) -> Dict[str, int]:
+        """Одинаковые SQL, выполненные много раз за запрос - признак N+1"""
+        threshold = settings.QUERY_N_PLUS_ONE_THRESHOLD
+        return {statement: n for statement, n in self.statements.items() if n >= threshold}
+
+    @property
+    def budget_exceeded(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+
+# Профиль текущего HTTP запроса; объект общий и для потоков threadpool
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+
+def current_profile() -> Optional[QueryProfile]:
+    return _current_profile.get()
+
+
+def query_budget(limit: int):
+    """Бюджет SQL запросов эндпоинта: dependencies=[query_budget(5)]"""
+    async def _set_budget():
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.budget = limit
+    return Depends(_set_budget)
+
+
+def instrument_engine(engine: Engine):
+    """Время каждого SQL запроса записывается в профиль текущего HTTP запроса"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record(statement, parameters, time.perf_counter() - started, executemany)
+
+
+def explain(engine: Engine, statement: str, parameters: Any) -> str:
+    """План выполнения запроса (EXPLAIN QUERY PLAN в SQLite, EXPLAIN в PostgreSQL)"""
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + statement, parameters or ()).fetchall()
+    return "\n".join(" | ".join(str(value) for value in row) for row in rows)
+
+
+class QueryProfilerMiddleware:
+    """ASGI middleware: число и время SQL запросов, N+1, медленные запросы и бюджет.
+
+    В режиме разработки (или с QUERY_PROFILER_HEADERS) результаты отдаются
+    заголовками X-DB-*, в продакшене - метриками Prometheus и логом.
+    """
+
+    def __init__(self, app, engine: Engine):
+        self.app = app
+        self.engine = engine
+        self.expose_headers = settings.QUERY_PROFILER_HEADERS or settings.ENVIRONMENT == "development"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile(budget=settings.QUERY_BUDGET_DEFAULT)
+        token = _current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Queries"] = str(profile.count)
+                headers["X-DB-Time-Ms"] = f"{profile.duration * 1000:.2f}"
+                headers["X-DB-Repeated"] = str(sum(profile.repeated().values()))
+                if profile.budget is not None:
+                    headers["X-DB-Query-Budget"] = str(profile.budget)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            await self.report(metrics.route_label(scope), profile)
+
+    async def report(self, route: str, profile: QueryProfile):
+        metrics.DB_QUERIES_PER_REQUEST.labels(route).observe(profile.count)
+        metrics.DB_TIME_PER_REQUEST.labels(route).observe(profile.duration)
+
+        repeated = profile.repeated()
+        if repeated:
+            metrics.DB_N_PLUS_ONE.labels(route).inc()
+            for statement, n in repeated.items():
+                logger.warning(f"N+1 в {route}: {n} одинаковых запросов: {statement[:300]}")
+
+        if profile.budget_exceeded:
+            metrics.DB_QUERY_BUDGET_EXCEEDED.labels(route).inc()
+            logger.warning(f"Превышен бюджет SQL запросов в {route}: {profile.count} > {profile.budget}")
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(
+                    f"{route}: {profile.count} SQL запросов при бюджете {profile.budget}\n"
+                    + "\n".join(profile.statements)
+                )
+
+        for statement, parameters, elapsed in profile.slow:
+            metrics.DB_SLOW_QUERIES.labels(route).inc()
+            plan = ""
+            if statement.lstrip().upper().startswith("SELECT"):
+                try:
+                    plan = await asyncio.to_thread(explain, self.engine, statement, parameters)
+                except Exception as e:
+                    plan = f"(EXPLAIN не выполнен: {e})"
+            logger.warning(f"Медленный запрос в {route}: {elapsed * 1000:.1f} мс: {statement[:300]}\n{plan}")
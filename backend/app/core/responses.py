@@ -0,0 +1,77 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import orjson
+from fastapi import Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+from starlette.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON ответ через orjson.
+
+    Вывод совпадает с JSON-режимом Pydantic: datetime в ISO 8601 (UTC как «Z»),
+    Enum - значением.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+class RowSchema:
+    """Быстрая выгрузка списков для доверенных чтений из БД.
+
+    Поля Pydantic схемы сопоставляются с колонками ORM модели один раз при
+    создании; строки выбираются одним SELECT по этим колонкам и превращаются
+    в словари без создания ORM объектов и без валидации схемы.
+    Подходит только для схем, все поля которых - колонки модели.
+    """
+
+    def __init__(self, model: Type, schema: Type[BaseModel], fields: Optional[Sequence[str]] = None):
+        columns = model.__table__.columns
+        missing = [name for name in schema.model_fields if name not in columns]
+        if missing:
+            raise ValueError(f"{schema.__name__}: нет колонок {missing} в {model.__name__}")
+        self.model = model
+        self.schema = schema
+        self.fields = tuple(fields or schema.model_fields)
+        self.columns = [getattr(model, name) for name in self.fields]
+
+    def only(self, fields: Optional[Sequence[str]]) -> "RowSchema":
+        """Та же схема с подмножеством полей (sparse fieldset); None - все поля"""
+        if not fields:
+            return self
+        return RowSchema(self.model, self.schema, fields)
+
+    def from_object(self, obj: Any) -> Dict[str, Any]:
+        return {name: getattr(obj, name) for name in self.fields}
+
+    def select(self) -> Select:
+        return select(*self.columns)
+
+    def fetch(self, db: Session, statement: Select) -> List[Dict[str, Any]]:
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in db.execute(statement)]
+
+
+def sparse_fields(schema: Type[BaseModel]):
+    """Параметр fields=: поля схемы через запятую, id включается всегда.
+
+    Возвращает кортеж полей в порядке схемы или None, если параметр не задан.
+    """
+    allowed = tuple(schema.model_fields)
+
+    def _fields(
+        fields: Optional[str] = Query(None, description=f"Поля ответа через запятую: {', '.join(allowed)}")
+    ) -> Optional[Tuple[str, ...]]:
+        if not fields:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested.difference(allowed))
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Неизвестные поля: {', '.join(unknown)}")
+        requested.add("id")
+        return tuple(name for name in allowed if name in requested)
+    return Depends(_fields)
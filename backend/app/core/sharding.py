@@ -0,0 +1,419 @@
+"""Шардирование по проектам (SHARDING_ENABLED).
+
+Задачи, комментарии, вложения, их архив и данные дельта-синхронизации
+каждого проекта лежат в БД его шарда: отдельном файле SQLite
+(SHARD_BACKEND=sqlite) или схеме PostgreSQL (SHARD_BACKEND=schema).
+Пользователи, проекты, участники, запросы на одобрение и AI задачи
+остаются в основной БД. Нагрузка на запись одного проекта не блокирует
+остальные проекты.
+
+Шард проекта берется из карты project_shards; новый проект получает
+SHARD_DEFAULT или собственный шард (SHARD_PER_PROJECT). Разделить
+существующую базу и перенести проект между шардами - split_shards.py.
+
+RoutedSession выбирает БД для каждого запроса:
+- таблицы основной БД - основная БД;
+- условие project_id = / IN по таблице шарда - шарды этих проектов;
+- условие по ID задачи (tasks.id, task_id) - шард задачи;
+- ленивая загрузка связей - шард родительского объекта;
+- иначе - все шарды, результаты объединяются (без общего ORDER BY и LIMIT).
+Запросы text() без таблиц считаются запросами к шардам (поиск).
+Сессию можно закрепить за шардом (pinned) - так работают архиватор
+и восстановление из архива.
+
+Изменения нескольких шардов коммитятся по очереди, без двухфазного коммита.
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import MetaData, ForeignKeyConstraint, event, inspect, insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import Mapper, Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+from sqlalchemy.sql.util import find_tables
+
+from app.core.config import settings
+from app.core.database import Base, create_db_engine, engine
+import logging
+
+logger = logging.getLogger(__name__)
+
+GLOBAL = "global"
+# Ключ session.info с закрепленным шардом
+PINNED = "shard"
+
+SHARD_TABLES = frozenset({
+    "tasks", "task_comments", "task_attachments",
+    "archived_tasks", "archived_task_comments", "archived_task_attachments",
+    "task_tombstones", "sync_counters",
+})
+# Таблицы с ID из global_sequences (архивные таблицы сохраняют ID рабочих)
+GLOBAL_ID_TABLES = ("tasks", "task_comments", "task_attachments")
+# Таблицы, где id - это ID задачи
+TASK_ID_TABLES = frozenset({"tasks", "archived_tasks"})
+
+SHARD_NAME_RE = re.compile(r"^[a-z0-9_]{1,48}$")
+# Сколько секунд список шардов берется из памяти (новые шарды других процессов видны с этой задержкой)
+SHARD_NAMES_TTL = 5.0
+TASK_CACHE_SIZE = 100_000
+
+
+def shard_metadata() -> MetaData:
+    """Таблицы шарда: копии моделей без внешних ключей на таблицы основной БД"""
+    metadata = MetaData()
+    for name in sorted(SHARD_TABLES):
+        table = Base.metadata.tables[name].to_metadata(metadata)
+        for constraint in list(table.constraints):
+            if isinstance(constraint, ForeignKeyConstraint) and constraint.elements[0].target_fullname.split(".")[0] not in SHARD_TABLES:
+                table.constraints.discard(constraint)
+                for element in constraint.elements:
+                    element.parent.foreign_keys.discard(element)
+                    table.foreign_keys.discard(element)
+    return metadata
+
+
+class ShardRouter:
+    """Engines шардов, карта проектов и кэш расположения задач (общие для всех сессий процесса)"""
+
+    def __init__(self):
+        self._engines: Dict[str, Engine] = {}
+        self._projects: Dict[int, str] = {}
+        self._tasks: "OrderedDict[int, str]" = OrderedDict()
+        self._names: List[str] = []
+        self._names_loaded = 0.0
+        self._lock = threading.RLock()
+        self._metadata: Optional[MetaData] = None
+
+    @property
+    def metadata(self) -> MetaData:
+        # Лениво: при импорте модуля модели еще могут быть не зарегистрированы
+        if self._metadata is None:
+            self._metadata = shard_metadata()
+        return self._metadata
+
+    def engine(self, shard: str) -> Engine:
+        """Engine шарда; при первом обращении создаются его схема и таблицы"""
+        if shard == GLOBAL:
+            return engine
+        shard_engine = self._engines.get(shard)
+        if shard_engine is not None:
+            return shard_engine
+        if not SHARD_NAME_RE.match(shard):
+            raise ValueError(f"Недопустимое имя шарда: {shard!r}")
+        with self._lock:
+            if shard not in self._engines:
+                self._engines[shard] = self._create(shard)
+            return self._engines[shard]
+
+    def _create(self, shard: str) -> Engine:
+        from app.services.search import task_search
+
+        if settings.SHARD_BACKEND == "schema":
+            with engine.begin() as conn:
+                conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{shard}"'))
+            shard_engine = create_db_engine(
+                settings.database_url, connect_args={"options": f"-csearch_path={shard}"}
+            )
+        else:
+            os.makedirs(settings.SHARD_DIR, exist_ok=True)
+            shard_engine = create_db_engine(f"sqlite:///{os.path.join(settings.SHARD_DIR, shard)}.db")
+        self.metadata.create_all(shard_engine)
+        task_search.ensure_schema(shard_engine)
+        return shard_engine
+
+    def dispose(self, close: bool = True):
+        for shard_engine in list(self._engines.values()):
+            shard_engine.dispose(close=close)
+
+    def shard_names(self) -> List[str]:
+        """Все шарды из карты (хотя бы SHARD_DEFAULT)"""
+        if time.monotonic() - self._names_loaded > SHARD_NAMES_TTL:
+            from app.models.shard import ProjectShard
+
+            with engine.connect() as conn:
+                names = conn.execute(select(ProjectShard.shard).distinct()).scalars().all()
+            self._names = sorted(names) or [settings.SHARD_DEFAULT]
+            self._names_loaded = time.monotonic()
+        return self._names
+
+    def shard_for_project(self, project_id: int, conn: Optional[Connection] = None) -> str:
+        """Шард проекта; проекту без шарда он назначается.
+
+        `conn` - соединение сессии с основной БД (SQLite, см. RoutedSession.global_connection):
+        назначение записывается в ее транзакции.
+        """
+        shard = self._projects.get(project_id)
+        if shard is not None:
+            return shard
+        from app.models.shard import ProjectShard
+
+        mapped = select(ProjectShard.shard).where(ProjectShard.project_id == project_id)
+        with engine.connect() as reader:
+            shard = reader.execute(mapped).scalar()
+        if shard is None:
+            shard = f"project_{project_id}" if settings.SHARD_PER_PROJECT else settings.SHARD_DEFAULT
+            assign = insert(ProjectShard).values(project_id=project_id, shard=shard)
+            try:
+                if conn is not None:
+                    # Ошибка INSERT в SQLite не прерывает транзакцию - точка сохранения не нужна
+                    conn.execute(assign)
+                else:
+                    with engine.begin() as writer:
+                        writer.execute(assign)
+                logger.info(f"Проект {project_id} назначен шарду {shard}")
+            except IntegrityError:
+                # Назначил другой процесс
+                with engine.connect() as reader:
+                    shard = reader.execute(mapped).scalar_one()
+            if shard not in self._names:
+                self._names_loaded = 0.0
+        self._projects[project_id] = shard
+        return shard
+
+    def remember_task(self, task_id: int, shard: str):
+        with self._lock:
+            self._tasks[task_id] = shard
+            self._tasks.move_to_end(task_id)
+            if len(self._tasks) > TASK_CACHE_SIZE:
+                self._tasks.popitem(last=False)
+
+    def shard_for_task(self, task_id: int) -> Optional[str]:
+        """Шард задачи (рабочей или архивной); None - задачи нет ни в одном шарде"""
+        shard = self._tasks.get(task_id)
+        if shard is not None:
+            return shard
+        for name in self.shard_names():
+            with self.engine(name).connect() as conn:
+                found = conn.execute(
+                    text("SELECT 1 FROM tasks WHERE id = :id UNION ALL SELECT 1 FROM archived_tasks WHERE id = :id"),
+                    {"id": task_id}
+                ).first()
+            if found:
+                self.remember_task(task_id, name)
+                return name
+        return None
+
+    def allocate_ids(self, table: str, count: int, conn: Optional[Connection] = None) -> int:
+        """Резервирование `count` ID строк таблицы шарда, возвращает первый из них.
+
+        Без `conn` - отдельная короткая транзакция основной БД: запись в шард не держит ее блокировку.
+        """
+        if conn is not None:
+            return self._allocate(conn, table, count)
+        with engine.begin() as conn:
+            return self._allocate(conn, table, count)
+
+    @staticmethod
+    def _allocate(conn: Connection, table: str, count: int) -> int:
+        from app.models.shard import GlobalSequence
+
+        result = conn.execute(
+            update(GlobalSequence).where(GlobalSequence.name == table).values(value=GlobalSequence.value + count)
+        )
+        if result.rowcount == 0:
+            # Первое обращение: продолжаем ID строк, оставшихся в основной БД
+            start = conn.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {table}")).scalar()
+            conn.execute(insert(GlobalSequence).values(name=table, value=start + count))
+        last = conn.execute(select(GlobalSequence.value).where(GlobalSequence.name == table)).scalar_one()
+        return last - count + 1
+
+
+def _conjuncts(clause) -> Iterable:
+    """Условия, объединенные через AND на верхнем уровне"""
+    if isinstance(clause, BooleanClauseList) and clause.operator is operators.and_:
+        for item in clause.clauses:
+            yield from _conjuncts(item)
+    else:
+        yield clause
+
+
+def _equality_values(clause, params):
+    """(колонка, значения) для условий `колонка = значение` и `колонка IN (...)`.
+
+    Значения ленивой загрузки связей передаются параметрами выполнения.
+    """
+    if not isinstance(clause, BinaryExpression) or not isinstance(clause.right, BindParameter):
+        return None, None
+    table = getattr(clause.left, "table", None)
+    if table is None or getattr(table, "name", None) not in SHARD_TABLES:
+        return None, None
+    value = params.get(clause.right.key, clause.right.effective_value)
+    if clause.operator is operators.eq:
+        return clause.left, [value]
+    if clause.operator is operators.in_op and isinstance(value, (list, tuple)):
+        return clause.left, list(value)
+    return None, None
+
+
+class RoutedSession(ShardedSession):
+    """Сессия, выбирающая БД основной таблицы или шарда для каждого запроса и объекта"""
+
+    def __init__(self, router: Optional[ShardRouter] = None, **kwargs):
+        self.router = router or shard_router
+        # Соединение с основной БД в текущей транзакции сессии
+        self.global_connection: Optional[Connection] = None
+        super().__init__(
+            shard_chooser=self._shard_for_object,
+            identity_chooser=self._shards_for_identity,
+            execute_chooser=self._shards_for_statement,
+            **kwargs,
+        )
+
+    def get_bind(self, mapper=None, *, shard_id=None, instance=None, clause=None, **kw):
+        if shard_id is None:
+            if instance is not None and mapper is None:
+                mapper = inspect(instance).mapper
+            if mapper is None:
+                # session.connection() без объекта: закрепленный шард или основная БД
+                shard_id = self.info.get(PINNED, GLOBAL)
+            else:
+                if not isinstance(mapper, Mapper):
+                    mapper = inspect(mapper)
+                shard_id = self._choose_shard_and_assign(mapper, instance, clause=clause)
+        return self.router.engine(shard_id)
+
+    @property
+    def sqlite_global_connection(self) -> Optional[Connection]:
+        """SQLite: соединение сессии с основной БД, если оно уже открыто.
+
+        Отдельная транзакция ждала бы блокировку записи этой же сессии (или не смогла бы
+        потом записать из устаревшего снимка). PostgreSQL - None: отдельная транзакция
+        не держит блокировки основной БД до коммита сессии.
+        """
+        return self.global_connection if engine.dialect.name == "sqlite" else None
+
+    def shard_of(self, obj) -> str:
+        """Шард объекта (назначается новому объекту по project_id/task_id)"""
+        return self._choose_shard_and_assign(inspect(obj).mapper, obj)
+
+    @contextmanager
+    def pinned(self, shard: str):
+        previous = self.info.get(PINNED)
+        self.info[PINNED] = shard
+        try:
+            yield self
+        finally:
+            if previous is None:
+                self.info.pop(PINNED, None)
+            else:
+                self.info[PINNED] = previous
+
+    def _shard_for_object(self, mapper, instance, clause=None) -> str:
+        if mapper.local_table.name not in SHARD_TABLES:
+            return GLOBAL
+        if PINNED in self.info:
+            return self.info[PINNED]
+        if instance is not None:
+            project_id = getattr(instance, "project_id", None)
+            if project_id is not None:
+                return self.router.shard_for_project(project_id, self.sqlite_global_connection)
+            task_id = getattr(instance, "task_id", None)
+            shard = self.router.shard_for_task(task_id) if task_id is not None else None
+            if shard is not None:
+                return shard
+        raise RuntimeError(f"Не удалось определить шард для {mapper.class_.__name__}")
+
+    def _shards_for_identity(self, mapper, primary_key, *, lazy_loaded_from, **kw) -> List[str]:
+        if mapper.local_table.name not in SHARD_TABLES:
+            return [GLOBAL]
+        if PINNED in self.info:
+            return [self.info[PINNED]]
+        if lazy_loaded_from is not None and lazy_loaded_from.identity_token not in (None, GLOBAL):
+            return [lazy_loaded_from.identity_token]
+        # Поиск только в identity map - перебор шардов ничего не стоит
+        return self.router.shard_names()
+
+    def _shards_for_statement(self, orm_context) -> List[str]:
+        statement = orm_context.statement
+        tables = {
+            table.name for table in find_tables(statement, check_columns=True, include_crud=True, include_joins=True)
+            if getattr(table, "name", None)
+        }
+        if tables and not tables & SHARD_TABLES:
+            return [GLOBAL]
+        if tables - SHARD_TABLES:
+            raise RuntimeError(f"Запрос объединяет таблицы шарда и основной БД: {sorted(tables)}")
+        if PINNED in self.info:
+            return [self.info[PINNED]]
+        parent = orm_context.lazy_loaded_from if orm_context.is_select else None
+        if parent is not None and parent.identity_token not in (None, GLOBAL):
+            return [parent.identity_token]
+        params = orm_context.parameters if isinstance(orm_context.parameters, dict) else {}
+        return sorted(self._shards_for_criteria(statement, params)) or self.router.shard_names()
+
+    def _shards_for_criteria(self, statement, params) -> Set[str]:
+        where = getattr(statement, "whereclause", None)
+        if where is None:
+            return set()
+        for clause in _conjuncts(where):
+            column, values = _equality_values(clause, params)
+            if column is None or not values:
+                continue
+            if column.name == "project_id":
+                return {self.router.shard_for_project(value, self.sqlite_global_connection) for value in values}
+            if column.name == "task_id" or (column.name == "id" and column.table.name in TASK_ID_TABLES):
+                shards = {self.router.shard_for_task(value) for value in values}
+                shards.discard(None)
+                if shards:
+                    return shards
+        return set()
+
+
+@event.listens_for(RoutedSession, "after_begin")
+def _track_global_connection(session: RoutedSession, transaction, connection: Connection):
+    if connection.engine is engine:
+        session.global_connection = connection
+
+
+@event.listens_for(RoutedSession, "after_transaction_end")
+def _forget_global_connection(session: RoutedSession, transaction):
+    if transaction.parent is None:
+        session.global_connection = None
+
+
+@event.listens_for(RoutedSession, "before_flush")
+def _assign_global_ids(session: RoutedSession, flush_context, instances):
+    """ID новых задач, комментариев и вложений - из global_sequences"""
+    pending: Dict[str, list] = {}
+    for obj in session.new:
+        table = inspect(obj).mapper.local_table.name
+        if table in GLOBAL_ID_TABLES and obj.id is None:
+            pending.setdefault(table, []).append(obj)
+    for table, objects in pending.items():
+        first = session.router.allocate_ids(table, len(objects), session.sqlite_global_connection)
+        for offset, obj in enumerate(objects):
+            obj.id = first + offset
+            if table == "tasks":
+                session.router.remember_task(obj.id, session.shard_of(obj))
+
+
+@contextmanager
+def pinned(session: Session, obj):
+    """Все запросы сессии - в шард объекта (для Core запросов без project_id); без шардирования ничего не делает"""
+    if not isinstance(session, RoutedSession):
+        yield session
+        return
+    with session.pinned(session.shard_of(obj)):
+        yield session
+
+
+def session_for_shard(shard: Optional[str]) -> Session:
+    """Сессия, закрепленная за шардом; без шардирования (shard=None) - обычная"""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    if shard is not None:
+        db.info[PINNED] = shard
+    return db
+
+
+# Глобальный экземпляр маршрутизатора
+shard_router = ShardRouter()
@@ -0,0 +1,147 @@
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import Column, MetaData, PrimaryKeyConstraint, String, Table, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.core import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Каталог миграций Alembic (migrations/versions в корне репозитория)
+DEFAULT_VERSIONS_DIR = Path(__file__).resolve().parents[3] / "migrations" / "versions"
+
+# Та же таблица, что создает Alembic
+alembic_version = Table(
+    "alembic_version", MetaData(),
+    Column("version_num", String(32), nullable=False),
+    PrimaryKeyConstraint("version_num", name="alembic_version_pkc"),
+)
+
+# Исходная схема (до миграций) соответствует ревизии 001; первая следующая миграция добавляет tasks.change_seq
+BASELINE_REVISION = "001"
+BASELINE_MISSING_COLUMN = "change_seq"
+
+_REVISION_RE = re.compile(r"^(revision|down_revision)\s*(?::[^=]*)?=\s*['\"]?([\w-]*)['\"]?", re.M)
+
+
+class StartupTimer:
+    """Длительность этапов запуска приложения"""
+
+    def __init__(self, started: float):
+        self.started = started
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    def report(self):
+        total = time.perf_counter() - self.started
+        breakdown = ", ".join(f"{name} {seconds * 1000:.0f} мс" for name, seconds in self.phases.items())
+        logger.info(f"Приложение запущено за {total * 1000:.0f} мс: {breakdown}")
+        if settings.METRICS_ENABLED:
+            for name, seconds in self.phases.items():
+                metrics.STARTUP_DURATION.labels(name).set(seconds)
+            metrics.STARTUP_DURATION.labels("total").set(total)
+
+
+def head_revision(versions_dir: Path) -> Optional[str]:
+    """Последняя ревизия миграций без импорта Alembic (он заметно замедляет запуск)"""
+    revisions, parents = set(), set()
+    for path in versions_dir.glob("*.py"):
+        values = dict(_REVISION_RE.findall(path.read_text(encoding="utf-8")))
+        if values.get("revision"):
+            revisions.add(values["revision"])
+            parents.add(values.get("down_revision"))
+    heads = revisions - parents
+    # Несколько веток без слияния - голову не определить
+    return heads.pop() if len(heads) == 1 else None
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    with engine.connect() as conn:
+        try:
+            return conn.execute(select(alembic_version.c.version_num)).scalar()
+        except DBAPIError:
+            return None
+
+
+def prepare_schema(engine: Engine, metadata: MetaData) -> str:
+    """Проверка схемы БД при запуске; возвращает описание того, что сделано.
+
+    Если БД уже на последней ревизии миграций - одна выборка вместо create_all
+    (на PostgreSQL create_all проверяет каждую таблицу отдельным запросом).
+    Пустая БД создается по моделям и помечается последней ревизией. Непустая БД
+    без ревизии, в таблицах которой не хватает колонок моделей, не запускается:
+    ее нужно пометить ревизией, которой соответствует схема, и обновить миграциями.
+    """
+    versions_dir = Path(settings.ALEMBIC_VERSIONS_DIR) if settings.ALEMBIC_VERSIONS_DIR else DEFAULT_VERSIONS_DIR
+    head = head_revision(versions_dir) if versions_dir.is_dir() else None
+    current = current_revision(engine)
+
+    if head is not None and current is not None:
+        if current == head:
+            return f"ревизия {head}"
+        logger.warning(f"БД на ревизии {current}, последняя миграция - {head}: выполните alembic upgrade head")
+        return f"ревизия {current}, ожидается {head}"
+
+    with engine.begin() as conn:
+        fresh = not inspect(conn).get_table_names()
+        if not fresh and head is not None:
+            # create_all не добавляет колонки в существующие таблицы, а созданные им
+            # таблицы помешали бы миграциям - такую БД переводят только миграциями
+            missing = missing_columns(conn, metadata)
+            if missing:
+                raise RuntimeError(schema_upgrade_hint(missing))
+        metadata.create_all(bind=conn)
+        if fresh and head is not None:
+            alembic_version.create(bind=conn)
+            conn.execute(alembic_version.insert().values(version_num=head))
+            return f"создана схема, ревизия {head}"
+
+    if head is None:
+        return "create_all, миграции не найдены"
+    # База создана через create_all без миграций, колонки совпадают с моделями
+    logger.warning("В БД нет ревизии Alembic, колонки таблиц совпадают с моделями: выполните alembic stamp head")
+    return "create_all"
+
+
+def missing_columns(conn, metadata: MetaData) -> Dict[str, List[str]]:
+    """Колонки моделей, которых нет в существующих таблицах БД"""
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    missing = {}
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        absent = [column.name for column in table.columns if column.name not in present]
+        if absent:
+            missing[table.name] = absent
+    return missing
+
+
+def schema_upgrade_hint(missing: Dict[str, List[str]]) -> str:
+    """Что делать с БД без ревизии Alembic, схема которой отстает от моделей"""
+    columns = ", ".join(f"{table}.{column}" for table, names in missing.items() for column in names)
+    if BASELINE_MISSING_COLUMN in missing.get("tasks", []):
+        # Схема до первой миграции после 001 (tasks.change_seq добавляет 002)
+        return (
+            f"БД исходной версии без ревизии Alembic (нет колонок: {columns}): "
+            f"выполните alembic stamp {BASELINE_REVISION} && alembic upgrade head"
+        )
+    return (
+        f"В БД без ревизии Alembic нет колонок: {columns}. Определите ревизию, которой "
+        f"соответствует схема, и выполните alembic stamp <ревизия> && alembic upgrade head"
+    )
@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.models.ai_job import AIJob, AIJobKind, AIJobStatus
+import uuid
+
+
+class AIJobCRUD:
+    def create(
+        self,
+        db: Session,
+        user_id: int,
+        kind: AIJobKind,
+        input_hash: str,
+        input_text: Optional[str] = None,
+        input_path: Optional[str] = None,
+        input_projects: Optional[str] = None,
+        notify: bool = False,
+    ) -> AIJob:
+        db_job = AIJob(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            kind=kind,
+            input_hash=input_hash,
+            input_text=input_text,
+            input_path=input_path,
+            input_projects=input_projects,
+            notify=notify,
+        )
+        db.add(db_job)
+        db.commit()
+        db.refresh(db_job)
+        return db_job
+
+    def get(self, db: Session, job_id: str) -> Optional[AIJob]:
+        return db.query(AIJob).filter(AIJob.id == job_id).first()
+
+    def get_reusable(self, db: Session, user_id: int, input_hash: str, since: datetime) -> Optional[AIJob]:
+        """Незавершенная или успешная задача с теми же входными данными, созданная после since.
+
+        Более старый повтор того же текста - новая задача пользователя, а не дубль.
+        """
+        return db.query(AIJob).filter(
+            AIJob.user_id == user_id,
+            AIJob.input_hash == input_hash,
+            AIJob.status != AIJobStatus.FAILED,
+            AIJob.created_at > since
+        ).order_by(AIJob.created_at.desc()).first()
+
+    def get_unfinished(self, db: Session, stale_before: Optional[datetime] = None) -> List[AIJob]:
+        """Задачи, прерванные перезапуском сервера.
+
+        С stale_before - только поставленные или начатые раньше этого времени:
+        более свежие еще обрабатывает другой процесс. Задачи с созданной
+        задачей (task_id) не возвращаются: повтор создал бы ее второй раз.
+        """
+        query = db.query(AIJob).filter(
+            AIJob.status.in_([AIJobStatus.QUEUED, AIJobStatus.RUNNING]),
+            AIJob.task_id.is_(None),
+        )
+        if stale_before is not None:
+            query = query.filter(or_(
+                and_(AIJob.status == AIJobStatus.QUEUED, AIJob.created_at < stale_before),
+                and_(AIJob.status == AIJobStatus.RUNNING, AIJob.started_at < stale_before),
+            ))
+        return query.order_by(AIJob.created_at).all()
+
+    def claim(self, db: Session, job_id: str, stale_before: datetime) -> bool:
+        """Атомарный захват задачи воркером.
+
+        Одну задачу могут поставить в очередь несколько процессов (восстановление
+        после перезапуска), обработает ее только тот, чей UPDATE изменил строку.
+        Зависшая RUNNING задача (started_at раньше stale_before) захватывается заново.
+        """
+        result = db.execute(
+            update(AIJob)
+            .where(
+                AIJob.id == job_id,
+                AIJob.task_id.is_(None),
+                or_(
+                    AIJob.status == AIJobStatus.QUEUED,
+                    and_(AIJob.status == AIJobStatus.RUNNING, AIJob.started_at < stale_before),
+                ),
+            )
+            .values(
+                status=AIJobStatus.RUNNING,
+                started_at=datetime.now(timezone.utc),
+                attempts=AIJob.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+
+ai_job_crud = AIJobCRUD()
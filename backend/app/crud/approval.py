@@ -1,19 +1,34 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.models.approval import ApprovalRequest, ApprovalStatus, ActionType
+from pydantic import ValidationError
+from sqlalchemy import update
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Sequence, Tuple
+from app.models.approval import ApprovalRequest, ApprovalStatus, ActionType, action_field
 from app.models.user import User
-from app.schemas.approval import ApprovalCreate, ApprovalUpdate
+from app.schemas.approval import ApprovalCreate, ApprovalUpdate, ApprovalDecision, parse_action_data
+from app.schemas.task import TaskCreate
+from app.services.events import event_broker, approval_event_payload
 from datetime import datetime
 
 class ApprovalCRUD:
     def create(self, db: Session, approval: ApprovalCreate) -> ApprovalRequest:
         """Создание запроса на одобрение"""
-        db_approval = ApprovalRequest(**approval.dict())
-        db.add(db_approval)
+        db_approval = self.add(db, approval)
         db.commit()
         db.refresh(db_approval)
+        self.announce_created(db_approval)
         return db_approval
 
+    def add(self, db: Session, approval: ApprovalCreate) -> ApprovalRequest:
+        """Запрос на одобрение без коммита; после коммита вызывающий вызывает announce_created"""
+        db_approval = ApprovalRequest(**approval.dict())
+        db.add(db_approval)
+        db.flush()
+        return db_approval
+
+    def announce_created(self, approval: ApprovalRequest):
+        """Событие о новом запросе после коммита"""
+        self._publish("approval.created", approval)
+
     def get(self, db: Session, approval_id: int) -> Optional[ApprovalRequest]:
         """Получение запроса по ID"""
         return db.query(ApprovalRequest).filter(ApprovalRequest.id == approval_id).first()
@@ -31,45 +46,116 @@ class ApprovalCRUD:
             ApprovalRequest.requester_id == requester_id
         ).order_by(ApprovalRequest.created_at.desc()).all()
 
-    def review(self, db: Session, approval_id: int, status: ApprovalStatus, comment: Optional[str] = None) -> ApprovalRequest:
-        """Одобрение или отклонение запроса"""
-        approval = db.query(ApprovalRequest).filter(ApprovalRequest.id == approval_id).first()
-        if not approval:
+    def get_many(self, db: Session, approval_ids: Sequence[int]) -> List[ApprovalRequest]:
+        """Запросы по списку ID вместе с автором и одобряющим"""
+        return db.query(ApprovalRequest).options(
+            selectinload(ApprovalRequest.requester), selectinload(ApprovalRequest.approver)
+        ).filter(ApprovalRequest.id.in_(approval_ids)).all()
+
+    def lock_pending(self, db: Session, approval_ids: Sequence[int], approver_id: int) -> List[ApprovalRequest]:
+        """Блокировка ожидающих запросов одобряющего до коммита.
+
+        UPDATE ... WHERE status = PENDING берет блокировку строк (в SQLite - блокировку
+        записи), поэтому параллельное рассмотрение тех же запросов дождется коммита
+        и уже не найдет их ожидающими. Возвращает только заблокированные запросы:
+        если их меньше, чем ID, часть не существует, чужая или уже рассмотрена.
+        """
+        db.execute(
+            update(ApprovalRequest)
+            .where(
+                ApprovalRequest.id.in_(approval_ids),
+                ApprovalRequest.approver_id == approver_id,
+                ApprovalRequest.status == ApprovalStatus.PENDING,
+            )
+            .values(reviewed_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return db.query(ApprovalRequest).populate_existing().filter(
+            ApprovalRequest.id.in_(approval_ids),
+            ApprovalRequest.approver_id == approver_id,
+            ApprovalRequest.status == ApprovalStatus.PENDING,
+        ).all()
+
+    def review(
+        self, db: Session, approval_id: int, approver_id: int, status: ApprovalStatus, comment: Optional[str] = None
+    ) -> Optional[ApprovalRequest]:
+        """Одобрение или отклонение запроса.
+
+        Запрос блокируется так же, как при пакетном рассмотрении (см. lock_pending);
+        None - запрос не найден, чужой или уже рассмотрен.
+        """
+        approvals = self.lock_pending(db, [approval_id], approver_id)
+        if not approvals:
+            db.rollback()
             return None
-        
-        approval.status = status
-        approval.reviewed_at = datetime.utcnow()
-        approval.review_comment = comment
-        
-        # Если одобрено - выполняем действие
-        if status == ApprovalStatus.APPROVED:
-            self._execute_approved_action(db, approval)
-        
-        db.commit()
-        db.refresh(approval)
-        return approval
-    
-    def _execute_approved_action(self, db: Session, approval: ApprovalRequest):
-        """Выполнение одобренного действия"""
-        import json
+
+        return self.review_many(db, [(approvals[0], status, comment)])[0]
+
+    def review_batch(self, db: Session, approvals: Sequence[ApprovalRequest], decisions: Sequence[ApprovalDecision]) -> List[ApprovalRequest]:
+        """Пакетное рассмотрение заблокированных запросов (см. lock_pending)"""
+        by_id = {approval.id: approval for approval in approvals}
+        return self.review_many(db, [(by_id[d.id], d.status, d.comment) for d in decisions])
+
+    def review_many(
+        self, db: Session, reviews: Sequence[Tuple[ApprovalRequest, ApprovalStatus, Optional[str]]]
+    ) -> List[ApprovalRequest]:
+        """Рассмотрение запросов одной транзакцией.
+
+        Задачи одобренных CREATE_TASK создаются одним INSERT; при ошибке в данных
+        любого запроса (ValueError) не применяется ничего.
+        """
         from app.crud.task import task_crud
-        from app.schemas.task import TaskCreate
-        from datetime import datetime
-        
-        if approval.action_type == ActionType.CREATE_TASK:
-            # Создаем задачу
-            action_data = json.loads(approval.action_data)
-            task_data = TaskCreate(
-                title=action_data["title"],
-                description=action_data.get("description"),
-                priority=action_data.get("priority", "medium"),
-                deadline=datetime.fromisoformat(action_data["deadline"]) if action_data.get("deadline") else None,
-                project_id=action_data["project_id"],
-                status="todo"
-            )
-            
-            task = task_crud.create(db, task_data, approval.requester_id)
+        from app.models.task import Task
+
+        reviewed_at = datetime.utcnow()
+        to_create: List[Tuple[ApprovalRequest, TaskCreate]] = []
+        try:
+            for approval, status, comment in reviews:
+                approval.status = status
+                approval.reviewed_at = reviewed_at
+                approval.review_comment = comment
+                # Если одобрено - выполняем действие
+                if status == ApprovalStatus.APPROVED and approval.action_type == ActionType.CREATE_TASK:
+                    to_create.append((approval, self._task_from_action(approval)))
+
+            tasks = task_crud.create_many(db, [(task, approval.requester_id) for approval, task in to_create])
+        except Exception:
+            db.rollback()
+            raise
+        for (approval, _), task in zip(to_create, tasks):
             approval.entity_id = task.id  # Обновляем ID созданной задачи
+        # ID до коммита: после него обращение к атрибуту перечитывает каждый объект отдельно
+        approval_ids = [approval.id for approval, _, _ in reviews]
+        task_ids = [task.id for task in tasks]
+        db.commit()
+
+        # Устаревшие после коммита объекты перечитываем пачкой
+        approvals = self.get_many(db, approval_ids)
+        if task_ids:
+            db.query(Task).filter(Task.id.in_(task_ids)).all()
+        task_crud.announce_created(tasks)
+        for approval in approvals:
+            self._publish("approval.reviewed", approval)
+        order = {approval_id: i for i, approval_id in enumerate(approval_ids)}
+        return sorted(approvals, key=lambda approval: order[approval.id])
+
+    def _task_from_action(self, approval: ApprovalRequest) -> TaskCreate:
+        """Данные задачи из action_data запроса CREATE_TASK"""
+        try:
+            return parse_action_data(approval.action_type, approval.action_data).to_task_create()
+        except ValidationError as e:
+            fields = ", ".join(".".join(str(part) for part in error["loc"]) for error in e.errors())
+            raise ValueError(f"Запрос {approval.id}: некорректные данные задачи ({fields})") from e
+
+    def get_pending_task_request(self, db: Session, requester_id: int, project_id: int, title: str) -> Optional[ApprovalRequest]:
+        """Ожидающий запрос автора на создание такой же задачи (по индексам action_data)"""
+        return db.query(ApprovalRequest).filter(
+            action_field("project_id").as_integer() == project_id,
+            action_field("title").as_string() == title,
+            ApprovalRequest.action_type == ActionType.CREATE_TASK,
+            ApprovalRequest.status == ApprovalStatus.PENDING,
+            ApprovalRequest.requester_id == requester_id
+        ).first()
 
     def count_pending(self, db: Session, approver_id: int) -> int:
         """Подсчет ожидающих одобрения запросов"""
@@ -102,4 +188,15 @@ class ApprovalCRUD:
             ApprovalRequest.status == ApprovalStatus.PENDING
         ).all()
 
+    def _publish(self, event_type: str, approval: ApprovalRequest):
+        """Публикация события одобрения для подписчиков проекта"""
+        if not event_broker.wants(approval.project_id):
+            return
+        event_broker.publish(
+            approval.project_id,
+            event_type,
+            approval_event_payload(approval),
+            (approval.requester_id, approval.approver_id),
+        )
+
 approval_crud = ApprovalCRUD()
@@ -0,0 +1,158 @@
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import delete, func, insert, literal, select, text, update
+from sqlalchemy.orm import Session, load_only
+
+from app.core.responses import RowSchema
+from app.core.sharding import pinned
+from app.models.ai_job import AIJob
+from app.models.archive import ArchivedTask, ArchivedTaskComment, ArchivedTaskAttachment
+from app.models.sync import TaskTombstone, allocate_change_seq
+from app.models.task import Task, TaskComment, TaskAttachment, DONE_CONDITION, done_at
+from app.models.user import UserRole
+from app.schemas.task import Task as TaskSchema
+from app.services.search import task_search
+
+
+archived_task_rows = RowSchema(ArchivedTask, TaskSchema)
+
+# Пары (рабочая таблица, архивная); колонки архивной таблицы - подмножество рабочей
+_CHILD_TABLES = (
+    (TaskComment.__table__, ArchivedTaskComment.__table__),
+    (TaskAttachment.__table__, ArchivedTaskAttachment.__table__),
+)
+
+
+class ArchivedTaskRef(NamedTuple):
+    id: int
+    project_id: int
+    created_by: int
+    assigned_to: Optional[int]
+
+
+def _copy(source, target, condition):
+    """INSERT INTO target SELECT ... FROM source WHERE condition по общим колонкам"""
+    names = [column.name for column in target.columns if column.name in source.columns]
+    return insert(target).from_select(names, select(*(source.c[name] for name in names)).where(condition))
+
+
+def _keeps_last_id(table):
+    """Строка с максимальным ID остается в рабочей таблице.
+
+    SQLite без AUTOINCREMENT выдает новой строке MAX(id) + 1, и после переноса
+    последних строк их ID достались бы новым задачам - восстановление стало бы невозможным.
+    """
+    return table.c.id < select(func.max(table.c.id)).scalar_subquery()
+
+
+class ArchiveCRUD:
+    def archive_done(self, db: Session, done_before: datetime, limit: int) -> List[ArchivedTaskRef]:
+        """Перенос до `limit` задач, завершенных раньше `done_before`, вместе с комментариями
+        и вложениями в архивные таблицы; возвращает перенесенные задачи.
+
+        Для дельта-синхронизации пишутся tombstones, связь AI задач с архивной задачей
+        обнуляется (внешний ключ на tasks).
+        """
+        archivable = (
+            text(DONE_CONDITION),
+            done_at() < done_before,
+            _keeps_last_id(Task.__table__),
+        ) + tuple(
+            Task.id.notin_(select(source.c.task_id).where(~_keeps_last_id(source)))
+            for source, _ in _CHILD_TABLES
+        )
+        # Без ORDER BY: выборка идет по ix_tasks_done_at (сначала давно завершенные).
+        # PostgreSQL: строки, которые уже переносит другой процесс, пропускаются
+        candidates = db.execute(
+            select(Task.id).where(*archivable).limit(limit).with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not candidates:
+            return []
+
+        # Условия повторяются при копировании: задачу могли переоткрыть после выборки
+        db.execute(_copy(Task.__table__, ArchivedTask.__table__, Task.id.in_(candidates) & text(DONE_CONDITION)))
+        archived = [
+            ArchivedTaskRef(*row) for row in db.execute(
+                select(ArchivedTask.id, ArchivedTask.project_id, ArchivedTask.created_by, ArchivedTask.assigned_to)
+                .where(ArchivedTask.id.in_(candidates))
+                .order_by(ArchivedTask.id)
+            )
+        ]
+        ids = [task.id for task in archived]
+        if not ids:
+            db.rollback()
+            return []
+
+        for source, target in _CHILD_TABLES:
+            db.execute(_copy(source, target, source.c.task_id.in_(ids)))
+
+        seq = allocate_change_seq(db, len(archived))
+        # Вставка в таблицу, а не ORM bulk insert: его не поддерживает сессия шардирования
+        db.execute(insert(TaskTombstone.__table__), [
+            {
+                "task_id": task.id,
+                "project_id": task.project_id,
+                "created_by": task.created_by,
+                "assigned_to": task.assigned_to,
+                "change_seq": seq + offset,
+            }
+            for offset, task in enumerate(archived)
+        ])
+        db.execute(update(AIJob).where(AIJob.task_id.in_(ids)).values(task_id=None))
+
+        for source, _ in _CHILD_TABLES:
+            db.execute(delete(source).where(source.c.task_id.in_(ids)))
+        db.execute(delete(Task).where(Task.id.in_(ids)).execution_options(synchronize_session=False))
+        task_search.refresh(db.connection(), ids)
+        db.commit()
+        return archived
+
+    def restore(self, db: Session, task_id: int) -> Optional[Task]:
+        """Возврат задачи из архива с комментариями и вложениями; None, если ее там нет"""
+        archived = db.get(ArchivedTask, task_id)
+        if archived is None:
+            return None
+
+        # Запросы ниже без project_id: при шардировании они идут в шард архивной задачи
+        with pinned(db, archived):
+            # Новый номер изменения: клиенты дельта-синхронизации получат задачу снова
+            seq = allocate_change_seq(db, 1)
+            source = ArchivedTask.__table__
+            names = [column.name for column in Task.__table__.columns if column.name in source.columns]
+            db.execute(insert(Task.__table__).from_select(names, select(*(
+                literal(seq).label(name) if name == "change_seq" else source.c[name] for name in names
+            )).where(source.c.id == task_id)))
+            for target, archive in _CHILD_TABLES:
+                db.execute(_copy(archive, target, archive.c.task_id == task_id))
+                db.execute(delete(archive).where(archive.c.task_id == task_id))
+            db.execute(delete(ArchivedTask).where(ArchivedTask.id == task_id).execution_options(synchronize_session=False))
+            task_search.refresh(db.connection(), [task_id])
+            db.commit()
+        return db.query(Task).filter(Task.id == task_id).first()
+
+    def get(self, db: Session, task_id: int, fields: Optional[Sequence[str]] = None) -> Optional[ArchivedTask]:
+        query = db.query(ArchivedTask)
+        if fields:
+            query = query.options(load_only(*(getattr(ArchivedTask, name) for name in fields)))
+        return query.filter(ArchivedTask.id == task_id).first()
+
+    def get_rows(
+        self,
+        db: Session,
+        user_id: int,
+        user_role: UserRole,
+        project_id: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Архивные задачи строками схемы Task с теми же правилами видимости, что у рабочих"""
+        rows = archived_task_rows.only(fields)
+        statement = rows.select()
+        if project_id is not None:
+            statement = statement.where(ArchivedTask.project_id == project_id)
+        if user_role != UserRole.CREATOR:
+            statement = statement.where((ArchivedTask.created_by == user_id) | (ArchivedTask.assigned_to == user_id))
+        return rows.fetch(db, statement)
+
+
+archive_crud = ArchiveCRUD()
@@ -1,11 +1,14 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import and_
-from typing import List, Optional
+from typing import List, Optional, Dict, Any, Sequence
+from app.core.responses import RowSchema
 from app.models.project import Project
 from app.models.user_project import UserProject, ProjectRole
-from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.schemas.project import Project as ProjectSchema, ProjectCreate, ProjectUpdate
 from app.models.user import UserRole
 
+project_rows = RowSchema(Project, ProjectSchema)
+
 
 class ProjectCRUD:
     def create(self, db: Session, project: ProjectCreate, owner_id: int) -> Project:
@@ -27,8 +30,11 @@ class ProjectCRUD:
         
         return db_project
 
-    def get(self, db: Session, project_id: int) -> Optional[Project]:
-        return db.query(Project).filter(Project.id == project_id).first()
+    def get(self, db: Session, project_id: int, fields: Optional[Sequence[str]] = None) -> Optional[Project]:
+        query = db.query(Project)
+        if fields:
+            query = query.options(load_only(*(getattr(Project, name) for name in fields)))
+        return query.filter(Project.id == project_id).first()
 
     def get_user_projects(self, db: Session, user_id: int, user_role: UserRole) -> List[Project]:
         if user_role == UserRole.CREATOR:
@@ -41,6 +47,16 @@ class ProjectCRUD:
                 )
             ).all()
 
+    def get_user_project_rows(
+        self, db: Session, user_id: int, user_role: UserRole, fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """То же, что get_user_projects, но строками для быстрой сериализации"""
+        rows = project_rows.only(fields)
+        statement = rows.select().where(Project.is_active == True)
+        if user_role != UserRole.CREATOR:
+            statement = statement.join(UserProject).where(UserProject.user_id == user_id)
+        return rows.fetch(db, statement)
+
     def update(self, db: Session, project_id: int, project_update: ProjectUpdate) -> Optional[Project]:
         db_project = db.query(Project).filter(Project.id == project_id).first()
         if db_project:
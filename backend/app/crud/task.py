@@ -1,21 +1,62 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import and_
-from typing import List, Optional
-from app.models.task import Task, TaskComment
-from app.schemas.task import TaskCreate, TaskUpdate, TaskCommentCreate
+from datetime import datetime, timezone
+from typing import List, Optional, Dict, Any, Sequence, Tuple
+from app.core.responses import RowSchema
+from app.models.task import Task, TaskComment, TaskAttachment
+from app.models.sync import TaskTombstone
+from app.schemas.task import Task as TaskSchema, TaskCreate, TaskUpdate, TaskCommentCreate
 from app.models.user import UserRole
+from app.services.events import event_broker, task_event_payload
+from app.services.reminders import deadline_scheduler
+
+
+task_rows = RowSchema(Task, TaskSchema)
+
+
+def _utc_deadline(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Дедлайн с часовым поясом - в UTC.
+
+    SQLite отбрасывает смещение при записи, а naive значения читаются как UTC
+    (reminders._as_utc), поэтому «10:00+03:00» хранится как 07:00 UTC.
+    """
+    deadline = data.get("deadline")
+    if isinstance(deadline, datetime) and deadline.tzinfo is not None:
+        data["deadline"] = deadline.astimezone(timezone.utc)
+    return data
 
 
 class TaskCRUD:
     def create(self, db: Session, task: TaskCreate, created_by: int) -> Task:
-        db_task = Task(**task.dict(), created_by=created_by)
+        db_task = Task(**_utc_deadline(task.dict()), created_by=created_by)
         db.add(db_task)
         db.commit()
         db.refresh(db_task)
+        self._publish("task.created", db_task)
+        deadline_scheduler.schedule(db_task)
         return db_task
 
-    def get(self, db: Session, task_id: int) -> Optional[Task]:
-        return db.query(Task).filter(Task.id == task_id).first()
+    def create_many(self, db: Session, tasks: Sequence[Tuple[TaskCreate, int]]) -> List[Task]:
+        """Создание нескольких задач (данные, автор) одним INSERT без коммита.
+
+        Вызывающий коммитит вместе со своими изменениями и затем вызывает announce_created.
+        """
+        db_tasks = [Task(**_utc_deadline(task.dict()), created_by=created_by) for task, created_by in tasks]
+        db.add_all(db_tasks)
+        db.flush()
+        return db_tasks
+
+    def announce_created(self, db_tasks: Sequence[Task]):
+        """События и напоминания для задач из create_many после коммита"""
+        for db_task in db_tasks:
+            self._publish("task.created", db_task)
+            deadline_scheduler.schedule(db_task)
+
+    def get(self, db: Session, task_id: int, fields: Optional[Sequence[str]] = None) -> Optional[Task]:
+        query = db.query(Task)
+        if fields:
+            query = query.options(load_only(*(getattr(Task, name) for name in fields)))
+        return query.filter(Task.id == task_id).first()
 
     def get_by_user(self, db: Session, user_id: int, user_role: UserRole) -> List[Task]:
         """Получение всех задач пользователя с учетом роли"""
@@ -39,21 +80,108 @@ class TaskCRUD:
                 )
             ).all()
 
+    def get_rows_by_user(
+        self, db: Session, user_id: int, user_role: UserRole, fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """То же, что get_by_user, но строками для быстрой сериализации"""
+        rows = task_rows.only(fields)
+        statement = rows.select()
+        if user_role != UserRole.CREATOR:
+            statement = statement.where((Task.created_by == user_id) | (Task.assigned_to == user_id))
+        return rows.fetch(db, statement)
+
+    def get_rows_by_project(
+        self, db: Session, project_id: int, user_role: UserRole, user_id: int, fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """То же, что get_by_project, но строками для быстрой сериализации"""
+        rows = task_rows.only(fields)
+        statement = rows.select().where(Task.project_id == project_id)
+        if user_role != UserRole.CREATOR:
+            statement = statement.where((Task.created_by == user_id) | (Task.assigned_to == user_id))
+        return rows.fetch(db, statement)
+
+    def get_changes(
+        self,
+        db: Session,
+        since: int,
+        user_id: int,
+        user_role: UserRole,
+        project_id: Optional[int] = None,
+        limit: int = 500,
+    ) -> Dict[str, Any]:
+        """Задачи, созданные/измененные/удаленные после курсора `since`"""
+        tasks_query = db.query(Task).filter(Task.change_seq > since)
+        tombstones_query = db.query(TaskTombstone.task_id, TaskTombstone.change_seq).filter(
+            TaskTombstone.change_seq > since
+        )
+        if project_id is not None:
+            tasks_query = tasks_query.filter(Task.project_id == project_id)
+            tombstones_query = tombstones_query.filter(TaskTombstone.project_id == project_id)
+        if user_role != UserRole.CREATOR:
+            tasks_query = tasks_query.filter(
+                (Task.created_by == user_id) | (Task.assigned_to == user_id)
+            )
+            tombstones_query = tombstones_query.filter(
+                (TaskTombstone.created_by == user_id) | (TaskTombstone.assigned_to == user_id)
+            )
+        else:
+            # Создатель видит все задачи: переназначение для него не удаление
+            tombstones_query = tombstones_query.filter(TaskTombstone.created_by.isnot(None))
+
+        tasks = tasks_query.order_by(Task.change_seq).limit(limit + 1).all()
+        tombstones = tombstones_query.order_by(TaskTombstone.change_seq).limit(limit + 1).all()
+
+        # Сливаем оба потока по номеру изменения и отрезаем по лимиту
+        merged = sorted(
+            [(task.change_seq, task, None) for task in tasks] +
+            [(seq, None, task_id) for task_id, seq in tombstones],
+            key=lambda item: item[0]
+        )
+        has_more = len(merged) > limit
+        merged = merged[:limit]
+
+        changed = {}
+        deleted = []
+        for _, task, deleted_id in merged:
+            if task is not None:
+                changed[task.id] = task
+                # Задача снова видна (восстановлена или назначена обратно)
+                if task.id in deleted:
+                    deleted.remove(task.id)
+            else:
+                deleted.append(deleted_id)
+                changed.pop(deleted_id, None)
+
+        return {
+            "cursor": merged[-1][0] if merged else since,
+            "tasks": list(changed.values()),
+            "deleted": deleted,
+            "has_more": has_more,
+        }
+
     def update(self, db: Session, task_id: int, task_update: TaskUpdate) -> Optional[Task]:
         db_task = db.query(Task).filter(Task.id == task_id).first()
         if db_task:
-            update_data = task_update.dict(exclude_unset=True)
+            update_data = _utc_deadline(task_update.dict(exclude_unset=True))
             for field, value in update_data.items():
                 setattr(db_task, field, value)
+            # Новый дедлайн - новое напоминание
+            if "deadline" in update_data:
+                db_task.reminder_sent_at = None
             db.commit()
             db.refresh(db_task)
+            self._publish("task.updated", db_task)
+            deadline_scheduler.schedule(db_task)
         return db_task
 
     def delete(self, db: Session, task_id: int) -> bool:
         db_task = db.query(Task).filter(Task.id == task_id).first()
         if db_task:
+            project_id, visible_to = db_task.project_id, (db_task.created_by, db_task.assigned_to)
             db.delete(db_task)
             db.commit()
+            event_broker.publish(project_id, "task.deleted", {"id": task_id}, visible_to)
+            deadline_scheduler.cancel(task_id)
             return True
         return False
 
@@ -64,5 +192,48 @@ class TaskCRUD:
         db.refresh(db_comment)
         return db_comment
 
+    def _publish(self, event_type: str, db_task: Task):
+        """Публикация события задачи для подписчиков проекта"""
+        if not event_broker.wants(db_task.project_id):
+            return
+        event_broker.publish(
+            db_task.project_id,
+            event_type,
+            task_event_payload(db_task),
+            (db_task.created_by, db_task.assigned_to),
+        )
+
+    def add_attachment(
+        self,
+        db: Session,
+        task_id: int,
+        uploaded_by: int,
+        filename: str,
+        file_path: str,
+        file_size: int,
+        mime_type: str,
+    ) -> TaskAttachment:
+        """Сохранение метаданных загруженного файла"""
+        db_attachment = TaskAttachment(
+            task_id=task_id,
+            uploaded_by=uploaded_by,
+            filename=filename,
+            file_path=file_path,
+            file_size=file_size,
+            mime_type=mime_type,
+        )
+        db.add(db_attachment)
+        # Первое изображение становится обложкой задачи
+        if mime_type.startswith("image/"):
+            db_task = db.query(Task).filter(Task.id == task_id).first()
+            if db_task and not db_task.photo_url:
+                db_task.photo_url = file_path
+        db.commit()
+        db.refresh(db_attachment)
+        return db_attachment
+
+    def get_attachment(self, db: Session, attachment_id: int) -> Optional[TaskAttachment]:
+        return db.query(TaskAttachment).filter(TaskAttachment.id == attachment_id).first()
+
 
 task_crud = TaskCRUD()
@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
+from app.core.responses import RowSchema
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserUpdate, UserResponse
+
+user_rows = RowSchema(User, UserResponse)
 
 
 class UserCRUD:
@@ -21,6 +24,10 @@ class UserCRUD:
     def get_all(self, db: Session) -> List[User]:
         return db.query(User).all()
 
+    def get_all_rows(self, db: Session) -> List[Dict[str, Any]]:
+        """То же, что get_all, но строками для быстрой сериализации"""
+        return user_rows.fetch(db, user_rows.select())
+
     def count(self, db: Session) -> int:
         return db.query(User).count()
 
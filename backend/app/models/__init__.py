@@ -3,6 +3,10 @@ from .project import Project
 from .task import Task, TaskComment, TaskAttachment
 from .user_project import UserProject
 from .approval import ApprovalRequest
+from .sync import SyncCounter, TaskTombstone
+from .ai_job import AIJob
+from .archive import ArchivedTask, ArchivedTaskComment, ArchivedTaskAttachment
+from .shard import ProjectShard, GlobalSequence
 from app.core.database import Base
 
-__all__ = ["User", "Project", "Task", "TaskComment", "TaskAttachment", "UserProject", "ApprovalRequest", "Base"]
+__all__ = ["User", "Project", "Task", "TaskComment", "TaskAttachment", "UserProject", "ApprovalRequest", "SyncCounter", "TaskTombstone", "AIJob", "ArchivedTask", "ArchivedTaskComment", "ArchivedTaskAttachment", "ProjectShard", "GlobalSequence", "Base"]
@@ -0,0 +1,53 @@
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+
+from app.core.database import Base
+
+
+class AIJobKind(str, enum.Enum):
+    AUDIO = "audio"
+    TEXT = "text"
+
+
+class AIJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class AIJob(Base):
+    __tablename__ = "ai_jobs"
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(Enum(AIJobKind), nullable=False)
+    status = Column(Enum(AIJobStatus), default=AIJobStatus.QUEUED, nullable=False)
+
+    # Входные данные: хеш для дедупликации повторных отправок
+    input_hash = Column(String(64), nullable=False)
+    input_text = Column(Text, nullable=True)
+    input_path = Column(String, nullable=True)  # Временный файл аудио
+    input_projects = Column(Text, nullable=True)  # JSON список проектов пользователя
+    notify = Column(Boolean, default=False, nullable=False)
+
+    # Ответ модели сохраняется сразу, чтобы повтор не тарифицировался заново
+    model_output = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)  # JSON итог для клиента
+    error = Column(Text, nullable=True)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    user = relationship("User")
+
+    __table_args__ = (
+        Index("ix_ai_jobs_user_input_hash", "user_id", "input_hash"),
+        Index("ix_ai_jobs_status", "status"),
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum, Index, JSON, bindparam
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import enum
@@ -37,8 +38,8 @@ class ApprovalRequest(Base):
     entity_type = Column(String(50), nullable=False)  # "task", "project", "user"
     entity_id = Column(Integer, nullable=False)
     
-    # Данные для одобрения
-    action_data = Column(Text)  # JSON строка с данными действия
+    # Данные для одобрения: объект по схеме из ACTION_DATA_MODELS (app/schemas/approval.py)
+    action_data = Column(JSON().with_variant(JSONB(), "postgresql"))
     status = Column(Enum(ApprovalStatus), default=ApprovalStatus.PENDING)
     
     # Временные метки
@@ -49,3 +50,16 @@ class ApprovalRequest(Base):
     # Связь с проектом (если применимо)
     project_id = Column(Integer, ForeignKey("projects.id"))
     project = relationship("Project", back_populates="approval_requests")
+
+
+def action_field(key: str):
+    """Ключ action_data для фильтров и индексов (.as_string(), .as_integer()).
+
+    Путь подставляется в SQL литералом: с параметром SQLite не использует индекс по выражению.
+    """
+    return ApprovalRequest.action_data[bindparam(None, key, type_=JSON.JSONIndexType(), literal_execute=True)]
+
+
+# Частые фильтры запросов на создание задач: проект и название
+Index("ix_approval_requests_action_project", action_field("project_id").as_integer())
+Index("ix_approval_requests_action_title", action_field("title").as_string())
@@ -0,0 +1,60 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+from app.models.task import TaskStatus, TaskPriority
+
+
+class ArchivedTask(Base):
+    """Завершенная задача, перенесенная из tasks архиватором (services/archive.py).
+
+    Колонки совпадают с tasks, ID сохраняется - по нему задача восстанавливается.
+    Внешних ключей нет: архив не должен мешать удалению пользователей и проектов.
+    """
+    __tablename__ = "archived_tasks"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(Enum(TaskStatus), nullable=False)
+    priority = Column(Enum(TaskPriority), nullable=False)
+    project_id = Column(Integer, nullable=False)
+    created_by = Column(Integer, nullable=False)
+    assigned_to = Column(Integer, nullable=True)
+    deadline = Column(DateTime(timezone=True), nullable=True)
+    reminder_sent_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    change_seq = Column(Integer, nullable=True)
+    photo_url = Column(String, nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_archived_tasks_project_id", "project_id"),
+        Index("ix_archived_tasks_created_by", "created_by"),
+        Index("ix_archived_tasks_assigned_to", "assigned_to"),
+    )
+
+
+class ArchivedTaskComment(Base):
+    __tablename__ = "archived_task_comments"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    content = Column(Text, nullable=False)
+    task_id = Column(Integer, nullable=False, index=True)
+    author_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class ArchivedTaskAttachment(Base):
+    """Метаданные вложения архивной задачи; сам файл остается в хранилище"""
+    __tablename__ = "archived_task_attachments"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    filename = Column(String, nullable=False)
+    file_path = Column(String, nullable=False)
+    file_size = Column(Integer, nullable=False)
+    mime_type = Column(String, nullable=False)
+    task_id = Column(Integer, nullable=False, index=True)
+    uploaded_by = Column(Integer, nullable=False)
+    uploaded_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ProjectShard(Base):
+    """Карта шардов: в какой БД лежат задачи проекта (app/core/sharding.py)"""
+    __tablename__ = "project_shards"
+
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    shard = Column(String(48), nullable=False, index=True)
+    assigned_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class GlobalSequence(Base):
+    """Счетчик ID строк шардов (одна строка на таблицу).
+
+    ID задач, комментариев и вложений уникальны во всех шардах: API обращается
+    к ним по ID, и при переносе проекта между шардами ID не меняются.
+    """
+    __tablename__ = "global_sequences"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
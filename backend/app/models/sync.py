@@ -0,0 +1,114 @@
+from collections import defaultdict
+from typing import Optional
+
+from sqlalchemy import Column, Integer, String, DateTime, event, inspect, update, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+from app.models.task import Task
+
+
+class SyncCounter(Base):
+    """Монотонный счетчик изменений (одна строка на сущность)"""
+    __tablename__ = "sync_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class TaskTombstone(Base):
+    """Отметка об удаленной задаче для дельта-синхронизации.
+
+    Без created_by - задача не удалена, а перестала быть видна одному
+    пользователю (assigned_to): ее переназначили другому исполнителю.
+    """
+    __tablename__ = "task_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=False)
+    created_by = Column(Integer, nullable=True)
+    assigned_to = Column(Integer, nullable=True)
+    change_seq = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+def allocate_change_seq(session: Session, count: int, name: str = "tasks", shard: Optional[str] = None) -> int:
+    """Резервирование `count` номеров изменений, возвращает первый из них.
+
+    UPDATE берет блокировку строки счетчика (в SQLite - блокировку записи),
+    поэтому номера строго возрастают в порядке коммитов. При шардировании
+    у каждого шарда свой счетчик (`shard`).
+    """
+    bind_arguments = {"shard_id": shard} if shard is not None else None
+    result = session.execute(
+        update(SyncCounter)
+        .where(SyncCounter.name == name)
+        .values(value=SyncCounter.value + count),
+        bind_arguments=bind_arguments
+    )
+    if result.rowcount == 0:
+        session.execute(SyncCounter.__table__.insert().values(name=name, value=count), bind_arguments=bind_arguments)
+    last = session.execute(
+        select(SyncCounter.value).where(SyncCounter.name == name), bind_arguments=bind_arguments
+    ).scalar_one()
+    return last - count + 1
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_task_changes(session: Session, flush_context, instances):
+    """Проставляет change_seq измененным задачам и пишет tombstones удаленных"""
+    changed = [obj for obj in session.new if isinstance(obj, Task)]
+    changed += [
+        obj for obj in session.dirty
+        if isinstance(obj, Task) and session.is_modified(obj, include_collections=False)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Task)]
+    if not changed and not deleted:
+        return
+
+    # Прежний исполнитель переназначенной задачи больше ее не видит: пишем ему tombstone
+    revoked = []
+    for task in changed:
+        previous = [
+            user_id for user_id in inspect(task).attrs.assigned_to.history.deleted
+            if user_id is not None and user_id not in (task.assigned_to, task.created_by)
+        ]
+        revoked += [(task, user_id) for user_id in previous]
+
+    # Номера выдаются счетчиком шарда задачи (без шардирования - один счетчик)
+    shard_of = getattr(session, "shard_of", lambda obj: None)
+    by_shard = defaultdict(lambda: ([], [], []))
+    for task in changed:
+        by_shard[shard_of(task)][0].append(task)
+    for task in deleted:
+        by_shard[shard_of(task)][1].append(task)
+    for task, user_id in revoked:
+        by_shard[shard_of(task)][2].append((task, user_id))
+
+    for shard, (shard_changed, shard_deleted, shard_revoked) in by_shard.items():
+        seq = allocate_change_seq(
+            session, len(shard_changed) + len(shard_deleted) + len(shard_revoked), shard=shard
+        )
+        # Tombstone прежнего исполнителя - раньше изменения самой задачи
+        for task, user_id in shard_revoked:
+            session.add(TaskTombstone(
+                task_id=task.id,
+                project_id=task.project_id,
+                assigned_to=user_id,
+                change_seq=seq,
+            ))
+            seq += 1
+        for task in shard_changed:
+            task.change_seq = seq
+            seq += 1
+        for task in shard_deleted:
+            session.add(TaskTombstone(
+                task_id=task.id,
+                project_id=task.project_id,
+                created_by=task.created_by,
+                assigned_to=task.assigned_to,
+                change_seq=seq,
+            ))
+            seq += 1
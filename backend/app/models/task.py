@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import enum
 
 from app.core.database import Base
@@ -20,6 +20,13 @@ class TaskPriority(str, enum.Enum):
     URGENT = "urgent"
 
 
+# Условие частичного индекса по дедлайнам. Запросы должны использовать
+# тот же текст условия, иначе SQLite не применит частичный индекс.
+OPEN_DEADLINE_CONDITION = "status != 'DONE' AND deadline IS NOT NULL"
+# Условие частичного индекса завершенных задач (кандидаты в архив)
+DONE_CONDITION = "status = 'DONE'"
+
+
 class Task(Base):
     __tablename__ = "tasks"
     
@@ -36,9 +43,13 @@ class Task(Base):
     
     # Dates
     deadline = Column(DateTime(timezone=True), nullable=True)
+    reminder_sent_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Монотонный номер последнего изменения (для дельта-синхронизации)
+    change_seq = Column(Integer, nullable=True, index=True)
+    
     # Photo
     photo_url = Column(String, nullable=True)
     
@@ -48,6 +59,31 @@ class Task(Base):
     assignee = relationship("User", foreign_keys=[assigned_to], back_populates="assigned_tasks")
     comments = relationship("TaskComment", back_populates="task", cascade="all, delete-orphan")
     attachments = relationship("TaskAttachment", back_populates="task", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_tasks_project_change_seq", "project_id", "change_seq"),
+        # Только незавершенные задачи с дедлайном - для планировщика напоминаний
+        Index(
+            "ix_tasks_open_deadline",
+            "deadline",
+            sqlite_where=text(OPEN_DEADLINE_CONDITION),
+            postgresql_where=text(OPEN_DEADLINE_CONDITION),
+        ),
+    )
+
+
+def done_at():
+    """Время завершения задачи: отдельной колонки нет - последнее изменение или создание"""
+    return func.coalesce(Task.updated_at, Task.created_at)
+
+
+# Поиск давно завершенных задач архиватором без прохода по всей таблице
+Index(
+    "ix_tasks_done_at",
+    done_at(),
+    sqlite_where=text(DONE_CONDITION),
+    postgresql_where=text(DONE_CONDITION),
+)
 
 
 class TaskComment(Base):
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, field_validator
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+import json
+from app.models.ai_job import AIJobKind, AIJobStatus
+
+
+class AITextJobCreate(BaseModel):
+    text: str
+    user_projects: List[Dict[str, Any]] = []  # Подсказка: ID проектов, к которым сузить выбор
+    notify: bool = False
+
+
+class AIJobResponse(BaseModel):
+    id: str
+    kind: AIJobKind
+    status: AIJobStatus
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    task_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @field_validator("result", mode="before")
+    @classmethod
+    def parse_result(cls, value):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+    class Config:
+        from_attributes = True
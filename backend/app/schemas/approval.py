@@ -1,20 +1,78 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Any, Dict, List, Optional, Type
 from datetime import datetime
+from app.core.config import settings
 from app.models.approval import ApprovalStatus, ActionType
+from app.models.task import TaskPriority
+from app.models.user_project import ProjectRole
+from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.schemas.task import TaskCreate, TaskUpdate
 from app.schemas.user import UserResponse
 
+# Данные действий (ApprovalRequest.action_data) по типу действия
+
+class CreateTaskAction(BaseModel):
+    title: str
+    description: Optional[str] = None
+    priority: TaskPriority = TaskPriority.MEDIUM
+    deadline: Optional[datetime] = None
+    project_id: int
+
+    def to_task_create(self) -> TaskCreate:
+        return TaskCreate(**self.model_dump())
+
+class UpdateTaskAction(TaskUpdate):
+    pass
+
+class DeleteTaskAction(BaseModel):
+    title: Optional[str] = None
+
+class CreateProjectAction(ProjectCreate):
+    pass
+
+class UpdateProjectAction(ProjectUpdate):
+    pass
+
+class DeleteProjectAction(BaseModel):
+    name: Optional[str] = None
+
+class ProjectMemberAction(BaseModel):
+    user_id: int
+    project_id: int
+    role: ProjectRole = ProjectRole.MEMBER
+
+ACTION_DATA_MODELS: Dict[ActionType, Type[BaseModel]] = {
+    ActionType.CREATE_TASK: CreateTaskAction,
+    ActionType.UPDATE_TASK: UpdateTaskAction,
+    ActionType.DELETE_TASK: DeleteTaskAction,
+    ActionType.CREATE_PROJECT: CreateProjectAction,
+    ActionType.UPDATE_PROJECT: UpdateProjectAction,
+    ActionType.DELETE_PROJECT: DeleteProjectAction,
+    ActionType.ADD_USER_TO_PROJECT: ProjectMemberAction,
+    ActionType.REMOVE_USER_FROM_PROJECT: ProjectMemberAction,
+}
+
+def parse_action_data(action_type: ActionType, action_data: Optional[Dict[str, Any]]) -> BaseModel:
+    """Типизированные данные действия; ValidationError (ValueError), если они не подходят"""
+    return ACTION_DATA_MODELS[action_type].model_validate(action_data or {})
+
 class ApprovalBase(BaseModel):
     action_type: ActionType
     entity_type: str
     entity_id: int
-    action_data: Optional[str] = None
+    action_data: Optional[Dict[str, Any]] = None
     project_id: Optional[int] = None
 
 class ApprovalCreate(ApprovalBase):
     requester_id: int
     approver_id: int
 
+    @model_validator(mode="after")
+    def validate_action_data(self) -> "ApprovalCreate":
+        # В БД - данные, прошедшие схему своего типа действия
+        self.action_data = parse_action_data(self.action_type, self.action_data).model_dump(mode="json")
+        return self
+
 class ApprovalUpdate(BaseModel):
     status: ApprovalStatus
     review_comment: Optional[str] = None
@@ -23,6 +81,26 @@ class ApprovalReview(BaseModel):
     status: ApprovalStatus
     comment: Optional[str] = None
 
+class ApprovalDecision(ApprovalReview):
+    id: int
+
+    @field_validator("status")
+    @classmethod
+    def status_is_final(cls, value: ApprovalStatus) -> ApprovalStatus:
+        if value == ApprovalStatus.PENDING:
+            raise ValueError("Решение должно быть approved или rejected")
+        return value
+
+class ApprovalBatchReview(BaseModel):
+    decisions: List[ApprovalDecision] = Field(min_length=1, max_length=settings.APPROVAL_BATCH_MAX_SIZE)
+
+    @field_validator("decisions")
+    @classmethod
+    def unique_ids(cls, value: List[ApprovalDecision]) -> List[ApprovalDecision]:
+        if len({decision.id for decision in value}) != len(value):
+            raise ValueError("Повторяющиеся ID запросов")
+        return value
+
 class ApprovalResponse(ApprovalBase):
     id: int
     requester_id: int
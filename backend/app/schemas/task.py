@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from app.models.task import TaskStatus, TaskPriority
 
@@ -37,6 +37,13 @@ class Task(TaskBase):
         from_attributes = True
 
 
+class TaskChanges(BaseModel):
+    cursor: int
+    tasks: List[Task]
+    deleted: List[int]
+    has_more: bool
+
+
 class TaskCommentBase(BaseModel):
     content: str
 
@@ -53,3 +60,37 @@ class TaskComment(TaskCommentBase):
 
     class Config:
         from_attributes = True
+
+
+class TaskAttachmentUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    file_size: Optional[int] = None
+
+
+class TaskAttachmentUploadURL(BaseModel):
+    key: str
+    url: str
+    method: str
+    headers: Dict[str, str]
+    expires_in: int
+
+
+class TaskAttachmentCreate(BaseModel):
+    key: str
+    filename: str
+    mime_type: str
+
+
+class TaskAttachment(BaseModel):
+    id: int
+    task_id: int
+    filename: str
+    file_path: str
+    file_size: int
+    mime_type: str
+    uploaded_by: int
+    uploaded_at: datetime
+
+    class Config:
+        from_attributes = True
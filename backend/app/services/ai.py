@@ -1,18 +1,37 @@
-import openai
+import asyncio
+import json
+import time
 from typing import Optional, Dict, Any
 from app.core.config import settings
+from app.core.metrics import observe_openai
+from app.services.task_parser import parse_task_text, local_now, DEADLINE_FORMAT
 
-client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+_client = None
+
+
+def get_client():
+    """Клиент OpenAI создается при первом обращении: импорт openai заметно замедляет запуск"""
+    global _client
+    if _client is None:
+        import openai
+        _client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+    return _client
 
 
 async def transcribe_audio(audio_file_path: str) -> str:
     """Преобразование голосового сообщения в текст"""
     try:
-        with open(audio_file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file
-            )
+        def _transcribe():
+            with open(audio_file_path, "rb") as audio_file:
+                return get_client().audio.transcriptions.create(
+                    model="whisper-1",
+                    file=audio_file
+                )
+        
+        # Клиент OpenAI синхронный - не блокируем event loop
+        started = time.perf_counter()
+        transcript = await asyncio.to_thread(_transcribe)
+        observe_openai("transcription", started)
         return transcript.text
     except Exception as e:
         raise Exception(f"Ошибка распознавания речи: {str(e)}")
@@ -20,18 +39,30 @@ async def transcribe_audio(audio_file_path: str) -> str:
 
 async def analyze_task_request(text: str, user_projects: list) -> Dict[str, Any]:
     """Анализ текста и создание структурированной задачи"""
+    # Короткие команды разбираются локально без обращения к модели
+    parsed = parse_task_text(text, user_projects)
+    if parsed.is_complete:
+        return parsed.to_task_data()
+    
+    known_fields = parsed.known_fields()
+    known_info = ""
+    if known_fields:
+        known_info = "\nУже определено (не меняй эти поля): " + json.dumps(known_fields, ensure_ascii=False)
+    
     projects_info = "\n".join([f"- {p['name']} (ID: {p['id']})" for p in user_projects])
     
     prompt = f"""
 Проанализируй следующий текст и создай структурированную задачу:
 
 Текст: "{text}"
+Текущая дата и время: {local_now().strftime(DEADLINE_FORMAT)}{known_info}
 
 Доступные проекты пользователя:
 {projects_info}
 
 Верни ответ в JSON формате:
 {{
+    "is_task": true или false,
     "title": "Краткое название задачи",
     "description": "Подробное описание",
     "project_id": ID_проекта_или_null,
@@ -45,10 +76,13 @@ async def analyze_task_request(text: str, user_projects: list) -> Dict[str, Any]
 2. Если дедлайн не указан, deadline = null
 3. Если нужны уточнения, добавь вопросы в массив
 4. Приоритет определяй по ключевым словам: "срочно", "важно", "не важно"
+5. Если текст не является поручением (приветствие, благодарность, вопрос, болтовня), is_task = false, остальные поля null
 """
 
     try:
-        response = client.chat.completions.create(
+        started = time.perf_counter()
+        response = await asyncio.to_thread(
+            get_client().chat.completions.create,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "Ты AI ассистент для создания задач. Отвечай только в JSON формате."},
@@ -57,9 +91,10 @@ async def analyze_task_request(text: str, user_projects: list) -> Dict[str, Any]
             temperature=0.3
         )
         
-        import json
+        observe_openai("chat", started, response)
+        
         result = json.loads(response.choices[0].message.content)
-        return result
+        return parsed.merge(result)
     except Exception as e:
         raise Exception(f"Ошибка анализа текста: {str(e)}")
 
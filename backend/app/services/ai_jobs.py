@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.ai_job import ai_job_crud
+from app.models.ai_job import AIJob, AIJobKind, AIJobStatus
+from app.schemas.task import Task as TaskSchema, TaskCreate
+from app.services.notifications import notification_service
+from app.services.task_parser import deadline_to_utc
+from app.services.task_submission import TaskCreationForbidden, TaskSubmission, announce_submission, submit_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def hash_audio(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_text(text: str, user_projects: List[Dict]) -> str:
+    payload = json.dumps({"text": text, "projects": user_projects}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class AIJobQueue:
+    """Очередь AI задач с ограниченным пулом воркеров.
+
+    HTTP запрос только ставит задачу в очередь и сразу получает ее ID,
+    распознавание речи и анализ текста выполняются воркерами в фоне.
+    Ответ модели сохраняется в БД до создания задачи, поэтому повторная
+    обработка после сбоя не обращается к модели снова.
+
+    Очередь в памяти у каждого процесса своя; задачу, оставшуюся в очереди
+    остановленного процесса, подбирает периодическое восстановление в
+    остальных, а захват через UPDATE (AIJobCRUD.claim) не дает обработать
+    ее дважды.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._recovery: Optional[asyncio.Task] = None
+
+    @property
+    def stale_after(self) -> timedelta:
+        return timedelta(seconds=settings.AI_JOB_STALE_SECONDS)
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=settings.AI_JOB_QUEUE_SIZE)
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(settings.AI_JOB_WORKERS)
+        ]
+        # Возвращаем в очередь задачи, прерванные перезапуском
+        self.recover(stale_before=None)
+        self._recovery = asyncio.create_task(self._recover_periodically())
+
+    async def stop(self):
+        tasks = self._workers + ([self._recovery] if self._recovery else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._recovery = None
+
+    def recover(self, stale_before: Optional[datetime]) -> int:
+        """Повторная постановка незавершенных задач; возвращает их число"""
+        db = SessionLocal()
+        try:
+            submitted = 0
+            for job in ai_job_crud.get_unfinished(db, stale_before=stale_before):
+                if not self.submit(job.id):
+                    break
+                submitted += 1
+            return submitted
+        finally:
+            db.close()
+
+    async def _recover_periodically(self):
+        while True:
+            await asyncio.sleep(self.stale_after.total_seconds())
+            try:
+                submitted = await asyncio.to_thread(
+                    self.recover, datetime.now(timezone.utc) - self.stale_after
+                )
+                if submitted:
+                    logger.info(f"Возвращено в очередь зависших AI задач: {submitted}")
+            except Exception as e:
+                logger.error(f"Ошибка восстановления AI задач: {e}")
+
+    def submit(self, job_id: str) -> bool:
+        """Постановка задачи в очередь; False, если очередь переполнена"""
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(job_id)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def _worker(self, number: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self.process(job_id)
+            except Exception as e:
+                logger.error(f"AI воркер {number}: ошибка обработки задачи {job_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def process(self, job_id: str):
+        """Обработка одной AI задачи"""
+        from app.services.ai import generate_task_from_audio, analyze_task_request
+
+        db = SessionLocal()
+        try:
+            # Задачу уже обрабатывает или завершил другой воркер/процесс
+            if not ai_job_crud.claim(db, job_id, datetime.now(timezone.utc) - self.stale_after):
+                return
+            job = ai_job_crud.get(db, job_id)
+
+            result = None
+            submission = None
+            try:
+                if job.model_output:
+                    task_data = json.loads(job.model_output)
+                else:
+                    user_projects = json.loads(job.input_projects or "[]")
+                    if job.kind == AIJobKind.AUDIO:
+                        task_data = await generate_task_from_audio(job.input_path, user_projects)
+                    else:
+                        task_data = await analyze_task_request(job.input_text, user_projects)
+                    job.model_output = json.dumps(task_data, ensure_ascii=False)
+                    db.commit()
+
+                # Задача (или запрос на одобрение), task_id и статус - одним коммитом:
+                # после сбоя до него восстановление повторит обработку без дубля
+                result, submission = self._apply(db, job, task_data)
+                job.result = json.dumps(result, ensure_ascii=False)
+                job.status = AIJobStatus.SUCCEEDED
+            except Exception as e:
+                logger.error(f"AI задача {job.id} завершилась ошибкой: {e}")
+                db.rollback()
+                result, submission = None, None
+                job.status = AIJobStatus.FAILED
+                job.error = str(e)
+
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+
+            if submission is not None:
+                await announce_submission(submission)
+
+            if job.input_path and os.path.exists(job.input_path):
+                os.unlink(job.input_path)
+
+            if job.notify:
+                await notification_service.notify_ai_job_result(job.user, job, result)
+        finally:
+            db.close()
+
+    def _apply(self, db, job: AIJob, task_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[TaskSubmission]]:
+        """Создание задачи по ответу модели (по правилам роли автора) или возврат уточняющих вопросов.
+
+        Не коммитит: задачу и статус AI задачи сохраняет process одной транзакцией.
+        """
+        suggested_task = {
+            "title": task_data.get("title"),
+            "description": task_data.get("description"),
+            "priority": task_data.get("priority")
+        }
+        # Модель решила, что это не задача: клиент показывает подсказку и размечает пример
+        if task_data.get("is_task") is False or not task_data.get("title"):
+            return {"status": "not_task", "original_text": task_data.get("original_text")}, None
+
+        if task_data.get("questions"):
+            return {
+                "status": "questions_needed",
+                "original_text": task_data.get("original_text"),
+                "questions": task_data["questions"],
+                "suggested_task": suggested_task
+            }, None
+
+        # Проект из ответа модели - только из проектов пользователя, сохраненных при постановке
+        project_id = task_data.get("project_id")
+        if isinstance(project_id, str) and project_id.isdigit():
+            project_id = int(project_id)
+        allowed = {p["id"] for p in json.loads(job.input_projects or "[]")}
+        if project_id is not None and project_id not in allowed:
+            return {
+                "status": "forbidden",
+                "detail": "Нет доступа к выбранному проекту",
+                "original_text": task_data.get("original_text")
+            }, None
+
+        task_create = TaskCreate(
+            title=task_data["title"],
+            description=task_data["description"],
+            priority=task_data["priority"],
+            project_id=project_id,
+            # Парсер и модель возвращают местное время пользователей
+            deadline=deadline_to_utc(task_data.get("deadline"))
+        )
+        # Роль перечитывается при обработке: ее могли изменить после постановки в очередь
+        try:
+            submission = submit_task(db, task_create, job.user)
+        except TaskCreationForbidden as e:
+            return {"status": "forbidden", "detail": str(e), "original_text": task_data.get("original_text")}, None
+
+        if submission.task is None:
+            return {
+                "status": "approval_requested",
+                "approval_id": submission.approval.id,
+                "duplicate": submission.duplicate,
+                "suggested_task": suggested_task,
+                "original_text": task_data.get("original_text")
+            }, submission
+
+        job.task_id = submission.task.id
+        return {
+            "status": "task_created",
+            "task": TaskSchema.model_validate(submission.task).model_dump(mode="json"),
+            "original_text": task_data.get("original_text")
+        }, submission
+
+
+# Глобальный экземпляр очереди
+ai_job_queue = AIJobQueue()
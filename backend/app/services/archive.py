@@ -0,0 +1,98 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.sharding import session_for_shard
+from app.crud.archive import archive_crud
+from app.services.events import event_broker
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TaskArchiver:
+    """Перенос давно завершенных задач в архивные таблицы.
+
+    Рабочая таблица tasks остается размером с активные задачи: доски,
+    списки пользователей и проверки доступа не читают закрытые задачи.
+    Перенос идет пачками по ARCHIVE_BATCH_SIZE в отдельных транзакциях
+    с паузой между ними, чтобы не держать блокировку записи (SQLite)
+    дольше одной пачки.
+
+    При нескольких процессах архиватор работает в каждом; одну и ту же
+    задачу переносит только один из них (SKIP LOCKED в PostgreSQL,
+    конфликт первичного ключа архива в SQLite). При шардировании
+    шарды обходятся по очереди.
+    """
+
+    def __init__(self):
+        self._runner: Optional[asyncio.Task] = None
+
+    @property
+    def age(self) -> timedelta:
+        return timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+
+    async def start(self):
+        if not settings.ARCHIVE_ENABLED:
+            return
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._runner:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+        self._runner = None
+
+    def run_once(self, age: Optional[timedelta] = None) -> int:
+        """Архивация всех подходящих задач пачками; возвращает число перенесенных"""
+        done_before = datetime.now(timezone.utc) - (self.age if age is None else age)
+        if not settings.SHARDING_ENABLED:
+            return self._archive(done_before, None)
+        from app.core.sharding import shard_router
+
+        return sum(self._archive(done_before, shard) for shard in shard_router.shard_names())
+
+    def _archive(self, done_before: datetime, shard: Optional[str]) -> int:
+        """Архивация в одной БД (в шарде `shard` при шардировании)"""
+        batch_size = settings.ARCHIVE_BATCH_SIZE
+        total = 0
+        while True:
+            db = session_for_shard(shard)
+            try:
+                archived = archive_crud.archive_done(db, done_before, batch_size)
+            except IntegrityError:
+                db.rollback()
+                logger.info("Пачку задач уже переносит другой процесс, архивация отложена")
+                return total
+            finally:
+                db.close()
+
+            for task in archived:
+                event_broker.publish(
+                    task.project_id, "task.archived", {"id": task.id}, (task.created_by, task.assigned_to)
+                )
+            total += len(archived)
+            if len(archived) < batch_size:
+                return total
+            time.sleep(settings.ARCHIVE_BATCH_PAUSE_SECONDS)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.ARCHIVE_INTERVAL_SECONDS)
+            try:
+                started = time.perf_counter()
+                archived = await asyncio.to_thread(self.run_once)
+                if archived:
+                    logger.info(
+                        f"В архив перенесено задач: {archived} за {time.perf_counter() - started:.1f} с"
+                    )
+            except Exception as e:
+                logger.error(f"Ошибка архивации задач: {e}")
+
+
+# Глобальный экземпляр архиватора
+task_archiver = TaskArchiver()
@@ -6,19 +6,21 @@ from app.core.database import get_db
 from app.core.config import settings
 from app.models.user import User
 from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def verify_telegram_auth(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Проверка Telegram WebApp авторизации"""
-    print(f"Verifying token: {credentials.credentials[:20]}...")
     try:
         payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         telegram_id: int = payload.get("sub")
-        print(f"Decoded telegram_id: {telegram_id}")
         if telegram_id is None:
-            print("No telegram_id in token")
+            logger.info("В токене нет telegram_id")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Неверный токен авторизации",
@@ -26,7 +28,7 @@ def verify_telegram_auth(credentials: HTTPAuthorizationCredentials = Depends(sec
             )
         return {"telegram_id": telegram_id}
     except JWTError as e:
-        print(f"JWT Error: {e}")
+        logger.info(f"Неверный JWT: {e}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный токен авторизации",
@@ -53,6 +55,27 @@ def get_current_user(
     return user
 
 
+def get_current_user_for_stream(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Получение пользователя для потоковых эндпоинтов.
+
+    EventSource в браузере не умеет передавать заголовки, поэтому токен
+    можно передать query-параметром `token`.
+    """
+    raw_token = credentials.credentials if credentials else token
+    if not raw_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Неверный токен авторизации",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    auth_data = verify_telegram_auth(HTTPAuthorizationCredentials(scheme="Bearer", credentials=raw_token))
+    return get_current_user(auth_data=auth_data, db=db)
+
+
 def create_access_token(telegram_id: int) -> str:
     """Создание JWT токена"""
     to_encode = {"sub": str(telegram_id)}
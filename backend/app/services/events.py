@@ -0,0 +1,212 @@
+import asyncio
+import itertools
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, Set, Iterable, AsyncIterator
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Подписка одного клиента на события проекта"""
+
+    def __init__(self, project_id: int, user_id: int, is_creator: bool, maxsize: int = 100):
+        self.project_id = project_id
+        self.user_id = user_id
+        self.is_creator = is_creator
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def can_see(self, event: Dict[str, Any]) -> bool:
+        """Создатель видит все, остальные - только события, где они участники"""
+        visible_to = event.get("visible_to")
+        return self.is_creator or visible_to is None or self.user_id in visible_to
+
+    def put(self, event: Dict[str, Any]):
+        if self.queue.full():
+            # Медленный клиент: выбрасываем старые события и просим перезагрузить список
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {"id": event["id"], "type": "resync", "project_id": self.project_id}
+        self.queue.put_nowait(event)
+
+
+class EventBus:
+    """Шина доставки событий между воркерами.
+
+    Базовая реализация работает в пределах одного процесса: событие сразу
+    отдается локальному брокеру, номера событий - счетчик процесса.
+    """
+
+    is_local = True
+
+    def __init__(self, broker: "EventBroker"):
+        self.broker = broker
+        self._sequence = itertools.count(1)
+
+    async def next_id(self) -> int:
+        """Номер следующего события (возрастает в пределах шины)"""
+        return next(self._sequence)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, event: Dict[str, Any]):
+        self.broker.dispatch(event)
+
+
+class RedisEventBus(EventBus):
+    """Шина через Redis Pub/Sub для нескольких воркеров и инстансов API"""
+
+    channel = "wepban:events"
+    sequence_key = "wepban:events:seq"
+    is_local = False
+
+    def __init__(self, broker: "EventBroker", url: str):
+        super().__init__(broker)
+        self.url = url
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        import redis.asyncio as redis  # Необязательная зависимость
+
+        self._redis = redis.from_url(self.url)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+        if self._redis:
+            await self._redis.close()
+
+    async def next_id(self) -> int:
+        """Общий для всех воркеров номер события (INCR в Redis)"""
+        return await self._redis.incr(self.sequence_key)
+
+    async def publish(self, event: Dict[str, Any]):
+        await self._redis.publish(self.channel, json.dumps(event, default=str))
+
+    async def _listen(self):
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self.channel)
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.broker.dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                await pubsub.close()
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка чтения событий из Redis: {e}")
+                await asyncio.sleep(1)
+
+
+class EventBroker:
+    """Брокер событий проектов внутри процесса.
+
+    CRUD-слой публикует события из любого потока (синхронные эндпоинты
+    работают в пуле потоков), доставка подписчикам всегда идет в event loop.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.bus: EventBus = EventBus(self)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        if settings.EVENTS_BUS == "redis" and settings.REDIS_URL:
+            self.bus = RedisEventBus(self, settings.REDIS_URL)
+        await self.bus.start()
+
+    async def stop(self):
+        await self.bus.stop()
+        self._loop = None
+
+    def wants(self, project_id: Optional[int]) -> bool:
+        """Есть ли смысл сериализовать событие для проекта"""
+        if project_id is None or self._loop is None:
+            return False
+        return not self.bus.is_local or project_id in self._subscribers
+
+    def publish(self, project_id: Optional[int], event_type: str, data: Dict[str, Any], visible_to: Optional[Iterable[int]] = None):
+        """Публикация события (потокобезопасно, без ожидания доставки)"""
+        if not self.wants(project_id):
+            return
+
+        event = {
+            "type": event_type,
+            "project_id": project_id,
+            "data": data,
+            "visible_to": sorted({uid for uid in visible_to if uid}) if visible_to is not None else None,
+        }
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self._loop:
+            self._loop.create_task(self._publish(event))
+        else:
+            asyncio.run_coroutine_threadsafe(self._publish(event), self._loop)
+
+    async def _publish(self, event: Dict[str, Any]):
+        try:
+            # Номер выдает шина: с Redis он общий для всех воркеров
+            event["id"] = await self.bus.next_id()
+            await self.bus.publish(event)
+        except Exception as e:
+            logger.error(f"Ошибка публикации события {event['type']}: {e}")
+
+    def dispatch(self, event: Dict[str, Any]):
+        """Раздача события локальным подписчикам (вызывается в event loop)"""
+        for subscription in list(self._subscribers.get(event["project_id"], ())):
+            if subscription.can_see(event):
+                subscription.put(event)
+
+    @asynccontextmanager
+    async def subscribe(self, project_id: int, user_id: int, is_creator: bool) -> AsyncIterator[Subscription]:
+        subscription = Subscription(project_id, user_id, is_creator)
+        self._subscribers[project_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscribers[project_id].discard(subscription)
+            if not self._subscribers[project_id]:
+                del self._subscribers[project_id]
+
+    def subscriber_count(self, project_id: Optional[int] = None) -> int:
+        if project_id is not None:
+            return len(self._subscribers.get(project_id, ()))
+        return sum(len(s) for s in self._subscribers.values())
+
+
+def task_event_payload(task) -> Dict[str, Any]:
+    """Сериализация задачи для события"""
+    from app.schemas.task import Task as TaskSchema
+    return TaskSchema.model_validate(task).model_dump(mode="json")
+
+
+def approval_event_payload(approval) -> Dict[str, Any]:
+    """Краткое представление запроса на одобрение для события"""
+    return {
+        "id": approval.id,
+        "action_type": approval.action_type.value if approval.action_type else None,
+        "status": approval.status.value if approval.status else None,
+        "requester_id": approval.requester_id,
+        "approver_id": approval.approver_id,
+        "entity_type": approval.entity_type,
+        "entity_id": approval.entity_id,
+    }
+
+
+# Глобальный экземпляр брокера
+event_broker = EventBroker()
@@ -1,13 +1,31 @@
+import asyncio
 import httpx
 import json
-from typing import Optional, Dict, Any
+from collections import defaultdict
+from typing import Optional, Dict, Any, List
 from app.core.config import settings
+from app.core.metrics import NOTIFICATIONS_SENT
 from app.models.user import User
 from app.models.approval import ApprovalRequest, ActionType
+from app.services.task_parser import to_local
 import logging
 
 logger = logging.getLogger(__name__)
 
+ACTION_LABELS = {
+    ActionType.CREATE_TASK: "создание задачи",
+    ActionType.UPDATE_TASK: "изменение задачи",
+    ActionType.DELETE_TASK: "удаление задачи",
+    ActionType.CREATE_PROJECT: "создание проекта",
+    ActionType.UPDATE_PROJECT: "изменение проекта",
+    ActionType.DELETE_PROJECT: "удаление проекта",
+    ActionType.ADD_USER_TO_PROJECT: "добавление пользователя в проект",
+    ActionType.REMOVE_USER_FROM_PROJECT: "удаление пользователя из проекта"
+}
+
+# Строк в сводке пакетного рассмотрения (лимит сообщения Telegram - 4096 символов)
+APPROVAL_SUMMARY_MAX_LINES = 30
+
 class TelegramNotificationService:
     def __init__(self):
         self.bot_token = settings.BOT_TOKEN
@@ -32,30 +50,22 @@ class TelegramNotificationService:
                 )
                 
                 if response.status_code == 200:
+                    NOTIFICATIONS_SENT.labels("sent").inc()
                     logger.info(f"Уведомление отправлено в чат {chat_id}")
                     return True
                 else:
+                    NOTIFICATIONS_SENT.labels("failed").inc()
                     logger.error(f"Ошибка отправки уведомления: {response.status_code} - {response.text}")
                     return False
                     
         except Exception as e:
+            NOTIFICATIONS_SENT.labels("error").inc()
             logger.error(f"Ошибка отправки уведомления: {e}")
             return False
     
     async def notify_approval_request(self, creator: User, approval: ApprovalRequest) -> bool:
         """Уведомление создателя о новом запросе на одобрение"""
-        action_labels = {
-            ActionType.CREATE_TASK: "создание задачи",
-            ActionType.UPDATE_TASK: "изменение задачи", 
-            ActionType.DELETE_TASK: "удаление задачи",
-            ActionType.CREATE_PROJECT: "создание проекта",
-            ActionType.UPDATE_PROJECT: "изменение проекта",
-            ActionType.DELETE_PROJECT: "удаление проекта",
-            ActionType.ADD_USER_TO_PROJECT: "добавление пользователя в проект",
-            ActionType.REMOVE_USER_FROM_PROJECT: "удаление пользователя из проекта"
-        }
-        
-        action_text = action_labels.get(approval.action_type, str(approval.action_type))
+        action_text = ACTION_LABELS.get(approval.action_type, str(approval.action_type))
         
         message = f"""🔔 <b>Новый запрос на одобрение</b>
 
@@ -97,18 +107,7 @@ class TelegramNotificationService:
         status_emoji = "✅" if approval.status.value == "approved" else "❌"
         status_text = "одобрено" if approval.status.value == "approved" else "отклонено"
         
-        action_labels = {
-            ActionType.CREATE_TASK: "создание задачи",
-            ActionType.UPDATE_TASK: "изменение задачи",
-            ActionType.DELETE_TASK: "удаление задачи", 
-            ActionType.CREATE_PROJECT: "создание проекта",
-            ActionType.UPDATE_PROJECT: "изменение проекта",
-            ActionType.DELETE_PROJECT: "удаление проекта",
-            ActionType.ADD_USER_TO_PROJECT: "добавление пользователя в проект",
-            ActionType.REMOVE_USER_FROM_PROJECT: "удаление пользователя из проекта"
-        }
-        
-        action_text = action_labels.get(approval.action_type, str(approval.action_type))
+        action_text = ACTION_LABELS.get(approval.action_type, str(approval.action_type))
         
         message = f"""{status_emoji} <b>Запрос на одобрение {status_text}</b>
 
@@ -121,6 +120,47 @@ class TelegramNotificationService:
         
         return await self.send_message(requester.telegram_id, message)
     
+    async def notify_approval_results(self, approvals: List[ApprovalRequest]) -> int:
+        """Итоги пакетного рассмотрения: одно сообщение каждому автору, отправка параллельно.
+
+        Возвращает число отправленных сообщений.
+        """
+        by_requester: Dict[int, List[ApprovalRequest]] = defaultdict(list)
+        for approval in approvals:
+            by_requester[approval.requester_id].append(approval)
+        
+        sent = await asyncio.gather(*(
+            self.notify_approval_result(items[0].requester, items[0]) if len(items) == 1
+            else self._notify_approval_summary(items[0].requester, items)
+            for items in by_requester.values()
+        ))
+        return sum(sent)
+    
+    async def _notify_approval_summary(self, requester: User, approvals: List[ApprovalRequest]) -> bool:
+        """Одно сообщение о нескольких рассмотренных запросах автора"""
+        approved = sum(1 for approval in approvals if approval.status.value == "approved")
+        approver = approvals[0].approver
+        
+        lines = []
+        for approval in approvals[:APPROVAL_SUMMARY_MAX_LINES]:
+            status_emoji = "✅" if approval.status.value == "approved" else "❌"
+            line = f"{status_emoji} #{approval.id} {ACTION_LABELS.get(approval.action_type, str(approval.action_type))}"
+            if approval.review_comment:
+                line += f": {approval.review_comment[:100]}"
+            lines.append(line)
+        if len(approvals) > APPROVAL_SUMMARY_MAX_LINES:
+            lines.append(f"... и еще {len(approvals) - APPROVAL_SUMMARY_MAX_LINES}")
+        
+        message = f"""📋 <b>Рассмотрено запросов: {len(approvals)}</b>
+
+✅ <b>Одобрено:</b> {approved}
+❌ <b>Отклонено:</b> {len(approvals) - approved}
+👤 <b>Рассмотрел:</b> {approver.first_name} {approver.last_name}
+
+""" + "\n".join(lines)
+        
+        return await self.send_message(requester.telegram_id, message)
+    
     async def notify_user_added(self, user: User, added_by: User) -> bool:
         """Уведомление о добавлении пользователя в систему"""
         message = f"""🎉 <b>Добро пожаловать в систему управления проектами!</b>
@@ -146,33 +186,87 @@ class TelegramNotificationService:
         
         return await self.send_message(user.telegram_id, message)
     
-    def _format_action_data(self, action_data: Optional[str]) -> str:
+    async def notify_deadline(self, user: User, task: Any) -> bool:
+        """Напоминание о приближающемся дедлайне задачи"""
+        message = f"""⏰ <b>Скоро дедлайн</b>
+
+📋 <b>Задача:</b> {task.title}
+📂 <b>Проект:</b> {task.project.name if task.project else 'Без проекта'}
+📅 <b>Дедлайн:</b> {to_local(task.deadline).strftime('%d.%m.%Y %H:%M')}"""
+        
+        reply_markup = {
+            "inline_keyboard": [
+                [
+                    {
+                        "text": "📋 Открыть задачу",
+                        "web_app": {"url": f"{settings.WEBAPP_URL}/projects/{task.project_id}"}
+                    }
+                ]
+            ]
+        }
+        
+        return await self.send_message(user.telegram_id, message, reply_markup)
+    
+    async def notify_ai_job_result(self, user: User, job: Any, result: Optional[Dict[str, Any]]) -> bool:
+        """Уведомление о завершении фоновой AI обработки"""
+        if not result:
+            message = f"""❌ <b>Не удалось обработать запрос</b>
+
+{job.error or 'Неизвестная ошибка'}"""
+        elif result.get("status") == "questions_needed":
+            questions = "\n".join(f"{i}. {q}" for i, q in enumerate(result["questions"], 1))
+            message = f"""❓ <b>Нужны уточнения</b>
+
+{questions}"""
+        elif result.get("status") == "not_task":
+            message = """🤖 <b>Это не похоже на задачу</b>
+
+Попробуйте написать, например: «Создай задачу: купить цемент»"""
+        elif result.get("status") == "approval_requested":
+            message = f"""⏳ <b>Задача отправлена на одобрение создателю</b>
+
+📋 <b>Название:</b> {result['suggested_task']['title']}"""
+        elif result.get("status") == "forbidden":
+            message = f"""❌ <b>Задача не создана</b>
+
+{result['detail']}"""
+        else:
+            task = result["task"]
+            message = f"""✅ <b>Задача создана!</b>
+
+📋 <b>Название:</b> {task['title']}
+⚡ <b>Приоритет:</b> {task['priority']}"""
+        
+        if result and result.get("original_text"):
+            message += f"\n\n🎤 <b>Распознанный текст:</b>\n{result['original_text']}"
+        
+        return await self.send_message(user.telegram_id, message)
+    
+    def _format_action_data(self, action_data: Optional[Dict[str, Any]]) -> str:
         """Форматирование данных действия для отображения"""
         if not action_data:
             return "Нет дополнительных данных"
         
-        try:
-            data = json.loads(action_data)
-            if isinstance(data, dict):
-                lines = []
-                for key, value in data.items():
-                    if key == "title":
-                        lines.append(f"📝 <b>Название:</b> {value}")
-                    elif key == "description":
-                        lines.append(f"📄 <b>Описание:</b> {value[:100]}{'...' if len(str(value)) > 100 else ''}")
-                    elif key == "priority":
-                        lines.append(f"⚡ <b>Приоритет:</b> {value}")
-                    elif key == "deadline":
-                        lines.append(f"⏰ <b>Дедлайн:</b> {value}")
-                    elif key == "project_name":
-                        lines.append(f"📂 <b>Проект:</b> {value}")
-                    else:
-                        lines.append(f"<b>{key}:</b> {value}")
-                return "\n".join(lines)
+        if not isinstance(action_data, dict):
+            return str(action_data)
+        
+        lines = []
+        for key, value in action_data.items():
+            if value is None:
+                continue
+            if key == "title":
+                lines.append(f"📝 <b>Название:</b> {value}")
+            elif key == "description":
+                lines.append(f"📄 <b>Описание:</b> {str(value)[:100]}{'...' if len(str(value)) > 100 else ''}")
+            elif key == "priority":
+                lines.append(f"⚡ <b>Приоритет:</b> {value}")
+            elif key == "deadline":
+                lines.append(f"⏰ <b>Дедлайн:</b> {value}")
+            elif key == "project_name":
+                lines.append(f"📂 <b>Проект:</b> {value}")
             else:
-                return str(data)
-        except:
-            return action_data
+                lines.append(f"<b>{key}:</b> {value}")
+        return "\n".join(lines)
     
     def _get_role_label(self, role: str) -> str:
         """Получение читаемого названия роли"""
@@ -0,0 +1,213 @@
+import asyncio
+import heapq
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, List, Tuple
+
+from sqlalchemy import text, update
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.task import Task, TaskStatus, OPEN_DEADLINE_CONDITION
+from app.services.notifications import notification_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite возвращает naive datetime - считаем его UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class DeadlineScheduler:
+    """Планировщик напоминаний о дедлайнах.
+
+    Держит в памяти min-heap ближайших напоминаний (в пределах горизонта
+    REMINDER_HORIZON_HOURS) для незавершенных задач. Куча загружается по
+    частичному индексу ix_tasks_open_deadline и обновляется из TaskCRUD,
+    поэтому стоимость зависит от числа задач с близким дедлайном, а не
+    от общего числа задач.
+
+    При нескольких процессах кучу держит каждый из них, а напоминание
+    отправляет тот, кто первым отметил задачу (UPDATE ... WHERE
+    reminder_sent_at IS NULL).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+        # Актуальное время напоминания по задаче; устаревшие записи кучи пропускаются
+        self._scheduled: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._horizon_end: Optional[datetime] = None
+
+    @property
+    def lead(self) -> timedelta:
+        return timedelta(minutes=settings.REMINDER_LEAD_MINUTES)
+
+    @property
+    def horizon(self) -> timedelta:
+        return timedelta(hours=settings.REMINDER_HORIZON_HOURS)
+
+    async def start(self):
+        if not settings.REMINDERS_ENABLED:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.load()
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._runner:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+        self._runner = None
+        self._loop = None
+
+    def load(self):
+        """Загрузка кучи по индексу: незавершенные задачи с дедлайном в горизонте"""
+        now = datetime.now(timezone.utc)
+        horizon_end = now + self.horizon + self.lead
+        db = SessionLocal()
+        try:
+            rows = db.query(Task.id, Task.deadline).filter(
+                text(OPEN_DEADLINE_CONDITION),
+                Task.deadline >= now,
+                Task.deadline <= horizon_end,
+                Task.reminder_sent_at.is_(None)
+            ).all()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._heap = []
+            self._scheduled = {}
+            for task_id, deadline in rows:
+                self._push(task_id, _as_utc(deadline) - self.lead)
+            self._horizon_end = horizon_end
+        logger.info(f"Загружено напоминаний о дедлайнах: {len(rows)}")
+
+    def _push(self, task_id: int, remind_at: datetime):
+        self._scheduled[task_id] = remind_at
+        heapq.heappush(self._heap, (remind_at, task_id))
+
+    def schedule(self, task: Task):
+        """Добавление/обновление напоминания по задаче (вызывается из CRUD)"""
+        if self._loop is None:
+            return
+        if task.status == TaskStatus.DONE or not task.deadline or task.reminder_sent_at:
+            self.cancel(task.id)
+            return
+
+        deadline = _as_utc(task.deadline)
+        if deadline < datetime.now(timezone.utc):
+            self.cancel(task.id)
+            return
+
+        remind_at = deadline - self.lead
+        with self._lock:
+            # Задачи за горизонтом подхватит следующая загрузка
+            if self._horizon_end and remind_at + self.lead > self._horizon_end:
+                self._scheduled.pop(task.id, None)
+                return
+            if self._scheduled.get(task.id) == remind_at:
+                return
+            self._push(task.id, remind_at)
+        self._wake()
+
+    def cancel(self, task_id: int):
+        """Отмена напоминания (задача выполнена, удалена или без дедлайна)"""
+        with self._lock:
+            self._scheduled.pop(task_id, None)
+
+    def _wake(self):
+        if self._loop is None or self._wakeup is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _pop_due(self, now: datetime) -> Tuple[List[int], Optional[datetime]]:
+        """Извлечение наступивших напоминаний и время следующего"""
+        due = []
+        with self._lock:
+            while self._heap:
+                remind_at, task_id = self._heap[0]
+                if self._scheduled.get(task_id) != remind_at:
+                    heapq.heappop(self._heap)  # Устаревшая запись
+                    continue
+                if remind_at > now:
+                    return due, remind_at
+                heapq.heappop(self._heap)
+                del self._scheduled[task_id]
+                due.append(task_id)
+        return due, None
+
+    @property
+    def pending(self) -> int:
+        return len(self._scheduled)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = datetime.now(timezone.utc)
+            if self._horizon_end and now + self.horizon / 2 + self.lead > self._horizon_end:
+                # Сдвигаем горизонт
+                await asyncio.to_thread(self.load)
+
+            due, next_at = self._pop_due(now)
+            for task_id in due:
+                try:
+                    await self._remind(task_id)
+                except Exception as e:
+                    logger.error(f"Ошибка отправки напоминания по задаче {task_id}: {e}")
+
+            timeout = (next_at - now).total_seconds() if next_at else self.horizon.total_seconds() / 2
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0.1))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _remind(self, task_id: int):
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            # Атомарная отметка: напоминание уже отправил другой процесс,
+            # или дедлайн перенесли, пока запись лежала в куче
+            claimed = db.execute(
+                update(Task)
+                .where(
+                    Task.id == task_id,
+                    Task.reminder_sent_at.is_(None),
+                    Task.status != TaskStatus.DONE,
+                    Task.deadline <= now + self.lead,
+                )
+                .values(reminder_sent_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+
+            task = db.query(Task).filter(Task.id == task_id).first()
+            if not task:
+                return
+            if not claimed:
+                self.schedule(task)
+                return
+
+            recipient = task.assignee or task.creator
+            if recipient:
+                await notification_service.notify_deadline(recipient, task)
+        finally:
+            db.close()
+
+
+# Глобальный экземпляр планировщика
+deadline_scheduler = DeadlineScheduler()
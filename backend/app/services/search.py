@@ -0,0 +1,322 @@
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.models.task import Task, TaskComment
+from app.models.user import UserRole
+import logging
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# --- Стемминг русского языка (алгоритм Snowball/Porter) ---
+
+_VOWELS = "аеиоуыэюя"
+
+
+def _endings(*groups: str) -> List[str]:
+    return sorted((e for g in groups for e in g.split()), key=len, reverse=True)
+
+
+_PERFECTIVE_GERUND_1 = _endings("в вши вшись")
+_PERFECTIVE_GERUND_2 = _endings("ив ивши ившись ыв ывши ывшись")
+_ADJECTIVE = _endings("ее ие ые ое ими ыми ей ий ый ой ем им ым ом его ого ему ому их ых ую юю ая яя ою ею")
+_PARTICIPLE_1 = _endings("ем нн вш ющ щ")
+_PARTICIPLE_2 = _endings("ивш ывш ующ")
+_REFLEXIVE = _endings("ся сь")
+_VERB_1 = _endings("ла на ете йте ли й л ем н ло но ет ют ны ть ешь нно")
+_VERB_2 = _endings("ила ыла ена ейте уйте ите или ыли ей уй ил ыл им ым ен ило ыло ено ят ует уют ит ыт ены ить ыть ишь ую ю")
+_NOUN = _endings("а ев ов ие ье е иями ями ами еи ии и ией ей ой ий й иям ям ием ем ам ом о у ах иях ях ы ь ию ью ю ия ья я")
+_SUPERLATIVE = _endings("ейш ейше")
+_DERIVATIONAL = _endings("ост ость")
+
+
+def _strip(word: str, start: int, endings: List[str], preceded_by: Optional[str] = None) -> Optional[str]:
+    """Удаление самого длинного окончания из списка в пределах региона [start:]"""
+    for ending in endings:
+        if word.endswith(ending) and len(word) - len(ending) >= start:
+            stem = word[:-len(ending)]
+            if preceded_by is not None:
+                if not stem or stem[-1] not in preceded_by or len(stem) - 1 < start:
+                    continue
+            return stem
+    return None
+
+
+def _strip_groups(word: str, start: int, group_1: List[str], group_2: List[str]) -> Optional[str]:
+    """Группа 1 требует перед окончанием «а» или «я», группа 2 - нет"""
+    candidates = [s for s in (_strip(word, start, group_1, "ая"), _strip(word, start, group_2)) if s is not None]
+    return min(candidates, key=len) if candidates else None
+
+
+@lru_cache(maxsize=100_000)
+def stem_ru(word: str) -> str:
+    """Основа русского слова; нерусские слова возвращаются как есть"""
+    word = word.lower().replace("ё", "е")
+    if not any(ch in _VOWELS for ch in word):
+        return word
+
+    # RV - после первой гласной; R2 - второй регион Snowball
+    rv = next(i for i, ch in enumerate(word) if ch in _VOWELS) + 1
+    r1 = next((i + 1 for i in range(1, len(word)) if word[i] not in _VOWELS and word[i - 1] in _VOWELS), len(word))
+    r2 = next((i + 1 for i in range(r1 + 1, len(word)) if word[i] not in _VOWELS and word[i - 1] in _VOWELS), len(word))
+
+    # Шаг 1
+    stem = _strip_groups(word, rv, _PERFECTIVE_GERUND_1, _PERFECTIVE_GERUND_2)
+    if stem is not None:
+        word = stem
+    else:
+        word = _strip(word, rv, _REFLEXIVE) or word
+        adjective = _strip(word, rv, _ADJECTIVE)
+        if adjective is not None:
+            word = _strip_groups(adjective, rv, _PARTICIPLE_1, _PARTICIPLE_2) or adjective
+        else:
+            verb = _strip_groups(word, rv, _VERB_1, _VERB_2)
+            if verb is not None:
+                word = verb
+            else:
+                word = _strip(word, rv, _NOUN) or word
+
+    # Шаг 2
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3
+    word = _strip(word, r2, _DERIVATIONAL) or word
+
+    # Шаг 4
+    if word.endswith("нн") and len(word) - 2 >= rv:
+        word = word[:-1]
+    else:
+        superlative = _strip(word, rv, _SUPERLATIVE)
+        if superlative is not None:
+            word = superlative
+            if word.endswith("нн"):
+                word = word[:-1]
+        elif word.endswith("ь") and len(word) - 1 >= rv:
+            word = word[:-1]
+
+    return word
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    return WORD_RE.findall(value.lower()) if value else []
+
+
+def stem_text(value: Optional[str]) -> str:
+    """Текст для индекса: основы слов через пробел"""
+    return " ".join(map(stem_ru, tokenize(value)))
+
+
+# --- Бэкенды поиска ---
+
+class TaskSearch:
+    """Полнотекстовый поиск по задачам и комментариям"""
+
+    def ensure_schema(self, engine: Engine, rebuild: bool = False):
+        pass
+
+    def refresh(self, conn, task_ids):
+        """Обновление индекса после изменения задач в обход ORM (архивация, восстановление)"""
+        pass
+
+    def search_ids(self, db: Session, query: str, user_id: int, user_role: UserRole,
+                   project_id: Optional[int], limit: int) -> List[Tuple[int, float]]:
+        """Пары (ID задачи, релевантность - больше лучше) по убыванию релевантности"""
+        raise NotImplementedError
+
+    def search(self, db: Session, query: str, user_id: int, user_role: UserRole,
+               project_id: Optional[int] = None, limit: int = 50) -> List[Task]:
+        """Задачи по релевантности с учетом правил видимости"""
+        if not tokenize(query):
+            return []
+        rows = self.search_ids(db, query, user_id, user_role, project_id, limit)
+        # С шардированием запрос выполняется в каждом шарде и строки идут шард за шардом:
+        # общий порядок и лимит - по релевантности
+        rows = sorted(rows, key=lambda row: row[1], reverse=True)[:limit]
+        ids = [task_id for task_id, _ in rows]
+        if not ids:
+            return []
+        tasks = {task.id: task for task in db.query(Task).filter(Task.id.in_(ids)).all()}
+        return [tasks[task_id] for task_id in ids if task_id in tasks]
+
+    @staticmethod
+    def _visibility(user_id: int, user_role: UserRole, project_id: Optional[int]):
+        clauses, params = [], {}
+        if user_role != UserRole.CREATOR:
+            clauses.append("(t.created_by = :user_id OR t.assigned_to = :user_id)")
+            params["user_id"] = user_id
+        if project_id is not None:
+            clauses.append("t.project_id = :project_id")
+            params["project_id"] = project_id
+        return "".join(f" AND {c}" for c in clauses), params
+
+
+class SQLiteTaskSearch(TaskSearch):
+    """SQLite FTS5. В индекс пишутся основы слов (стемминг на стороне Python),
+    запрос ищет основы по префиксу. Индекс обновляется в after_flush сессии.
+    """
+
+    ready = False
+
+    def ensure_schema(self, engine: Engine, rebuild: bool = False):
+        with engine.begin() as conn:
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_search'"
+            )).first()
+            self.ready = True
+            if exists and not rebuild:
+                return
+            conn.execute(text("DROP TABLE IF EXISTS task_search"))
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE task_search USING fts5("
+                "title, body, tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+            count = self.build(conn)
+            logger.info(f"Создан поисковый индекс задач: {count} задач")
+
+    def build(self, conn, batch_size: int = 5000) -> int:
+        """Полное построение индекса одним проходом по задачам (комментарии склеиваются в SQL)"""
+        rows = conn.execute(text(
+            "SELECT t.id, t.title, t.description, c.body FROM tasks t LEFT JOIN ("
+            "  SELECT task_id, group_concat(content, ' ') AS body FROM task_comments GROUP BY task_id"
+            ") c ON c.task_id = t.id"
+        ))
+        # Вставка напрямую курсором драйвера: на миллионах строк заметна каждая микросекунда
+        cursor = conn.connection.driver_connection.cursor()
+        count = 0
+        while True:
+            batch = rows.fetchmany(batch_size)
+            if not batch:
+                return count
+            cursor.executemany(
+                "INSERT INTO task_search (rowid, title, body) VALUES (?, ?, ?)",
+                [
+                    (task_id, stem_text(title), f"{stem_text(description)} {stem_text(body)}")
+                    for task_id, title, description, body in batch
+                ]
+            )
+            count += len(batch)
+
+    def refresh(self, conn, task_ids):
+        if self.ready:
+            self.reindex(conn, task_ids)
+
+    def reindex(self, conn, task_ids):
+        """Переиндексация задач (удаленные задачи убираются из индекса).
+
+        Четыре запроса на всю пачку, а не на каждую задачу: пакетное создание
+        задач (одобрение запросов) переиндексирует десятки задач за один flush.
+        """
+        ids = {"ids": list(task_ids)}
+        conn.execute(text("DELETE FROM task_search WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True)), ids)
+        rows = conn.execute(
+            text("SELECT id, title, description FROM tasks WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)), ids
+        ).all()
+        if not rows:
+            return
+        comments: Dict[int, List[str]] = defaultdict(list)
+        for task_id, content in conn.execute(
+            text("SELECT task_id, content FROM task_comments WHERE task_id IN :ids ORDER BY id").bindparams(bindparam("ids", expanding=True)),
+            ids
+        ):
+            comments[task_id].append(content)
+        conn.execute(
+            text("INSERT INTO task_search (rowid, title, body) VALUES (:id, :title, :body)"),
+            [
+                {
+                    "id": row.id,
+                    "title": stem_text(row.title),
+                    "body": " ".join([stem_text(row.description)] + [stem_text(c) for c in comments[row.id]]),
+                }
+                for row in rows
+            ]
+        )
+
+    @staticmethod
+    def build_match(query: str) -> str:
+        # Каждое слово - префиксный поиск по основе, слова объединяются через AND
+        return " ".join(f'"{stem_ru(token)}"*' for token in tokenize(query))
+
+    def search_ids(self, db, query, user_id, user_role, project_id, limit):
+        where, params = self._visibility(user_id, user_role, project_id)
+        rows = db.execute(text(
+            "SELECT t.id, bm25(task_search, 2.0, 1.0) AS score FROM task_search s JOIN tasks t ON t.id = s.rowid "
+            f"WHERE task_search MATCH :match{where} "
+            "ORDER BY score LIMIT :limit"
+        ), {"match": self.build_match(query), "limit": limit, **params})
+        # bm25 тем меньше, чем релевантнее
+        return [(task_id, -score) for task_id, score in rows]
+
+
+class PostgresTaskSearch(TaskSearch):
+    """PostgreSQL tsvector с русским словарем и GIN индексами по выражениям"""
+
+    TASK_VECTOR = "to_tsvector('russian', coalesce(t.title, '') || ' ' || coalesce(t.description, ''))"
+
+    def ensure_schema(self, engine: Engine, rebuild: bool = False):
+        # Индексы по выражениям PostgreSQL поддерживает сам - перестраивать нечего
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING GIN "
+                "(to_tsvector('russian', coalesce(title, '') || ' ' || coalesce(description, '')))"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_task_comments_search ON task_comments USING GIN "
+                "(to_tsvector('russian', content))"
+            ))
+
+    @staticmethod
+    def build_tsquery(query: str) -> str:
+        return " & ".join(f"{token}:*" for token in tokenize(query))
+
+    def search_ids(self, db, query, user_id, user_role, project_id, limit):
+        where, params = self._visibility(user_id, user_role, project_id)
+        vector = self.TASK_VECTOR.replace("t.", "tasks.")
+        rows = db.execute(text(
+            "WITH q AS (SELECT to_tsquery('russian', :tsquery) AS query), "
+            "matched AS ("
+            f"  SELECT id FROM tasks, q WHERE {vector} @@ q.query "
+            "  UNION "
+            "  SELECT task_id FROM task_comments, q WHERE to_tsvector('russian', content) @@ q.query"
+            ") "
+            f"SELECT t.id, ts_rank({self.TASK_VECTOR}, q.query) AS score "
+            f"FROM tasks t JOIN matched m ON m.id = t.id, q WHERE true{where} "
+            "ORDER BY score DESC LIMIT :limit"
+        ), {"tsquery": self.build_tsquery(query), "limit": limit, **params})
+        return [(task_id, score) for task_id, score in rows]
+
+
+def create_search(engine: Engine) -> TaskSearch:
+    if engine.dialect.name == "postgresql":
+        return PostgresTaskSearch()
+    return SQLiteTaskSearch()
+
+
+# Глобальный экземпляр поиска
+task_search = create_search(engine)
+
+
+@event.listens_for(Session, "after_flush")
+def _reindex_changed_tasks(session: Session, flush_context):
+    """Синхронизация FTS5 индекса с изменениями задач и комментариев"""
+    if not isinstance(task_search, SQLiteTaskSearch) or not task_search.ready:
+        return
+    # Индекс каждого шарда обновляется в его соединении (без шардирования - одна группа)
+    shard_of = getattr(session, "shard_of", lambda obj: None)
+    task_ids: Dict[Optional[str], Set[int]] = defaultdict(set)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Task) and obj.id is not None:
+            task_ids[shard_of(obj)].add(obj.id)
+        elif isinstance(obj, TaskComment) and obj.task_id is not None:
+            task_ids[shard_of(obj)].add(obj.task_id)
+    for shard, ids in task_ids.items():
+        bind_arguments = {"shard_id": shard} if shard is not None else None
+        task_search.reindex(session.connection(bind_arguments=bind_arguments), sorted(ids))
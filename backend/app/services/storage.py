@@ -0,0 +1,268 @@
+import hashlib
+from abc import ABC, abstractmethod
+import hmac
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Dict, Any, BinaryIO
+from urllib.parse import quote, urlencode, urlparse
+
+import aiofiles
+import httpx
+
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StorageError(Exception):
+    """Ошибка хранилища файлов"""
+
+
+class StorageBackend(ABC):
+    """Базовый интерфейс хранилища файлов.
+
+    Клиенты (веб-приложение, бот) загружают и скачивают файлы напрямую
+    по подписанным ссылкам, API только выдает ссылки и хранит метаданные.
+    """
+
+    def build_key(self, prefix: str, filename: Optional[str]) -> str:
+        """Генерация уникального ключа объекта"""
+        suffix = Path(filename).suffix.lower() if filename else ""
+        return f"{prefix.strip('/')}/{uuid.uuid4().hex}{suffix}"
+
+    @abstractmethod
+    def presign_upload(self, key: str, content_type: str, expires_in: Optional[int] = None) -> Dict[str, Any]:
+        """Подписанная ссылка для прямой загрузки (PUT)"""
+
+    @abstractmethod
+    def presign_download(self, key: str, expires_in: Optional[int] = None) -> str:
+        """Подписанная ссылка для прямого скачивания (GET)"""
+
+    @abstractmethod
+    async def save(self, key: str, fileobj: BinaryIO, content_type: str) -> int:
+        """Сохранение файла через API (устаревший путь загрузки)"""
+
+    @abstractmethod
+    async def size(self, key: str) -> Optional[int]:
+        """Размер объекта или None, если объект не найден"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Удаление объекта"""
+
+    @staticmethod
+    def _expires_in(expires_in: Optional[int]) -> int:
+        return expires_in or settings.STORAGE_PRESIGN_EXPIRE_SECONDS
+
+    @staticmethod
+    def _check_key(key: str) -> str:
+        if not key or key.startswith("/") or ".." in key.split("/"):
+            raise StorageError(f"Недопустимый ключ объекта: {key}")
+        return key
+
+
+class LocalStorage(StorageBackend):
+    """Хранилище на локальном диске.
+
+    Подписанные ссылки ведут на `/api/v1/files/{key}` и проверяются по HMAC
+    от SECRET_KEY, поэтому байты все еще идут через API. Подходит для
+    разработки и одиночных установок.
+    """
+
+    def __init__(self, root: str, base_url: str, secret_key: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+        self.secret_key = secret_key.encode()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / self._check_key(key)
+
+    def sign(self, method: str, key: str, expires: int) -> str:
+        message = f"{method.upper()}\n{key}\n{expires}".encode()
+        return hmac.new(self.secret_key, message, hashlib.sha256).hexdigest()
+
+    def verify(self, method: str, key: str, expires: int, signature: str) -> bool:
+        """Проверка подписи и срока действия ссылки"""
+        if expires < int(time.time()):
+            return False
+        return hmac.compare_digest(self.sign(method, key, expires), signature)
+
+    def _signed_url(self, method: str, key: str, expires_in: Optional[int]) -> str:
+        self._check_key(key)
+        expires = int(time.time()) + self._expires_in(expires_in)
+        query = urlencode({"expires": expires, "signature": self.sign(method, key, expires)})
+        return f"{self.base_url}/api/v1/files/{quote(key)}?{query}"
+
+    def presign_upload(self, key: str, content_type: str, expires_in: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            "url": self._signed_url("PUT", key, expires_in),
+            "method": "PUT",
+            "headers": {"Content-Type": content_type},
+            "expires_in": self._expires_in(expires_in),
+        }
+
+    def presign_download(self, key: str, expires_in: Optional[int] = None) -> str:
+        return self._signed_url("GET", key, expires_in)
+
+    async def save(self, key: str, fileobj: BinaryIO, content_type: str) -> int:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        async with aiofiles.open(path, "wb") as out:
+            while chunk := fileobj.read(1024 * 1024):
+                written += len(chunk)
+                await out.write(chunk)
+        return written
+
+    async def size(self, key: str) -> Optional[int]:
+        path = self.path_for(key)
+        return path.stat().st_size if path.is_file() else None
+
+    async def delete(self, key: str) -> bool:
+        path = self.path_for(key)
+        if path.is_file():
+            path.unlink()
+            return True
+        return False
+
+
+class S3Storage(StorageBackend):
+    """S3-совместимое хранилище (AWS S3, MinIO и т.п.).
+
+    Ссылки подписываются по AWS Signature V4 (query string), поэтому
+    отдельный SDK не нужен. Внутренние операции API (HEAD, DELETE, PUT)
+    выполняются через те же подписанные ссылки на внутренний адрес.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        public_endpoint_url: Optional[str] = None,
+    ):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.public_endpoint_url = (public_endpoint_url or endpoint_url).rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+
+    def presign(
+        self,
+        method: str,
+        key: str,
+        expires_in: Optional[int] = None,
+        endpoint_url: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> str:
+        """Подпись ссылки по AWS SigV4 с UNSIGNED-PAYLOAD"""
+        self._check_key(key)
+        endpoint = endpoint_url or self.public_endpoint_url
+        parsed = urlparse(endpoint)
+        now = now or datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        datestamp = now.strftime("%Y%m%d")
+        scope = f"{datestamp}/{self.region}/s3/aws4_request"
+
+        canonical_uri = f"{parsed.path.rstrip('/')}/{quote(self.bucket)}/{quote(key, safe='/~')}"
+        params = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self.access_key}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(self._expires_in(expires_in)),
+            "X-Amz-SignedHeaders": "host",
+        }
+        canonical_query = "&".join(
+            f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(params.items())
+        )
+        canonical_request = "\n".join([
+            method.upper(),
+            canonical_uri,
+            canonical_query,
+            f"host:{parsed.netloc}\n",
+            "host",
+            "UNSIGNED-PAYLOAD",
+        ])
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+
+        signing_key = f"AWS4{self.secret_key}".encode()
+        for part in (datestamp, self.region, "s3", "aws4_request"):
+            signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        return f"{parsed.scheme}://{parsed.netloc}{canonical_uri}?{canonical_query}&X-Amz-Signature={signature}"
+
+    def presign_upload(self, key: str, content_type: str, expires_in: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            "url": self.presign("PUT", key, expires_in),
+            "method": "PUT",
+            "headers": {"Content-Type": content_type},
+            "expires_in": self._expires_in(expires_in),
+        }
+
+    def presign_download(self, key: str, expires_in: Optional[int] = None) -> str:
+        return self.presign("GET", key, expires_in)
+
+    def _internal_url(self, method: str, key: str) -> str:
+        return self.presign(method, key, 60, endpoint_url=self.endpoint_url)
+
+    async def save(self, key: str, fileobj: BinaryIO, content_type: str) -> int:
+        data = fileobj.read()
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            response = await client.put(
+                self._internal_url("PUT", key),
+                content=data,
+                headers={"Content-Type": content_type},
+            )
+        if response.status_code >= 300:
+            raise StorageError(f"Ошибка загрузки в S3: {response.status_code} - {response.text}")
+        return len(data)
+
+    async def size(self, key: str) -> Optional[int]:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.head(self._internal_url("HEAD", key))
+        if response.status_code == 404:
+            return None
+        if response.status_code >= 300:
+            raise StorageError(f"Ошибка запроса к S3: {response.status_code}")
+        return int(response.headers.get("content-length", 0))
+
+    async def delete(self, key: str) -> bool:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.delete(self._internal_url("DELETE", key))
+        return response.status_code in (200, 204)
+
+
+def create_storage() -> StorageBackend:
+    """Создание хранилища по настройкам"""
+    if settings.STORAGE_BACKEND == "s3":
+        if not (settings.S3_ENDPOINT_URL and settings.S3_ACCESS_KEY and settings.S3_SECRET_KEY):
+            raise StorageError("Для STORAGE_BACKEND=s3 нужны S3_ENDPOINT_URL, S3_ACCESS_KEY и S3_SECRET_KEY")
+        return S3Storage(
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            bucket=settings.S3_BUCKET,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            region=settings.S3_REGION,
+            public_endpoint_url=settings.S3_PUBLIC_ENDPOINT_URL,
+        )
+    return LocalStorage(
+        root=settings.STORAGE_LOCAL_DIR,
+        base_url=settings.BACKEND_URL,
+        secret_key=settings.SECRET_KEY,
+    )
+
+
+# Глобальный экземпляр хранилища
+storage = create_storage()
@@ -0,0 +1,341 @@
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, time, timezone, tzinfo
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.core.config import settings
+from app.models.task import TaskPriority
+from app.services.search import stem_ru, tokenize
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_FORMAT = "%Y-%m-%d %H:%M"
+# Короткая фраза без префикса команды еще считается готовым названием
+MAX_TITLE_WORDS = 8
+
+COMMAND_RE = re.compile(
+    r"^\s*(?:(?:(?:создай|создать|добавь|добавить|поставь|новая)\s+)?(?:задач[аиу]|todo|task)\b|напомни(?:ть)?\b)\s*[:\-—]?\s*",
+    re.IGNORECASE
+)
+
+PRIORITY_RULES: List[Tuple[TaskPriority, re.Pattern]] = [
+    # «не важно» проверяется раньше «важно»
+    (TaskPriority.LOW, re.compile(r"\b(?:не\s*важн\w*|не\s+срочн\w*|потом|когда будет время|не спеша|не торопясь)\b")),
+    (TaskPriority.URGENT, re.compile(r"\b(?:срочн\w*|немедленно|asap|как можно скорее)\b")),
+    (TaskPriority.HIGH, re.compile(r"\b(?:важн\w*|приоритетн\w*|критичн\w*|необходимо)\b")),
+]
+
+WEEKDAYS = {"понедельник": 0, "вторник": 1, "сред": 2, "четверг": 3, "пятниц": 4, "суббот": 5, "воскресень": 6}
+# Окончания падежных форм: голая основа совпала бы с «средство», «средний», «субботник»
+_MASCULINE = r"(?:а|у|ом)?"
+WEEKDAY_ENDINGS = {
+    "понедельник": _MASCULINE, "вторник": _MASCULINE, "сред": r"[аеуы]", "четверг": _MASCULINE,
+    "пятниц": r"[аеуы]", "суббот": r"[аеуы]", "воскресень": r"[еяю]",
+}
+MONTHS = {
+    "января": 1, "февраля": 2, "марта": 3, "апреля": 4, "мая": 5, "июня": 6,
+    "июля": 7, "августа": 8, "сентября": 9, "октября": 10, "ноября": 11, "декабря": 12
+}
+NUMBER_WORDS = {"один": 1, "одну": 1, "одна": 1, "два": 2, "две": 2, "пару": 2, "три": 3,
+                "четыре": 4, "пять": 5, "шесть": 6, "семь": 7, "десять": 10}
+DAYPARTS = {"утром": 9, "днем": 13, "в обед": 13, "вечером": 19}
+
+_PREP = r"(?:(?:до|к|ко|в|во|на)\s+)?"
+
+RELATIVE_DAY_RE = re.compile(_PREP + r"\b(послезавтра|завтра|сегодня)\b")
+# Группа 2 - основа дня недели, окончание проверяется ретроспективной проверкой по основе
+WEEKDAY_RE = re.compile(
+    _PREP + r"\b(?:(следующ\w*)\s+)?(" + "|".join(WEEKDAYS) + r")(?:" + "|".join(
+        f"(?<={stem}){ending}" for stem, ending in WEEKDAY_ENDINGS.items()
+    ) + r")\b"
+)
+DATE_RE = re.compile(_PREP + r"\b(\d{1,2})\.(\d{1,2})(?:\.(\d{2}|\d{4}))?\b")
+MONTH_DATE_RE = re.compile(_PREP + r"\b(\d{1,2})(?:-?го)?\s+(" + "|".join(MONTHS) + r")\b")
+WEEK_END_RE = re.compile(r"\b(?:до|к|в)\s+конц[ау]\s+(недели|месяца)\b")
+IN_RE = re.compile(
+    r"\bчерез\s+(?:(\d+|" + "|".join(NUMBER_WORDS) + r")\s+)?(полчаса|минут\w*|час\w*|дн\w*|день|недел\w*|месяц\w*)"
+)
+DAYPART_WORDS = r"(?P<daypart>утра|дня|вечера|ночи)"
+TIME_PATTERNS = [
+    # «в 19:30», «к 9.00 утра» - время с минутами, дальше что угодно
+    re.compile(r"\b(?:в|к|до|на)\s+(?P<hour>\d{1,2})[:.](?P<minute>\d{2})(?!\d)(?:\s*" + DAYPART_WORDS + ")?"),
+    # «в 7 вечера», «к 5 часам»
+    re.compile(r"\b(?:в|к|до|на)\s+(?P<hour>\d{1,2})(?:\s*(?:час\w*\s*)?" + DAYPART_WORDS + r"|\s*час\w*)"),
+    # «к 10 купить цемент», кроме «к 10 числа», «до 15-го»
+    re.compile(r"\b(?:к|до)\s+(?P<hour>\d{1,2})(?!\d|[:.]\d|-?го\b|\s+числ)(?=\s*(?:\w|[,.;!?]|$))"),
+    # «в 5» - только перед концом фразы или днем: «в 5 квартирах» - не время
+    re.compile(r"\b(?:в|на)\s+(?P<hour>\d{1,2})(?=\s*(?:[,.;!?]|$|сегодня|завтра|послезавтра))"),
+]
+# Число, похожее на время, осталось в названии - разбор ненадежен
+LEFTOVER_TIME_RE = re.compile(r"\b\d{1,2}[:.]\d{2}\b|\b(?:в|к|до|на)\s+\d{1,2}\b(?![.:]\d)")
+DAYPART_RE = re.compile(r"\b(" + "|".join(DAYPARTS) + r")\b")
+
+
+@lru_cache(maxsize=1)
+def task_timezone() -> tzinfo:
+    """Часовой пояс пользователей (TASK_TIMEZONE)"""
+    try:
+        return ZoneInfo(settings.TASK_TIMEZONE)
+    except ZoneInfoNotFoundError:
+        logger.warning(f"Неизвестный часовой пояс {settings.TASK_TIMEZONE}, используется UTC")
+        return timezone.utc
+
+
+def local_now() -> datetime:
+    """Текущее время в часовом поясе пользователей (naive, как дедлайны парсера и модели)"""
+    return datetime.now(task_timezone()).replace(tzinfo=None, second=0, microsecond=0)
+
+
+def deadline_to_utc(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """Дедлайн парсера или модели (местное время TASK_TIMEZONE) - в UTC для записи в БД"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            logger.warning(f"Не удалось разобрать дедлайн: {value}")
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=task_timezone())
+    return value.astimezone(timezone.utc)
+
+
+def to_local(value: datetime) -> datetime:
+    """Время из БД (naive - UTC) в часовом поясе пользователей"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(task_timezone())
+
+
+@dataclass
+class ParsedTask:
+    """Результат локального разбора текста задачи; None - поле не удалось определить"""
+    original_text: str
+    title: Optional[str] = None
+    priority: Optional[TaskPriority] = None
+    deadline: Optional[datetime] = None
+    project_id: Optional[int] = None
+    # Признак поручения: префикс команды, срок, приоритет или упомянутый проект
+    has_task_signal: bool = False
+    spans: List[Tuple[int, int]] = field(default_factory=list, repr=False)
+
+    @property
+    def missing(self) -> List[str]:
+        """Поля, которые должна заполнить модель"""
+        return [name for name in ("title", "project_id") if getattr(self, name) is None]
+
+    @property
+    def is_complete(self) -> bool:
+        # Короткий текст без признаков поручения («спасибо», «ок») решает модель
+        return not self.missing and self.has_task_signal
+
+    def known_fields(self) -> Dict[str, Any]:
+        known = {}
+        if self.title is not None:
+            known["title"] = self.title
+        if self.project_id is not None:
+            known["project_id"] = self.project_id
+        if self.priority is not None:
+            known["priority"] = self.priority.value
+        if self.deadline is not None:
+            known["deadline"] = self.deadline.strftime(DEADLINE_FORMAT)
+        return known
+
+    def to_task_data(self) -> Dict[str, Any]:
+        """Данные в формате ответа модели (analyze_task_request)"""
+        return {
+            "title": self.title,
+            "description": self.original_text.strip(),
+            "project_id": self.project_id,
+            "priority": (self.priority or TaskPriority.MEDIUM).value,
+            "deadline": self.deadline.strftime(DEADLINE_FORMAT) if self.deadline else None,
+            "questions": [],
+        }
+
+    def merge(self, model_output: Dict[str, Any]) -> Dict[str, Any]:
+        """Ответ модели с приоритетом полей, найденных парсером"""
+        result = dict(model_output)
+        result.update(self.known_fields())
+        return result
+
+
+class TaskTextParser:
+    """Детерминированный разбор коротких команд: приоритет, дедлайн, проект и название"""
+
+    def __init__(self, now: Optional[datetime] = None):
+        self.now = now or local_now()
+
+    def parse(self, text: str, user_projects: List[Dict]) -> ParsedTask:
+        lowered = text.lower().replace("ё", "е")
+        parsed = ParsedTask(original_text=text)
+
+        command = COMMAND_RE.match(lowered)
+        if command:
+            parsed.spans.append(command.span())
+
+        parsed.priority = self._priority(lowered, parsed.spans)
+        parsed.deadline = self._deadline(lowered, parsed.spans)
+        parsed.project_id = self._project(lowered, user_projects, parsed.spans)
+        parsed.has_task_signal = len(parsed.spans) > 0
+        parsed.title = self._title(text, parsed.spans, is_command=bool(command))
+        if parsed.title and LEFTOVER_TIME_RE.search(parsed.title.lower()):
+            # «в 10 купить» не разобрано как время: название и дедлайн определит модель
+            parsed.title = None
+            parsed.deadline = None
+        return parsed
+
+    def _priority(self, text: str, spans: List[Tuple[int, int]]) -> Optional[TaskPriority]:
+        for priority, pattern in PRIORITY_RULES:
+            matches = list(pattern.finditer(text))
+            if matches:
+                spans.extend(m.span() for m in matches)
+                return priority
+        return None
+
+    def _deadline(self, text: str, spans: List[Tuple[int, int]]) -> Optional[datetime]:
+        day = self._day(text, spans)
+
+        clock = None
+        match = next(
+            (m for pattern in TIME_PATTERNS for m in pattern.finditer(text) if not _overlaps(m.span(), spans)),
+            None
+        )
+        if match:
+            groups = match.groupdict()
+            hour, minute = int(groups["hour"]), int(groups.get("minute") or 0)
+            daypart = groups.get("daypart")
+            if daypart in ("дня", "вечера") and hour < 12:
+                hour += 12
+            elif daypart == "ночи" and hour == 12:
+                hour = 0
+            if hour < 24 and minute < 60:
+                clock = time(hour, minute)
+                spans.append(match.span())
+        if clock is None:
+            match = DAYPART_RE.search(text)
+            if match:
+                clock = time(DAYPARTS[match.group(1)], 0)
+                spans.append(match.span())
+
+        if isinstance(day, datetime):  # «через N часов» - точное время
+            return day
+        if day is None and clock is None:
+            return None
+        if day is None:
+            candidate = datetime.combine(self.now.date(), clock)
+            return candidate if candidate > self.now else candidate + timedelta(days=1)
+        return datetime.combine(day, clock or time(settings.TASK_DEFAULT_DEADLINE_HOUR, 0))
+
+    def _day(self, text: str, spans: List[Tuple[int, int]]):
+        today = self.now.date()
+
+        match = RELATIVE_DAY_RE.search(text)
+        if match:
+            spans.append(match.span())
+            return today + timedelta(days={"сегодня": 0, "завтра": 1, "послезавтра": 2}[match.group(1)])
+
+        match = IN_RE.search(text)
+        if match:
+            spans.append(match.span())
+            amount = match.group(1)
+            count = int(amount) if amount and amount.isdigit() else NUMBER_WORDS.get(amount, 1)
+            unit = match.group(2)
+            if unit == "полчаса":
+                return self.now + timedelta(minutes=30)
+            if unit.startswith("минут"):
+                return self.now + timedelta(minutes=count)
+            if unit.startswith("час"):
+                return self.now + timedelta(hours=count)
+            if unit.startswith("недел"):
+                return today + timedelta(weeks=count)
+            if unit.startswith("месяц"):
+                return today + timedelta(days=30 * count)
+            return today + timedelta(days=count)
+
+        match = WEEKDAY_RE.search(text)
+        if match:
+            spans.append(match.span())
+            weekday = WEEKDAYS[match.group(2)]
+            if match.group(1):  # «в следующую пятницу» - на следующей календарной неделе
+                return today - timedelta(days=today.weekday()) + timedelta(weeks=1, days=weekday)
+            return today + timedelta(days=(weekday - today.weekday()) % 7 or 7)
+
+        match = WEEK_END_RE.search(text)
+        if match:
+            spans.append(match.span())
+            if match.group(1) == "недели":
+                return today + timedelta(days=(4 - today.weekday()) % 7)
+            next_month = (today.replace(day=28) + timedelta(days=4)).replace(day=1)
+            return next_month - timedelta(days=1)
+
+        match = MONTH_DATE_RE.search(text)
+        if match:
+            day = self._calendar_day(int(match.group(1)), MONTHS[match.group(2)], None)
+            if day:
+                spans.append(match.span())
+                return day
+
+        match = DATE_RE.search(text)
+        if match:
+            day = self._calendar_day(int(match.group(1)), int(match.group(2)), match.group(3))
+            if day:
+                spans.append(match.span())
+                return day
+        return None
+
+    def _calendar_day(self, day: int, month: int, year: Optional[str]):
+        today = self.now.date()
+        try:
+            if year:
+                return today.replace(year=int(year) + (2000 if len(year) == 2 else 0), month=month, day=day)
+            candidate = today.replace(month=month, day=day)
+            return candidate if candidate >= today else candidate.replace(year=today.year + 1)
+        except ValueError:
+            return None
+
+    def _project(self, text: str, user_projects: List[Dict], spans: List[Tuple[int, int]]) -> Optional[int]:
+        mentioned = []
+        for project in user_projects:
+            # Слова названия сравниваются по основе: «для стройки» -> «Стройка»
+            words = tokenize(project["name"])
+            if not words:
+                continue
+            name = r"\s+".join(re.escape(stem_ru(word)) + r"\w*" for word in words)
+            match = re.search(r"(?:\b(?:в|во|на|для|по|при|у)\s+)?(?:проект\w*\s+)?\b" + name, text)
+            if match:
+                mentioned.append((project["id"], match.span()))
+        if len(mentioned) == 1:
+            spans.append(mentioned[0][1])
+            return mentioned[0][0]
+        if len(user_projects) == 1:
+            return user_projects[0]["id"]
+        return None
+
+    def _title(self, text: str, spans: List[Tuple[int, int]], is_command: bool) -> Optional[str]:
+        # Вырезаем найденные дату, приоритет, проект и префикс команды
+        chars = list(text)
+        for start, end in spans:
+            for i in range(start, end):
+                chars[i] = " "
+        title = re.sub(r"\s+", " ", "".join(chars))
+        title = re.sub(r"\s+([,.;!?])", r"\1", title)
+        title = re.sub(r"^[\s,.;:!?\-—]+|[\s,.;:!?\-—]+$", "", title)
+        title = re.sub(r"[,;]\s*(?=[,;]|$)", "", title).strip()
+        if not title:
+            return None
+        if not is_command and (len(title.split()) > MAX_TITLE_WORDS or re.search(r"[.!?]\s", title)):
+            # Свободный текст - название сформулирует модель
+            return None
+        return title[0].upper() + title[1:]
+
+
+def _overlaps(span: Tuple[int, int], spans: List[Tuple[int, int]]) -> bool:
+    return any(span[0] < end and start < span[1] for start, end in spans)
+
+
+def parse_task_text(text: str, user_projects: List[Dict], now: Optional[datetime] = None) -> ParsedTask:
+    return TaskTextParser(now).parse(text, user_projects)
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.crud.approval import approval_crud
+from app.crud.task import task_crud
+from app.crud.user import user_crud
+from app.models.approval import ApprovalRequest, ActionType
+from app.models.task import Task
+from app.models.user import User, UserRole
+from app.schemas.approval import ApprovalCreate, CreateTaskAction
+from app.schemas.task import TaskCreate
+from app.services.notifications import notification_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Telegram ID создателя, одобряющего задачи прорабов
+CREATOR_TELEGRAM_ID = 434532312
+
+
+class TaskCreationForbidden(Exception):
+    """Роль пользователя не позволяет создавать задачи"""
+
+
+class ApproverNotFound(Exception):
+    """Создатель, одобряющий задачи прорабов, не найден в системе"""
+
+
+@dataclass
+class TaskSubmission:
+    """Итог создания задачи от имени пользователя"""
+    task: Optional[Task] = None  # Создана сразу (создатель)
+    approval: Optional[ApprovalRequest] = None  # Отправлена на одобрение (прораб)
+    approver: Optional[User] = None
+    duplicate: bool = False  # Такая же задача уже ожидает одобрения
+
+
+def submit_task(db: Session, task: TaskCreate, user: User) -> TaskSubmission:
+    """Задача от имени пользователя по правилам его роли, без коммита.
+
+    Создатель создает задачу сразу, прораб - запрос на одобрение создателю,
+    остальным создание запрещено. Общая логика POST /tasks/ и AI задач;
+    после коммита вызывающий вызывает announce_submission.
+    """
+    if user.role not in (UserRole.CREATOR, UserRole.FOREMAN):
+        raise TaskCreationForbidden("Недостаточно прав для создания задач")
+
+    if user.role == UserRole.CREATOR:
+        return TaskSubmission(task=task_crud.create_many(db, [(task, user.id)])[0])
+
+    creator = user_crud.get_by_telegram_id(db, CREATOR_TELEGRAM_ID)
+    if not creator:
+        raise ApproverNotFound("Создатель не найден в системе")
+
+    # Повторная отправка той же задачи не создает второй запрос
+    pending = approval_crud.get_pending_task_request(db, user.id, task.project_id, task.title)
+    if pending:
+        return TaskSubmission(approval=pending, approver=creator, duplicate=True)
+
+    approval = approval_crud.add(db, ApprovalCreate(
+        requester_id=user.id,
+        approver_id=creator.id,
+        action_type=ActionType.CREATE_TASK,
+        entity_type="task",
+        entity_id=0,  # Будет обновлен после создания задачи
+        action_data=CreateTaskAction(**task.model_dump(include=set(CreateTaskAction.model_fields))).model_dump(mode="json"),
+        project_id=task.project_id
+    ))
+    return TaskSubmission(approval=approval, approver=creator)
+
+
+async def announce_submission(submission: TaskSubmission):
+    """События, напоминания и уведомление создателя после коммита"""
+    if submission.task is not None:
+        task_crud.announce_created([submission.task])
+        logger.info(f"Создана задача {submission.task.id}")
+    elif submission.approval is not None and not submission.duplicate:
+        approval_crud.announce_created(submission.approval)
+        await notification_service.notify_approval_request(submission.approver, submission.approval)
@@ -0,0 +1,305 @@
+"""Нагрузочный тест API: латентность (p50/p95/p99) и пропускная способность по эндпоинтам.
+
+База заполняется синтетическими данными (benchmarks/seed.py) во временном каталоге,
+затем каждый эндпоинт прогоняется на нескольких уровнях конкурентности:
+- asgi    - приложение в том же процессе через httpx.ASGITransport (без сети);
+- uvicorn - настоящий uvicorn в отдельном процессе, запросы по TCP.
+
+Запуск из каталога backend:
+    python -m benchmarks.api_bench --tasks 20000 --concurrency 1,8,32
+    python -m benchmarks.api_bench --baseline benchmarks/baseline.json --fail-on-regression
+    python -m benchmarks.api_bench --baseline benchmarks/baseline.json --update-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Окружение приложения под нагрузочным тестом: без фоновых рассылок, внешних сервисов и отладочного вывода
+BENCH_ENV = {
+    "ENVIRONMENT": "production",
+    "LOG_LEVEL": "ERROR",
+    "REMINDERS_ENABLED": "false",
+    "BOT_TOKEN": "0:benchmark",
+    "OPENAI_API_KEY": "benchmark",
+    "SECRET_KEY": "benchmark-secret",
+}
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: Callable[[random.Random], str]
+    user: str  # "creator", "foreman" или "worker"
+    body: Optional[Callable[[random.Random], dict]] = None
+
+
+def build_endpoints(seeded) -> List[Endpoint]:
+    from benchmarks.seed import task_description, task_title, OBJECTS
+
+    def random_task(rng):
+        return f"/api/v1/tasks/{rng.randint(seeded.max_task_id - seeded.counts['tasks'] + 1, seeded.max_task_id)}"
+
+    def new_task(rng):
+        return {
+            "title": task_title(rng),
+            "description": task_description(rng),
+            "priority": "medium",
+            "project_id": rng.choice(seeded.project_ids),
+        }
+
+    return [
+        Endpoint("health", "GET", lambda rng: "/health", "worker"),
+        Endpoint("tasks.list", "GET", lambda rng: "/api/v1/tasks/", "worker"),
+        Endpoint("tasks.get", "GET", random_task, "creator"),
+        Endpoint("tasks.changes", "GET", lambda rng: f"/api/v1/tasks/changes?since={rng.randint(0, seeded.counts['tasks'])}&limit=100", "creator"),
+        Endpoint("tasks.search", "GET", lambda rng: f"/api/v1/tasks/search?q={rng.choice(OBJECTS)}&limit=20", "foreman"),
+        Endpoint("projects.list", "GET", lambda rng: "/api/v1/projects/", "foreman"),
+        Endpoint("admin.approvals.pending", "GET", lambda rng: "/api/v1/admin/approvals/pending", "creator"),
+        Endpoint("tasks.create", "POST", lambda rng: "/api/v1/tasks/", "creator", new_task),
+    ]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_level(client: httpx.AsyncClient, endpoint: Endpoint, headers: Dict[str, str],
+                    concurrency: int, requests: int, seed: int) -> dict:
+    """`requests` запросов к эндпоинту, не более `concurrency` одновременно"""
+    rng = random.Random(seed)
+    plan = [(endpoint.path(rng), endpoint.body(rng) if endpoint.body else None) for _ in range(requests)]
+    queue = iter(plan)
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def worker():
+        for path, body in queue:
+            started = time.perf_counter()
+            try:
+                response = await client.request(endpoint.method, path, headers=headers, json=body)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if not isinstance(status, int) or status >= 400:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "endpoint": endpoint.name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+    }
+
+
+async def run_suite(client: httpx.AsyncClient, endpoints: List[Endpoint], tokens: Dict[str, str],
+                    transport: str, levels: List[int], requests: int, warmup: int) -> List[dict]:
+    results = []
+    for endpoint in endpoints:
+        headers = {"Authorization": f"Bearer {tokens[endpoint.user]}"}
+        await run_level(client, endpoint, headers, 1, warmup, seed=0)
+        for concurrency in levels:
+            row = await run_level(client, endpoint, headers, concurrency, requests, seed=concurrency)
+            row["transport"] = transport
+            results.append(row)
+            print(format_row(row), flush=True)
+    return results
+
+
+async def bench_asgi(endpoints, tokens, levels, requests, warmup) -> List[dict]:
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_suite(client, endpoints, tokens, "asgi", levels, requests, warmup)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def bench_uvicorn(workdir: Path, endpoints, tokens, levels, requests, warmup) -> List[dict]:
+    port = free_port()
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(BACKEND_DIR), os.environ.get("PYTHONPATH")]))}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=workdir, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            for _ in range(300):
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn завершился с кодом {server.returncode}")
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn не запустился за 30 секунд")
+            return await run_suite(client, endpoints, tokens, "uvicorn", levels, requests, warmup)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def format_row(row: dict) -> str:
+    errors = sum(row["errors"].values())
+    return (
+        f"{row['transport']:<8} {row['endpoint']:<26} c={row['concurrency']:<4} "
+        f"{row['rps']:>8.1f} rps  p50 {row['p50_ms']:>8.2f}  p95 {row['p95_ms']:>8.2f}  "
+        f"p99 {row['p99_ms']:>8.2f} ms" + (f"  ошибок: {errors} {row['errors']}" if errors else "")
+    )
+
+
+def result_key(row: dict) -> str:
+    return f"{row['transport']}:{row['endpoint']}:c{row['concurrency']}"
+
+
+def compare(results: List[dict], baseline: dict, tolerance: float) -> List[str]:
+    """Регрессии относительно базовой линии: p95 выросла или rps упал больше чем на `tolerance`"""
+    previous = {result_key(row): row for row in baseline.get("results", [])}
+    regressions = []
+    for row in results:
+        old = previous.get(result_key(row))
+        if old is None:
+            continue
+        if row["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{result_key(row)}: p95 {old['p95_ms']} -> {row['p95_ms']} мс")
+        if row["rps"] < old["rps"] * (1 - tolerance):
+            regressions.append(f"{result_key(row)}: rps {old['rps']} -> {row['rps']}")
+        if sum(row["errors"].values()) > sum(old["errors"].values()):
+            regressions.append(f"{result_key(row)}: ошибки {old['errors']} -> {row['errors']}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест API")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--approvals", type=int, default=2000)
+    parser.add_argument("--concurrency", default="1,8,32", help="Уровни конкурентности через запятую")
+    parser.add_argument("--requests", type=int, default=100, help="Запросов на эндпоинт и уровень")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--transport", default="asgi,uvicorn", help="asgi, uvicorn или оба через запятую")
+    parser.add_argument("--endpoints", default="", help="Подстроки имен эндпоинтов через запятую")
+    parser.add_argument("--workdir", help="Каталог базы (по умолчанию временный)")
+    parser.add_argument("--output", help="Куда записать результаты в JSON")
+    parser.add_argument("--baseline", help="JSON базовой линии для сравнения")
+    parser.add_argument("--update-baseline", action="store_true", help="Перезаписать базовую линию результатами")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Допустимое ухудшение (0.25 = 25%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    levels = [int(level) for level in args.concurrency.split(",") if level]
+    transports = [name.strip() for name in args.transport.split(",") if name.strip()]
+    baseline_path = Path(args.baseline).resolve() if args.baseline else None
+    output_path = Path(args.output).resolve() if args.output else None
+
+    # Путь к SQLite в настройках относительный - приложение импортируется уже из каталога с базой
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="api-bench-")).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    os.chdir(workdir)
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from app.core.database import engine
+    from app.services.auth import create_access_token
+    from benchmarks.seed import SeedScale, seed_database
+
+    scale = SeedScale(users=args.users, projects=args.projects, tasks=args.tasks, approvals=args.approvals)
+    started = time.perf_counter()
+    seeded = seed_database(engine, scale)
+    print(f"База {workdir}: {seeded.counts} за {time.perf_counter() - started:.1f} с", flush=True)
+
+    tokens = {
+        "creator": create_access_token(seeded.creator_telegram_id),
+        "foreman": create_access_token(seeded.foreman_telegram_ids[0]),
+        "worker": create_access_token(seeded.worker_telegram_ids[0]),
+    }
+    endpoints = build_endpoints(seeded)
+    if args.endpoints:
+        wanted = [name.strip() for name in args.endpoints.split(",")]
+        endpoints = [e for e in endpoints if any(name in e.name for name in wanted)]
+
+    results = []
+    if "asgi" in transports:
+        results += asyncio.run(bench_asgi(endpoints, tokens, levels, args.requests, args.warmup))
+    if "uvicorn" in transports:
+        engine.dispose()
+        results += asyncio.run(bench_uvicorn(workdir, endpoints, tokens, levels, args.requests, args.warmup))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": asdict(scale),
+            "requests": args.requests,
+        },
+        "results": results,
+    }
+    if output_path:
+        output_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    exit_code = 0
+    if baseline_path and baseline_path.exists() and not args.update_baseline:
+        regressions = compare(results, json.loads(baseline_path.read_text(encoding="utf-8")), args.tolerance)
+        if regressions:
+            print(f"\nРегрессии относительно {baseline_path} (допуск {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            exit_code = 1 if args.fail_on_regression else 0
+        else:
+            print(f"\nРегрессий относительно {baseline_path} нет")
+    if baseline_path and args.update_baseline:
+        baseline_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nБазовая линия записана: {baseline_path}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,420 @@
+"""Генератор синтетических данных продакшен-масштаба.
+
+Пользователи, проекты, участники, задачи, комментарии, вложения и запросы на
+одобрение вставляются пачками, минуя ORM и его события: в SQLite - напрямую
+через executemany драйвера, в PostgreSQL - через Core insert (insertmanyvalues).
+ID задаются явно, поэтому строки генерируются потоком, без чтения обратно.
+
+Запуск из каталога backend:
+    python -m benchmarks.seed --tasks 1000000
+    python -m benchmarks.seed --database sqlite:///./load.db --drop --tasks 200000 --users 2000
+"""
+import argparse
+import itertools
+import json
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import JSON, Table, create_engine, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.models import Base
+from app.models.approval import ActionType, ApprovalRequest, ApprovalStatus
+from app.models.project import Project
+from app.models.sync import SyncCounter
+from app.models.task import Task, TaskAttachment, TaskComment, TaskPriority, TaskStatus
+from app.models.user import User, UserRole
+from app.models.user_project import ProjectRole, UserProject
+
+CREATOR_TELEGRAM_ID = 434532312
+HOUR = 3600.0
+DAY = 24 * HOUR
+TEXT_POOL = 4096
+
+OBJECTS = ["фундамент", "кровля", "фасад", "котлован", "перекрытие", "лестница", "стяжка", "опалубка",
+           "электрика", "вентиляция", "водопровод", "отопление", "окна", "двери", "забор", "благоустройство"]
+ACTIONS = ["залить", "проверить", "утеплить", "смонтировать", "демонтировать", "покрасить", "заказать материалы для",
+           "согласовать", "принять", "выровнять", "зашить", "подключить"]
+DETAILS = ["по проекту", "до приезда техники", "с актом скрытых работ", "после осмотра прораба",
+           "с фотоотчетом", "по замечаниям технадзора", "на втором этаже", "в секции Б"]
+PROJECT_NAMES = ["ЖК Северный", "Склад Логистик", "Школа №", "Коттедж", "Торговый центр", "Гараж", "Офис", "Стройка"]
+COLORS = ["#3B82F6", "#10B981", "#F59E0B", "#EF4444", "#8B5CF6", "#EC4899"]
+
+PRIORITY_WEIGHTS = {TaskPriority.LOW: 20, TaskPriority.MEDIUM: 50, TaskPriority.HIGH: 22, TaskPriority.URGENT: 8}
+# Статусы зависят от того, прошел ли дедлайн (или задача давно без дедлайна)
+STATUS_WEIGHTS_OVERDUE = {TaskStatus.TODO: 10, TaskStatus.IN_PROGRESS: 10, TaskStatus.IN_REVIEW: 5, TaskStatus.DONE: 75}
+STATUS_WEIGHTS_OPEN = {TaskStatus.TODO: 45, TaskStatus.IN_PROGRESS: 30, TaskStatus.IN_REVIEW: 10, TaskStatus.DONE: 15}
+# Средний срок до дедлайна по приоритету, дни
+DEADLINE_MEAN_DAYS = {TaskPriority.LOW: 21, TaskPriority.MEDIUM: 10, TaskPriority.HIGH: 5, TaskPriority.URGENT: 2}
+
+
+@dataclass
+class SeedScale:
+    users: int = 200
+    projects: int = 20
+    tasks: int = 20000
+    comments_per_task: float = 0.5
+    attachments_per_task: float = 0.1
+    approvals: int = 2000
+    memberships_per_user: int = 3
+    foreman_share: float = 0.1
+    deadline_share: float = 0.7
+    days: int = 365  # Задачи создаются равномерно за последние `days` дней
+    seed: int = 42
+    batch_size: int = 10000
+
+
+@dataclass
+class SeedResult:
+    """Что нужно бенчмарку: кем ходить в API и какие ID существуют"""
+    creator_telegram_id: int = CREATOR_TELEGRAM_ID
+    foreman_telegram_ids: List[int] = field(default_factory=list)
+    worker_telegram_ids: List[int] = field(default_factory=list)
+    project_ids: List[int] = field(default_factory=list)
+    max_task_id: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+
+
+def task_title(rng: random.Random) -> str:
+    return f"{rng.choice(ACTIONS).capitalize()} {rng.choice(OBJECTS)}"
+
+
+def task_description(rng: random.Random) -> str:
+    return f"{task_title(rng)} {rng.choice(DETAILS)}, затем {rng.choice(ACTIONS)} {rng.choice(OBJECTS)}"
+
+
+class WeightedChoice:
+    """Выбор по весам через таблицу: один вызов random() и индексация списка"""
+
+    def __init__(self, items: Sequence, weights: Sequence[float], size: int = 1024):
+        total = sum(weights)
+        table, cumulative = [], 0.0
+        for item, weight in zip(items, weights):
+            cumulative += weight
+            table.extend([item] * (round(cumulative / total * size) - len(table)))
+        self.table = table
+        self.size = len(table)
+
+    def __call__(self, rng: random.Random):
+        return self.table[int(rng.random() * self.size)]
+
+
+class BulkWriter:
+    """Пачечная вставка кортежей в таблицу.
+
+    Время в строках - секунды Unix (float); в SQLite оно переводится в строку
+    формата SQLAlchemy функцией strftime прямо в INSERT, без Python на каждую строку.
+    Значения JSON колонок - объекты Python; для драйвера SQLite они сериализуются здесь.
+    """
+
+    def __init__(self, conn: Connection, batch_size: int):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.sqlite = conn.dialect.name == "sqlite"
+
+    def insert(self, table: Table, columns: Sequence[str], rows: Iterable[tuple],
+               timestamps: Sequence[str] = ()) -> int:
+        total = 0
+        rows = iter(rows)
+        if self.sqlite:
+            cursor = self.conn.connection.driver_connection.cursor()
+            placeholders = ", ".join(
+                "strftime('%Y-%m-%d %H:%M:%f', ?, 'unixepoch')" if column in timestamps else "?"
+                for column in columns
+            )
+            statement = f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})"
+            json_positions = [
+                position for position, column in enumerate(columns) if isinstance(table.c[column].type, JSON)
+            ]
+            if json_positions:
+                rows = (
+                    tuple(json.dumps(value, ensure_ascii=False) if position in json_positions and value is not None
+                          else value for position, value in enumerate(row))
+                    for row in rows
+                )
+        else:
+            positions = [columns.index(column) for column in timestamps]
+        while True:
+            batch = list(itertools.islice(rows, self.batch_size))
+            if not batch:
+                break
+            if self.sqlite:
+                cursor.executemany(statement, batch)
+            else:
+                records = [dict(zip(columns, row)) for row in batch]
+                for record, row in zip(records, batch):
+                    for position in positions:
+                        if row[position] is not None:
+                            record[columns[position]] = datetime.fromtimestamp(row[position], timezone.utc)
+                self.conn.execute(table.insert(), records)
+            total += len(batch)
+        return total
+
+
+def seed_database(engine: Engine, scale: SeedScale, drop: bool = False,
+                  progress: Optional[Callable[[str, int, float], None]] = None) -> SeedResult:
+    """Создает таблицы и заполняет пустую базу данными заданного масштаба.
+
+    На время загрузки вторичные индексы больших таблиц удаляются и строятся
+    заново после вставки, SQLite пишет без fsync. В конце - ANALYZE, чтобы
+    планировщик видел реальные распределения.
+    """
+    if drop:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    result = SeedResult()
+
+    with engine.connect() as conn:
+        if conn.execute(select(User.id).limit(1)).first() is not None:
+            raise RuntimeError("База уже заполнена - синтетические данные пишутся только в пустую базу (или --drop)")
+        sqlite = conn.dialect.name == "sqlite"
+        if sqlite:
+            synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+        conn.commit()
+        try:
+            with conn.begin():
+                indexes = drop_secondary_indexes(conn, BULK_TABLES)
+                _load(conn, scale, result, progress)
+                started = time.perf_counter()
+                for statement in indexes:
+                    conn.exec_driver_sql(statement)
+                conn.exec_driver_sql("ANALYZE")
+                if progress:
+                    progress("индексы и ANALYZE", len(indexes), time.perf_counter() - started)
+        finally:
+            if sqlite:
+                conn.exec_driver_sql(f"PRAGMA synchronous = {synchronous}")
+    return result
+
+
+BULK_TABLES = ("tasks", "task_comments", "task_attachments", "approval_requests")
+
+
+def drop_secondary_indexes(conn: Connection, tables: Sequence[str]) -> List[str]:
+    """Удаляет индексы (кроме ключей и ограничений) и возвращает DDL для их восстановления"""
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            f"AND tbl_name IN ({', '.join(repr(t) for t in tables)})"
+        )).all()
+    elif conn.dialect.name == "postgresql":
+        rows = conn.execute(text(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = ANY(:tables) "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint)"
+        ), {"tables": list(tables)}).all()
+    else:
+        return []
+    for name, _ in rows:
+        conn.exec_driver_sql(f'DROP INDEX "{name}"')
+    return [ddl for _, ddl in rows]
+
+
+def _load(conn: Connection, scale: SeedScale, result: SeedResult,
+          progress: Optional[Callable[[str, int, float], None]]):
+    rng = random.Random(scale.seed)
+    random_ = rng.random
+    expovariate = rng.expovariate
+    # Время - секунды Unix, см. BulkWriter
+    now = float(int(time.time()))
+    start = now - scale.days * DAY
+    task_step = scale.days * DAY / max(scale.tasks, 1)
+    writer = BulkWriter(conn, scale.batch_size)
+    counts = result.counts
+
+    def load(name: str, table: Table, columns: Sequence[str], rows: Iterable[tuple], timestamps=()):
+        started = time.perf_counter()
+        counts[name] = writer.insert(table, columns, rows, timestamps)
+        if progress:
+            progress(name, counts[name], time.perf_counter() - started)
+
+    # Тексты берутся из заранее сгенерированных наборов - генерация строки на каждую задачу дорогая
+    titles = [task_title(rng) for _ in range(TEXT_POOL)]
+    descriptions = [task_description(rng) for _ in range(TEXT_POOL)]
+    comment_texts = [f"{rng.choice(DETAILS).capitalize()}: {task_title(rng).lower()}" for _ in range(TEXT_POOL)]
+
+    # Пользователи: id 1 - создатель, затем прорабы (доля foreman_share) и рабочие
+    foremen_count = max(1, int((scale.users - 1) * scale.foreman_share)) if scale.users > 1 else 0
+    foremen = list(range(2, 2 + foremen_count))
+    workers = list(range(2 + foremen_count, scale.users + 1))
+    blocked = set()
+
+    def users():
+        yield 1, CREATOR_TELEGRAM_ID, "creator", "Создатель", None, UserRole.CREATOR.name, True, start
+        for user_id in range(2, scale.users + 1):
+            role = UserRole.FOREMAN if user_id < 2 + foremen_count else UserRole.WORKER
+            # Около 5% рабочих заблокированы
+            active = role == UserRole.FOREMAN or random_() > 0.05
+            if not active:
+                blocked.add(user_id)
+            yield (user_id, 1_000_000 + user_id, f"user{user_id}", f"Пользователь {user_id}", None,
+                   role.name, active, start + random_() * scale.days * DAY)
+
+    load("users", User.__table__,
+         ("id", "telegram_id", "username", "first_name", "last_name", "role", "is_active", "created_at"),
+         users(), ("created_at",))
+    result.foreman_telegram_ids = [1_000_000 + user_id for user_id in foremen]
+    result.worker_telegram_ids = [1_000_000 + user_id for user_id in workers if user_id not in blocked]
+
+    result.project_ids = list(range(1, scale.projects + 1))
+    load("projects", Project.__table__,
+         ("id", "name", "description", "color", "is_active", "created_by", "created_at"),
+         ((project_id, f"{rng.choice(PROJECT_NAMES)} {project_id}", "Синтетические данные",
+           rng.choice(COLORS), random_() > 0.1, 1, start) for project_id in result.project_ids),
+         ("created_at",))
+
+    # Участники: у каждого проекта свои прорабы и рабочие; нагрузка на рабочих неравномерная (~Zipf)
+    foreman_ids = set(foremen)
+    foremen_of = {project_id: [] for project_id in result.project_ids}
+    workers_of = {project_id: [] for project_id in result.project_ids}
+    memberships = []
+    for user_id in foremen + workers:
+        for project_id in rng.sample(result.project_ids, min(scale.memberships_per_user, scale.projects)):
+            (foremen_of if user_id in foreman_ids else workers_of)[project_id].append(user_id)
+            memberships.append((user_id, project_id, ProjectRole.MEMBER.name, start))
+    load("user_projects", UserProject.__table__, ("user_id", "project_id", "role", "joined_at"),
+         memberships, ("joined_at",))
+
+    creators = {p: WeightedChoice([1] + f, [1] + [3] * len(f)) for p, f in foremen_of.items()}
+    assignees = {
+        p: WeightedChoice(w, [1 / (rank + 1) for rank in range(len(w))]) if w else None
+        for p, w in workers_of.items()
+    }
+    pick_project = WeightedChoice(result.project_ids, [1 / (rank + 1) ** 0.5 for rank in range(scale.projects)], 4096)
+    pick_priority = WeightedChoice(list(PRIORITY_WEIGHTS), list(PRIORITY_WEIGHTS.values()))
+    status_overdue = WeightedChoice([s.name for s in STATUS_WEIGHTS_OVERDUE], list(STATUS_WEIGHTS_OVERDUE.values()))
+    status_open = WeightedChoice([s.name for s in STATUS_WEIGHTS_OPEN], list(STATUS_WEIGHTS_OPEN.values()))
+    deadline_rate = {priority.name: 1 / (days * DAY) for priority, days in DEADLINE_MEAN_DAYS.items()}
+    old_age = 60 * DAY
+
+    def tasks():
+        # Горячий цикл: таблицы выборки развернуты в локальные переменные
+        projects, projects_size = pick_project.table, pick_project.size
+        priorities = [priority.name for priority in pick_priority.table]
+        priorities_size = len(priorities)
+        overdue_table, open_table = status_overdue.table, status_open.table
+        creator_tables = {p: c.table for p, c in creators.items()}
+        assignee_tables = {p: a.table if a else None for p, a in assignees.items()}
+        deadline_share = scale.deadline_share
+        created = start
+        for task_id in range(1, scale.tasks + 1):
+            project_id = projects[int(random_() * projects_size)]
+            priority = priorities[int(random_() * priorities_size)]
+            deadline = created + expovariate(deadline_rate[priority]) if random_() < deadline_share else None
+            overdue = deadline < now if deadline is not None else now - created > old_age
+            statuses = overdue_table if overdue else open_table
+            creator_table = creator_tables[project_id]
+            assignee_table = assignee_tables[project_id]
+            yield (
+                task_id, titles[int(random_() * TEXT_POOL)], descriptions[int(random_() * TEXT_POOL)],
+                statuses[int(random_() * len(statuses))], priority, project_id,
+                creator_table[int(random_() * len(creator_table))],
+                assignee_table[int(random_() * len(assignee_table))]
+                if assignee_table and random_() < 0.85 else None,
+                deadline, created, task_id,
+            )
+            created += task_step
+
+    load("tasks", Task.__table__,
+         ("id", "title", "description", "status", "priority", "project_id", "created_by", "assigned_to",
+          "deadline", "created_at", "change_seq"), tasks(), ("deadline", "created_at"))
+    conn.execute(SyncCounter.__table__.insert().values(name="tasks", value=scale.tasks))
+    result.max_task_id = scale.tasks
+    if scale.tasks:
+        _load_task_children(load, rng, scale, start, task_step, comment_texts)
+
+    pick_action = WeightedChoice([ActionType.CREATE_TASK.name, ActionType.UPDATE_TASK.name], [85, 15])
+    pick_approval = WeightedChoice([s.name for s in ApprovalStatus], [20, 70, 10])
+
+    def approvals():
+        for _ in range(scale.approvals):
+            project_id = pick_project(rng)
+            created = now - random_() * scale.days * DAY
+            status = pick_approval(rng)
+            reviewed = created + expovariate(1 / (6 * HOUR)) if status != ApprovalStatus.PENDING.name else None
+            action_data = {
+                "title": titles[int(random_() * TEXT_POOL)],
+                "description": descriptions[int(random_() * TEXT_POOL)],
+                "priority": pick_priority(rng).value,
+                "deadline": None,
+                "project_id": project_id,
+            }
+            yield (rng.choice(foremen or [1]), 1, pick_action(rng), "task", 0, action_data, status,
+                   created, reviewed, project_id)
+
+    load("approval_requests", ApprovalRequest.__table__,
+         ("requester_id", "approver_id", "action_type", "entity_type", "entity_id", "action_data", "status",
+          "created_at", "reviewed_at", "project_id"), approvals(), ("created_at", "reviewed_at"))
+
+    if conn.dialect.name == "postgresql":
+        # Явные ID не двигают последовательности - выравниваем их по максимуму
+        for table in ("users", "projects", "tasks", "task_attachments"):
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1)) FROM {table}"
+            ))
+
+
+def _load_task_children(load, rng: random.Random, scale: SeedScale, start: float, task_step: float,
+                        comment_texts: List[str]):
+    """Комментарии и вложения случайных задач (время - вскоре после создания задачи)"""
+    random_ = rng.random
+    expovariate = rng.expovariate
+    users = scale.users
+    tasks = scale.tasks
+
+    def comments():
+        for _ in range(int(tasks * scale.comments_per_task)):
+            task_id = int(random_() * tasks) + 1
+            created = start + task_step * (task_id - 1) + expovariate(1 / DAY)
+            yield comment_texts[int(random_() * TEXT_POOL)], task_id, int(random_() * users) + 1, created
+
+    load("task_comments", TaskComment.__table__, ("content", "task_id", "author_id", "created_at"),
+         comments(), ("created_at",))
+
+    def attachments():
+        for attachment_id in range(1, int(tasks * scale.attachments_per_task) + 1):
+            task_id = int(random_() * tasks) + 1
+            filename = f"photo_{attachment_id}.jpg"
+            yield (attachment_id, filename, f"tasks/{task_id}/{attachment_id:08x}_{filename}",
+                   int(rng.lognormvariate(13.5, 0.6)), "image/jpeg", task_id, int(random_() * users) + 1,
+                   start + task_step * (task_id - 1) + expovariate(1 / HOUR))
+
+    load("task_attachments", TaskAttachment.__table__,
+         ("id", "filename", "file_path", "file_size", "mime_type", "task_id", "uploaded_by", "uploaded_at"),
+         attachments(), ("uploaded_at",))
+
+
+def parse_args(argv=None):
+    defaults = SeedScale()
+    parser = argparse.ArgumentParser(description="Заполнение базы синтетическими данными")
+    parser.add_argument("--database", help="URL базы (по умолчанию - из настроек приложения)")
+    parser.add_argument("--drop", action="store_true", help="Удалить и пересоздать таблицы перед загрузкой")
+    parser.add_argument("--no-search-index", action="store_true", help="Не строить поисковый индекс задач")
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scale = SeedScale(**{name: getattr(args, name) for name in asdict(SeedScale())})
+
+    from app.core.database import engine as app_engine
+    from app.services.search import create_search
+
+    engine = create_engine(args.database) if args.database else app_engine
+    started = time.perf_counter()
+    seed_database(engine, scale, drop=args.drop,
+                  progress=lambda name, count, elapsed: print(f"{name:<18} {count:>10} строк за {elapsed:6.2f} с"))
+    if not args.no_search_index:
+        index_started = time.perf_counter()
+        create_search(engine).ensure_schema(engine, rebuild=True)
+        print(f"{'поисковый индекс':<18} {'':>10} за {time.perf_counter() - index_started:6.2f} с")
+    print(f"Готово за {time.perf_counter() - started:.1f} с: {engine.url.render_as_string(hide_password=True)}")
+
+
+if __name__ == "__main__":
+    main()
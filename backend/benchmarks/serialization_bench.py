@@ -0,0 +1,109 @@
+"""Сравнение путей сериализации списка задач: ORM + Pydantic против строк + orjson.
+
+Пути (от запроса в БД до готового тела ответа):
+- orm+pydantic+json   - прежний путь: ORM объекты, валидация response_model, stdlib json;
+- orm+pydantic+orjson - то же, но ответ рендерит orjson (default_response_class);
+- rows+orjson         - быстрый путь: SELECT колонок схемы, словари, orjson.
+
+Перед замером проверяется, что все пути отдают одинаковый JSON.
+
+Запуск из каталога backend:
+    python -m benchmarks.serialization_bench --tasks 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.api_bench import BACKEND_DIR, BENCH_ENV
+
+
+def build_paths() -> Dict[str, Callable[[], bytes]]:
+    from typing import List as ListType
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from app.core.database import SessionLocal
+    from app.core.responses import ORJSONResponse
+    from app.crud.task import task_crud
+    from app.models.user import UserRole
+    from app.schemas.task import Task
+
+    field = create_response_field(name="Response_get_tasks", type_=ListType[Task])
+
+    def orm_path(response_class):
+        def run() -> bytes:
+            with SessionLocal() as db:
+                tasks = task_crud.get_by_user(db=db, user_id=1, user_role=UserRole.CREATOR)
+                content = asyncio.run(serialize_response(field=field, response_content=tasks))
+            return response_class(content).body
+        return run
+
+    def rows_path() -> bytes:
+        with SessionLocal() as db:
+            rows = task_crud.get_rows_by_user(db=db, user_id=1, user_role=UserRole.CREATOR)
+        return ORJSONResponse(rows).body
+
+    return {
+        "orm+pydantic+json": orm_path(JSONResponse),
+        "orm+pydantic+orjson": orm_path(ORJSONResponse),
+        "rows+orjson": rows_path,
+    }
+
+
+def measure(run: Callable[[], bytes], repeat: int) -> List[float]:
+    run()  # прогрев
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Сравнение путей сериализации списков")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    os.chdir(tempfile.mkdtemp(prefix="serialization-bench-"))
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from app.core.database import engine
+    from benchmarks.seed import SeedScale, seed_database
+
+    seed_database(engine, SeedScale(users=200, projects=20, tasks=args.tasks, comments_per_task=0,
+                                    attachments_per_task=0, approvals=0))
+    paths = build_paths()
+
+    bodies = {name: run() for name, run in paths.items()}
+    reference = json.loads(bodies["orm+pydantic+json"])
+    for name, body in bodies.items():
+        if json.loads(body) != reference:
+            print(f"{name}: ответ отличается от прежнего пути")
+            return 1
+    print(f"{len(reference)} задач, {len(bodies['rows+orjson']) / 1024:.0f} КБ, ответы совпадают")
+
+    baseline = None
+    for name, run in paths.items():
+        timings = measure(run, args.repeat)
+        median = statistics.median(timings) * 1000
+        baseline = baseline or median
+        print(f"{name:<20} median {median:>8.1f} ms  min {min(timings) * 1000:>8.1f} ms  x{baseline / median:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
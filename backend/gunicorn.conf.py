@@ -0,0 +1,105 @@
+"""Продакшен-запуск: gunicorn с воркерами uvicorn.
+
+Запуск из каталога backend:
+    gunicorn -c gunicorn.conf.py main:app
+
+Параметры берутся из настроек SERVER_* (app/core/config.py).
+
+С SERVER_PRELOAD=true приложение импортируется и схема БД проверяется один раз
+в мастер-процессе, воркеры получают готовый процесс через fork. Сигналы мастеру:
+- HUP - плавный перезапуск воркеров; код при preload не перечитывается;
+- USR2, затем TERM старому мастеру - запуск нового кода без разрыва соединений;
+- TTIN / TTOU - добавить / убрать воркер.
+
+Воркер перезапускается после SERVER_MAX_REQUESTS запросов (с разбросом) и при
+превышении SERVER_MAX_MEMORY_MB.
+"""
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+
+# Метрики Prometheus нескольких процессов собираются через файлы в общем каталоге;
+# переменная нужна до первого импорта prometheus_client
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = os.path.join(tempfile.gettempdir(), f"prometheus-{os.getpid()}")
+_metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+# Файлы прошлого запуска искажают счетчики; по HUP конфиг перечитывается - не чистим повторно
+if os.environ.get("_PROMETHEUS_MULTIPROC_DIR_READY") != _metrics_dir:
+    shutil.rmtree(_metrics_dir, ignore_errors=True)
+    os.makedirs(_metrics_dir, exist_ok=True)
+    os.environ["_PROMETHEUS_MULTIPROC_DIR_READY"] = _metrics_dir
+
+from app.core.config import settings  # noqa: E402
+
+bind = f"{settings.SERVER_HOST}:{settings.SERVER_PORT}"
+workers = settings.SERVER_WORKERS or multiprocessing.cpu_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = settings.SERVER_PRELOAD
+backlog = settings.SERVER_BACKLOG
+keepalive = settings.SERVER_KEEPALIVE
+timeout = settings.SERVER_TIMEOUT
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+
+
+def on_starting(server):
+    if settings.EVENTS_BUS == "local" and workers > 1:
+        server.log.warning(
+            "EVENTS_BUS=local при нескольких воркерах: SSE подписчики получат события только своего воркера"
+        )
+
+    # Без preload приложение импортирует каждый воркер - и схему проверяет сам
+    if not server.cfg.preload_app:
+        return
+    import main
+    main.app.state.schema_state = main.prepare_database()
+    # Соединения мастера не должны достаться воркерам
+    main.engine.dispose()
+    if settings.SHARDING_ENABLED:
+        from app.core.sharding import shard_router
+        shard_router.dispose()
+
+
+def post_fork(server, worker):
+    from app.core.database import engine
+    # Пул унаследован от мастера: сокеты общие, закрывать их нельзя - только забыть
+    engine.dispose(close=False)
+    if settings.SHARDING_ENABLED:
+        from app.core.sharding import shard_router
+        shard_router.dispose(close=False)
+
+    if settings.SERVER_MAX_MEMORY_MB:
+        threading.Thread(target=_watch_memory, args=(worker,), name="memory-watchdog", daemon=True).start()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    # Gauge livesum/livemax завершенного воркера больше не учитываются
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        import resource
+        # Пиковое значение (в КБ на Linux) - лучше, чем ничего
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _watch_memory(worker):
+    """Плавный перезапуск воркера при превышении памяти: TERM себе, мастер запустит замену"""
+    limit = settings.SERVER_MAX_MEMORY_MB
+    while True:
+        time.sleep(settings.SERVER_MEMORY_CHECK_SECONDS)
+        rss = _rss_mb()
+        if rss > limit:
+            worker.log.warning(f"Воркер {worker.pid}: {rss:.0f} МБ памяти (лимит {limit} МБ), перезапуск")
+            os.kill(os.getpid(), signal.SIGTERM)
+            return
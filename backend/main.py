@@ -1,36 +1,100 @@
-import sentry_sdk
+import time
+
+# Отсчет времени запуска - до тяжелых импортов
+_started = time.perf_counter()
+
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.engine import Engine
 from contextlib import asynccontextmanager
+import logging
 
 from app.core.config import settings
+from app.core.logging_config import setup_logging
 from app.core.database import engine
+from app.core import metrics, profiling
+from app.core.compression import CompressionMiddleware
+from app.core.responses import ORJSONResponse
+from app.core.startup import StartupTimer, prepare_schema
 from app.models import Base
 from app.api.api_v1.api import api_router
+from app.services.events import event_broker
+from app.services.ai_jobs import ai_job_queue
+from app.services.archive import task_archiver
+from app.services.reminders import deadline_scheduler
+from app.services.search import task_search
+
+setup_logging()
+logger = logging.getLogger(__name__)
+startup_timer = StartupTimer(_started)
+
+
+def prepare_database() -> str:
+    """Схема: проверка ревизии Alembic, create_all - только для пустой/непомеченной БД.
+
+    При запуске через gunicorn.conf.py с preload выполняется один раз в мастер-процессе.
+    """
+    startup_timer.phases.setdefault("import", time.perf_counter() - _started)
+    with startup_timer.phase("schema"):
+        schema_state = prepare_schema(engine, Base.metadata)
+    with startup_timer.phase("search"):
+        task_search.ensure_schema(engine)
+    if settings.SHARDING_ENABLED:
+        from app.core.sharding import shard_router
+
+        # Схемы шардов создаются из моделей, ревизий Alembic у них нет
+        with startup_timer.phase("shards"):
+            for shard in shard_router.shard_names():
+                shard_router.engine(shard)
+    return schema_state
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    startup_timer.phases.setdefault("import", time.perf_counter() - _started)
     if settings.SENTRY_DSN:
-        sentry_sdk.init(
-            dsn=settings.SENTRY_DSN,
-            traces_sample_rate=0.1,
-        )
+        with startup_timer.phase("sentry"):
+            import sentry_sdk  # Импорт только при включенном Sentry
+            sentry_sdk.init(
+                dsn=settings.SENTRY_DSN,
+                traces_sample_rate=0.1,
+            )
     
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    schema_state = getattr(app.state, "schema_state", None)
+    if schema_state is None:
+        schema_state = prepare_database()
+    
+    with startup_timer.phase("services"):
+        await event_broker.start()
+        await ai_job_queue.start()
+        await deadline_scheduler.start()
+        await task_archiver.start()
+    
+    sampler = None
+    if settings.METRICS_ENABLED and metrics.MULTIPROCESS:
+        sampler = asyncio.create_task(metrics.sample_tracked())
+    
+    startup_timer.report()
+    logger.info(f"Схема БД: {schema_state}")
     
     yield
     
     # Shutdown
-    pass
+    if sampler is not None:
+        sampler.cancel()
+    await task_archiver.stop()
+    await deadline_scheduler.stop()
+    await ai_job_queue.stop()
+    await event_broker.stop()
 
 
 app = FastAPI(
     title="Project Manager API",
     description="API для управления проектами с AI ассистентом",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -49,6 +113,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+if settings.QUERY_PROFILER_ENABLED:
+    app.add_middleware(profiling.QueryProfilerMiddleware, engine=engine)
+    # При шардировании - все engines, включая engines шардов, создаваемые по запросу
+    profiling.instrument_engine(Engine if settings.SHARDING_ENABLED else engine)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.PrometheusMiddleware)
+    metrics.track_pool(engine)
+    metrics.track(metrics.AI_JOB_QUEUE_DEPTH, lambda: ai_job_queue.depth)
+    metrics.track(metrics.EVENT_SUBSCRIBERS, event_broker.subscriber_count)
+    metrics.track(metrics.REMINDERS_PENDING, lambda: deadline_scheduler.pending)
+
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        return metrics.metrics_response()
+
 app.include_router(api_router, prefix="/api/v1")
 
 
@@ -63,5 +146,6 @@ async def health_check():
 
 
 if __name__ == "__main__":
+    # Разработка; в продакшене - gunicorn -c gunicorn.conf.py main:app
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host=settings.SERVER_HOST, port=settings.SERVER_PORT)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Разделение задач по шардам (SHARDING_ENABLED) и перенос проектов между шардами.
+
+Запускать при остановленном приложении, из каталога backend:
+    python split_shards.py                   # все проекты основной БД - в SHARD_DEFAULT
+    python split_shards.py --per-project     # каждому проекту свой шард project_<id>
+    python split_shards.py --project 12=big  # проект 12 - в шард big (в том числе из другого шарда)
+    python split_shards.py --merge           # все проекты обратно в основную БД
+
+После разделения приложение запускается с SHARDING_ENABLED=true, после
+--merge - без него. Перенос идет по проекту: копирование в целевую БД,
+запись в карту project_shards, удаление из исходной. Транзакции разных БД
+независимы: после сбоя до записи в карту повторный запуск копирует проект
+заново; после записи в карту в исходной БД остаются строки, которые
+приложение уже не читает.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import delete, func, inspect, insert, select, text, update  # noqa: E402
+from sqlalchemy.engine import Connection  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.core.sharding import GLOBAL, GLOBAL_ID_TABLES, SHARD_NAME_RE, shard_router  # noqa: E402
+from app.models import Base  # noqa: E402
+from app.models.project import Project  # noqa: E402
+from app.models.shard import GlobalSequence, ProjectShard  # noqa: E402
+from app.models.sync import SyncCounter  # noqa: E402
+from app.services.search import task_search  # noqa: E402
+
+TABLES = Base.metadata.tables
+# (таблица, таблица задач для отбора по task_id); порядок копирования - родители первыми
+PROJECT_TABLES = (
+    ("tasks", None),
+    ("task_comments", "tasks"),
+    ("task_attachments", "tasks"),
+    ("archived_tasks", None),
+    ("archived_task_comments", "archived_tasks"),
+    ("archived_task_attachments", "archived_tasks"),
+    ("task_tombstones", None),
+)
+
+
+def _project_rows(table_name: str, parent: Optional[str], project_id: int):
+    table = TABLES[table_name]
+    if parent is None:
+        return table, table.c.project_id == project_id
+    tasks = TABLES[parent]
+    return table, table.c.task_id.in_(select(tasks.c.id).where(tasks.c.project_id == project_id))
+
+
+def _copy(source: Connection, target: Connection, project_id: int, batch_size: int) -> Dict[str, int]:
+    """Копирование строк проекта; возвращает максимальные ID по таблицам"""
+    max_ids = {}
+    for table_name, parent in PROJECT_TABLES:
+        table, condition = _project_rows(table_name, parent, project_id)
+        # ID tombstones локальны для БД: в целевой БД выдаются заново
+        columns = [column for column in table.columns if not (table_name == "task_tombstones" and column.name == "id")]
+        rows = source.execute(select(*columns).where(condition).order_by(table.c.id))
+        while True:
+            batch = rows.fetchmany(batch_size)
+            if not batch:
+                break
+            target.execute(insert(table), [row._asdict() for row in batch])
+            if table_name in GLOBAL_ID_TABLES:
+                max_ids[table_name] = max(max_ids.get(table_name, 0), batch[-1].id)
+    return max_ids
+
+
+def _delete(source: Connection, project_id: int):
+    # Дочерние строки - раньше задач: условие отбора читает таблицы задач
+    for table_name, parent in reversed(PROJECT_TABLES):
+        table, condition = _project_rows(table_name, parent, project_id)
+        source.execute(delete(table).where(condition))
+
+
+def _task_ids(conn: Connection, project_id: int):
+    tasks = TABLES["tasks"]
+    return conn.execute(select(tasks.c.id).where(tasks.c.project_id == project_id)).scalars().all()
+
+
+def _sync_counter(conn: Connection) -> int:
+    return conn.execute(select(SyncCounter.value).where(SyncCounter.name == "tasks")).scalar() or 0
+
+
+def _raise_counter(conn: Connection, table, name: str, value: int):
+    """Счетчик не меньше value (номера изменений и ID только растут)"""
+    greatest = func.max if conn.dialect.name == "sqlite" else func.greatest
+    result = conn.execute(update(table).where(table.c.name == name).values(value=greatest(table.c.value, value)))
+    if result.rowcount == 0:
+        conn.execute(insert(table).values(name=name, value=value))
+
+
+def _drop_task_foreign_keys():
+    """Внешний ключ ai_jobs.task_id на задачи основной БД (PostgreSQL; SQLite их не проверяет)"""
+    if engine.dialect.name != "postgresql":
+        return
+    for foreign_key in inspect(engine).get_foreign_keys("ai_jobs"):
+        if foreign_key["referred_table"] == "tasks" and foreign_key.get("name"):
+            with engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE ai_jobs DROP CONSTRAINT "{foreign_key["name"]}"'))
+            print(f"Удален внешний ключ ai_jobs → tasks: {foreign_key['name']}")
+
+
+def move_project(project_id: int, source: str, target: str, batch_size: int, keep_source: bool) -> int:
+    """Перенос задач проекта из БД source в target; возвращает число задач"""
+    source_engine, target_engine = shard_router.engine(source), shard_router.engine(target)
+    with source_engine.connect() as source_conn, target_engine.begin() as target_conn:
+        task_ids = _task_ids(source_conn, project_id)
+        # Остатки прерванного переноса: проект еще не назначен целевой БД
+        _delete(target_conn, project_id)
+        max_ids = _copy(source_conn, target_conn, project_id, batch_size)
+        # Номера изменений перенесенных задач не должны оказаться позади курсоров клиентов
+        counter = max(_sync_counter(source_conn), _sync_counter(target_conn))
+        _raise_counter(target_conn, SyncCounter.__table__, "tasks", counter)
+        task_search.refresh(target_conn, task_ids)
+
+    with engine.begin() as conn:
+        for table_name, max_id in max_ids.items():
+            _raise_counter(conn, GlobalSequence.__table__, table_name, max_id)
+        conn.execute(delete(ProjectShard).where(ProjectShard.project_id == project_id))
+        if target != GLOBAL:
+            conn.execute(insert(ProjectShard).values(project_id=project_id, shard=target))
+
+    if not keep_source:
+        with source_engine.begin() as source_conn:
+            _delete(source_conn, project_id)
+            task_search.refresh(source_conn, task_ids)
+    return len(task_ids)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Разделение задач проектов по шардам")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--per-project", action="store_true", help="Каждому проекту свой шард project_<id>")
+    group.add_argument("--merge", action="store_true", help="Вернуть все проекты в основную БД")
+    parser.add_argument(
+        "--project", action="append", default=[], metavar="ID=SHARD",
+        help="Шард для проекта (можно указать несколько раз); остальные проекты не переносятся"
+    )
+    parser.add_argument("--keep-source", action="store_true", help="Не удалять перенесенные строки из исходной БД")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Строк за одну вставку")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    task_search.ensure_schema(engine)
+    with engine.connect() as conn:
+        current = dict(conn.execute(select(ProjectShard.project_id, ProjectShard.shard)).all())
+        projects = conn.execute(select(Project.id).order_by(Project.id)).scalars().all()
+
+    if args.project:
+        plan = {}
+        for item in args.project:
+            project_id, _, shard = item.partition("=")
+            if not project_id.isdigit() or not (shard == GLOBAL or SHARD_NAME_RE.match(shard)):
+                sys.exit(f"Неверный формат --project: {item} (нужно ID=шард, шард - [a-z0-9_])")
+            plan[int(project_id)] = shard
+    elif args.merge:
+        plan = {project_id: GLOBAL for project_id in current}
+    else:
+        # Проекты, уже назначенные шардам, остаются на месте
+        plan = {
+            project_id: f"project_{project_id}" if args.per_project else settings.SHARD_DEFAULT
+            for project_id in projects if project_id not in current
+        }
+
+    if any(shard != GLOBAL for shard in plan.values()):
+        _drop_task_foreign_keys()
+    started = time.perf_counter()
+    moved = 0
+    for project_id, target in plan.items():
+        source = current.get(project_id, GLOBAL)
+        if source == target:
+            continue
+        count = move_project(project_id, source, target, args.batch_size, args.keep_source)
+        moved += 1
+        print(f"Проект {project_id}: {source} → {target}, задач: {count}")
+    shard_router.dispose()
+    print(f"Перенесено проектов: {moved} за {time.perf_counter() - started:.1f} с")
+
+
+if __name__ == "__main__":
+    main()
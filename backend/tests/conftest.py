@@ -0,0 +1,70 @@
+import os
+
+# Обязательные настройки - до импорта приложения
+os.environ.setdefault("BOT_TOKEN", "0:test")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("LOG_FORMAT", "text")
+# Превышение query_budget() в тестах - ошибка, а не предупреждение
+os.environ.setdefault("QUERY_BUDGET_STRICT", "true")
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core import sharding  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.sharding import RoutedSession, ShardRouter  # noqa: E402
+from app.models import Base, User, Project  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+from app.services.search import task_search  # noqa: E402
+
+
+@pytest.fixture
+def engine():
+    """Отдельная SQLite БД в памяти для каждого теста"""
+    test_engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(test_engine)
+    yield test_engine
+    test_engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def creator(db):
+    user = User(telegram_id=1001, first_name="Иван", role=UserRole.CREATOR)
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def project(db, creator):
+    project = Project(name="Стройка", created_by=creator.id)
+    db.add(project)
+    db.commit()
+    return project
+
+
+@pytest.fixture
+def sharded_db(engine, tmp_path, monkeypatch):
+    """RoutedSession: основная БД - тестовая, каждому проекту - свой файл шарда"""
+    monkeypatch.setattr(sharding, "engine", engine)
+    monkeypatch.setattr(settings, "SHARD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "SHARD_PER_PROJECT", True)
+    # ensure_schema шардов включает индексацию; после теста - как было
+    monkeypatch.setattr(task_search, "ready", task_search.ready)
+    router = ShardRouter()
+    session = RoutedSession(router=router, autoflush=False)
+    yield session
+    session.close()
+    router.dispose()
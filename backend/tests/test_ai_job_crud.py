@@ -0,0 +1,24 @@
+from datetime import datetime, timedelta, timezone
+
+from app.crud.ai_job import ai_job_crud
+from app.models.ai_job import AIJobKind, AIJobStatus
+
+
+def test_reusable_only_within_window(db, creator):
+    job = ai_job_crud.create(db, user_id=creator.id, kind=AIJobKind.TEXT, input_hash="h", input_text="купить цемент")
+    window_start = datetime.now(timezone.utc) - timedelta(minutes=10)
+
+    assert ai_job_crud.get_reusable(db, creator.id, "h", window_start).id == job.id
+
+    # Тот же текст через час - новая задача
+    job.created_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.commit()
+    assert ai_job_crud.get_reusable(db, creator.id, "h", window_start) is None
+
+
+def test_failed_job_not_reused(db, creator):
+    job = ai_job_crud.create(db, user_id=creator.id, kind=AIJobKind.TEXT, input_hash="h", input_text="купить цемент")
+    job.status = AIJobStatus.FAILED
+    db.commit()
+
+    assert ai_job_crud.get_reusable(db, creator.id, "h", datetime.now(timezone.utc) - timedelta(minutes=10)) is None
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.ai_job import ai_job_crud
+from app.api.api_v1.endpoints.ai import _projects_info
+from app.models import ApprovalRequest, Project, Task, User, UserProject
+from app.models.ai_job import AIJobKind, AIJobStatus
+from app.models.user import UserRole
+from app.services import ai_jobs
+from app.services.ai_jobs import AIJobQueue
+from app.services.notifications import notification_service
+from app.services.task_submission import CREATOR_TELEGRAM_ID
+
+TASK_DATA = {"title": "Залить фундамент", "description": "Залить фундамент", "priority": "high", "deadline": None}
+
+
+@pytest.fixture
+def run_job(engine, db, project, monkeypatch):
+    """Обработка AI задачи с готовым ответом модели; уведомления не отправляются"""
+    monkeypatch.setattr(ai_jobs, "SessionLocal", sessionmaker(bind=engine))
+    sent = []
+
+    async def send_message(chat_id, text, reply_markup=None):
+        sent.append(chat_id)
+        return True
+
+    monkeypatch.setattr(notification_service, "send_message", send_message)
+
+    def run(user: User, task_data=None, projects=None):
+        job = ai_job_crud.create(
+            db, user_id=user.id, kind=AIJobKind.TEXT, input_hash=f"h{user.id}", input_text="текст",
+            input_projects=json.dumps(projects if projects is not None else [{"id": project.id, "name": project.name}]),
+        )
+        job.model_output = json.dumps({**TASK_DATA, "project_id": project.id, **(task_data or {})}, ensure_ascii=False)
+        db.commit()
+        asyncio.run(AIJobQueue().process(job.id))
+        db.expire_all()
+        job = ai_job_crud.get(db, job.id)
+        return job, json.loads(job.result) if job.result else None
+
+    run.sent = sent
+    return run
+
+
+def _user(db, telegram_id: int, role: UserRole) -> User:
+    user = User(telegram_id=telegram_id, first_name="Петр", role=role)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_creator_job_creates_task(db, creator, run_job):
+    job, result = run_job(creator)
+
+    assert job.status == AIJobStatus.SUCCEEDED
+    assert result["status"] == "task_created"
+    assert db.get(Task, job.task_id).created_by == creator.id
+
+
+@pytest.mark.parametrize("role", [UserRole.WORKER, UserRole.VIEWER])
+def test_worker_and_viewer_cannot_create_tasks(db, run_job, role):
+    job, result = run_job(_user(db, 2002, role))
+
+    assert result["status"] == "forbidden"
+    assert job.task_id is None
+    assert db.query(Task).count() == 0
+
+
+def test_foreman_job_goes_to_approval(db, run_job):
+    approver = _user(db, CREATOR_TELEGRAM_ID, UserRole.CREATOR)
+    foreman = _user(db, 2003, UserRole.FOREMAN)
+
+    job, result = run_job(foreman)
+
+    assert result["status"] == "approval_requested"
+    assert not result["duplicate"]
+    assert job.task_id is None
+    assert db.query(Task).count() == 0
+    approval = db.get(ApprovalRequest, result["approval_id"])
+    assert (approval.requester_id, approval.approver_id) == (foreman.id, approver.id)
+    assert run_job.sent == [CREATOR_TELEGRAM_ID]
+
+    # Повтор той же задачи не создает второй запрос
+    _, result = run_job(foreman)
+    assert result["duplicate"]
+    assert db.query(ApprovalRequest).count() == 1
+
+
+def test_project_outside_stored_list_rejected(db, creator, project, run_job):
+    other = Project(name="Чужой объект", created_by=creator.id)
+    db.add(other)
+    db.commit()
+
+    job, result = run_job(creator, {"project_id": other.id})
+
+    assert result["status"] == "forbidden"
+    assert job.task_id is None
+    assert db.query(Task).count() == 0
+
+
+def test_job_projects_come_from_membership(db, creator, project):
+    foreman = _user(db, 2004, UserRole.FOREMAN)
+    own = Project(name="Склад", created_by=creator.id)
+    db.add(own)
+    db.flush()
+    db.add(UserProject(user_id=foreman.id, project_id=own.id))
+    db.commit()
+
+    # Чужой проект из запроса клиента отбрасывается
+    assert _projects_info(db, foreman, [{"id": project.id, "name": project.name}]) == [{"id": own.id, "name": "Склад"}]
+    assert _projects_info(db, foreman) == [{"id": own.id, "name": "Склад"}]
+    # Подсказка клиента сужает выбор среди доступных проектов
+    assert _projects_info(db, creator, [{"id": own.id}]) == [{"id": own.id, "name": "Склад"}]
+
+
+def test_model_not_task_verdict(db, creator, run_job):
+    job, result = run_job(creator, {"is_task": False, "title": None})
+
+    assert job.status == AIJobStatus.SUCCEEDED
+    assert result["status"] == "not_task"
+    assert db.query(Task).count() == 0
+
+
+def test_failure_after_insert_keeps_no_task(db, creator, run_job, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("сбой после вставки")
+
+    monkeypatch.setattr(ai_jobs.TaskSchema, "model_validate", broken)
+    job, result = run_job(creator)
+
+    # Задача и статус AI задачи фиксируются вместе: без статуса нет и задачи
+    assert job.status == AIJobStatus.FAILED
+    assert job.task_id is None
+    assert db.query(Task).count() == 0
+
+
+def test_recovery_skips_job_with_task(db, creator, run_job):
+    job, _ = run_job(creator)
+    # Состояние, в котором задача создана, а статус AI задачи не успел измениться
+    job.status = AIJobStatus.RUNNING
+    job.started_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.commit()
+
+    now = datetime.now(timezone.utc)
+    assert ai_job_crud.get_unfinished(db) == []
+    assert ai_job_crud.get_unfinished(db, stale_before=now) == []
+    assert not ai_job_crud.claim(db, job.id, now)
+    assert db.query(Task).count() == 1
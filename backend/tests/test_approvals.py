@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.api.api_v1.endpoints import admin
+from app.core.database import Base, create_db_engine, get_db
+from app.crud.approval import approval_crud
+from app.models import Project, Task, User
+from app.models.approval import ActionType, ApprovalRequest, ApprovalStatus
+from app.models.user import UserRole
+from app.schemas.approval import ApprovalCreate, ApprovalDecision
+from app.services.auth import get_current_user
+
+
+def _task_request(db, requester, approver, project, title="Залить фундамент") -> ApprovalRequest:
+    return approval_crud.create(db, ApprovalCreate(
+        requester_id=requester.id,
+        approver_id=approver.id,
+        action_type=ActionType.CREATE_TASK,
+        entity_type="task",
+        entity_id=0,
+        action_data={"title": title, "project_id": project.id},
+        project_id=project.id,
+    ))
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """Файловая SQLite: у каждой сессии свое соединение и своя транзакция"""
+    test_engine = create_db_engine(f"sqlite:///{tmp_path / 'approvals.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(test_engine)
+    yield test_engine
+    test_engine.dispose()
+
+
+@pytest.fixture
+def foreman(db):
+    user = User(telegram_id=2002, first_name="Петр", role=UserRole.FOREMAN)
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def admin_client(db, creator):
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api/v1/admin")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: creator
+    return TestClient(app)
+
+
+def test_single_review_twice_returns_409(db, creator, foreman, project, admin_client):
+    approval = _task_request(db, foreman, creator, project)
+    url = f"/api/v1/admin/approvals/{approval.id}/review"
+
+    assert admin_client.post(url, json={"status": "approved"}).status_code == 200
+    response = admin_client.post(url, json={"status": "approved"})
+    assert response.status_code == 409
+    assert db.query(Task).count() == 1
+
+
+def test_single_review_of_foreign_request(db, creator, foreman, project, admin_client):
+    other = User(telegram_id=3003, first_name="Олег", role=UserRole.CREATOR)
+    db.add(other)
+    db.commit()
+    approval = _task_request(db, foreman, other, project)
+
+    response = admin_client.post(f"/api/v1/admin/approvals/{approval.id}/review", json={"status": "approved"})
+    assert response.status_code == 403
+    assert db.query(Task).count() == 0
+
+
+def test_concurrent_single_and_batch_review_create_one_task(file_engine):
+    Session = sessionmaker(bind=file_engine, autocommit=False, autoflush=False)
+    with Session() as db:
+        creator = User(telegram_id=1001, first_name="Иван", role=UserRole.CREATOR)
+        foreman = User(telegram_id=2002, first_name="Петр", role=UserRole.FOREMAN)
+        db.add_all([creator, foreman])
+        db.commit()
+        project = Project(name="Стройка", created_by=creator.id)
+        db.add(project)
+        db.commit()
+        approval_id = _task_request(db, foreman, creator, project).id
+        creator_id = creator.id
+
+    start = threading.Barrier(2)
+    results = {}
+
+    def single():
+        with Session() as db:
+            start.wait()
+            results["single"] = approval_crud.review(db, approval_id, creator_id, ApprovalStatus.APPROVED)
+
+    def batch():
+        with Session() as db:
+            start.wait()
+            locked = approval_crud.lock_pending(db, [approval_id], creator_id)
+            if not locked:
+                db.rollback()
+            results["batch"] = approval_crud.review_batch(
+                db, locked, [ApprovalDecision(id=approval_id, status=ApprovalStatus.APPROVED)]
+            ) if locked else []
+
+    threads = [threading.Thread(target=single), threading.Thread(target=batch)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Рассматривает ровно один из путей, второй видит запрос уже рассмотренным
+    assert (results["single"] is not None) != bool(results["batch"])
+    with Session() as db:
+        assert db.query(Task).count() == 1
+        assert db.get(ApprovalRequest, approval_id).status == ApprovalStatus.APPROVED
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+from app.crud.archive import archive_crud
+from app.crud.task import task_crud
+from app.models import Task, TaskComment, User
+from app.models.archive import ArchivedTask, ArchivedTaskComment
+from app.models.task import TaskStatus
+from app.models.user import UserRole
+from app.schemas.task import TaskCreate, TaskUpdate
+
+
+def _done_task(db, creator, project, title, assigned_to=None) -> Task:
+    task = task_crud.create(db, TaskCreate(title=title, project_id=project.id, assigned_to=assigned_to), creator.id)
+    return task_crud.update(db, task.id, TaskUpdate(status=TaskStatus.DONE))
+
+
+def _comment(db, task, author, content) -> TaskComment:
+    comment = TaskComment(task_id=task.id, author_id=author.id, content=content)
+    db.add(comment)
+    db.commit()
+    return comment
+
+
+def test_archive_and_restore_keep_ids_comments_and_tombstones(db, creator, project):
+    worker = User(telegram_id=2001, first_name="Петр", role=UserRole.WORKER)
+    db.add(worker)
+    db.commit()
+
+    first = _done_task(db, creator, project, "Замер", assigned_to=worker.id)
+    second = _done_task(db, creator, project, "Вывоз мусора")
+    # Последние строки остаются в рабочих таблицах (см. _keeps_last_id)
+    active = task_crud.create(db, TaskCreate(title="Кладка", project_id=project.id), creator.id)
+    comment = _comment(db, first, worker, "Размеры в чате")
+    _comment(db, active, creator, "Начать в понедельник")
+    # После переноса объекты устарели: дальше только сохраненные ID
+    first_id, second_id, comment_id, active_id = first.id, second.id, comment.id, active.id
+    cursor = task_crud.get_changes(db, 0, creator.id, UserRole.CREATOR)["cursor"]
+
+    archived = archive_crud.archive_done(db, datetime.now(timezone.utc) + timedelta(minutes=1), limit=10)
+
+    assert [task.id for task in archived] == [first_id, second_id]
+    db.expire_all()
+    assert db.query(Task).all() == [db.get(Task, active_id)]
+    assert db.get(ArchivedTaskComment, comment_id).task_id == first_id
+    assert task_crud.get_changes(db, cursor, creator.id, UserRole.CREATOR)["deleted"] == [first_id, second_id]
+    assert task_crud.get_changes(db, cursor, worker.id, UserRole.WORKER)["deleted"] == [first_id]
+    archive_cursor = task_crud.get_changes(db, cursor, creator.id, UserRole.CREATOR)["cursor"]
+
+    restored = archive_crud.restore(db, first_id)
+
+    assert restored.id == first_id
+    assert restored.title == "Замер" and restored.assigned_to == worker.id
+    assert [(c.id, c.content) for c in restored.comments] == [(comment_id, "Размеры в чате")]
+    assert db.get(ArchivedTask, first_id) is None
+    assert db.get(ArchivedTaskComment, comment_id) is None
+
+    # Восстановленная задача приходит заново и после своего tombstone
+    changes = task_crud.get_changes(db, archive_cursor, worker.id, UserRole.WORKER)
+    assert [task.id for task in changes["tasks"]] == [first_id]
+    changes = task_crud.get_changes(db, cursor, creator.id, UserRole.CREATOR)
+    assert [task.id for task in changes["tasks"]] == [first_id]
+    assert changes["deleted"] == [second_id]
+
+    assert archive_crud.restore(db, first_id) is None
+
+
+def test_archive_skips_recent_and_open_tasks(db, creator, project):
+    done_id = _done_task(db, creator, project, "Замер").id
+    task_crud.create(db, TaskCreate(title="Кладка", project_id=project.id), creator.id)
+
+    # Завершена позже границы
+    assert archive_crud.archive_done(db, datetime.now(timezone.utc) - timedelta(days=1), limit=10) == []
+    assert [task.id for task in archive_crud.archive_done(db, datetime.now(timezone.utc) + timedelta(minutes=1), limit=10)] == [done_id]
+    # Открытые задачи не архивируются
+    assert archive_crud.archive_done(db, datetime.now(timezone.utc) + timedelta(minutes=1), limit=10) == []
@@ -0,0 +1,89 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.api_v1.endpoints import projects
+from app.core.database import get_db
+from app.models import User
+from app.models.user import UserRole
+from app.services.auth import get_current_user_for_stream
+from app.services.events import EventBroker
+
+
+async def _next(subscription):
+    return await asyncio.wait_for(subscription.queue.get(), timeout=1)
+
+
+def test_broker_delivers_by_visibility():
+    async def scenario():
+        broker = EventBroker()
+        await broker.start()
+        try:
+            async with broker.subscribe(1, 10, False) as worker, broker.subscribe(1, 20, True) as creator:
+                broker.publish(1, "task.updated", {"id": 5}, visible_to=[10])
+                # Синхронные эндпоинты публикуют из пула потоков
+                await asyncio.to_thread(broker.publish, 1, "task.updated", {"id": 6}, [30])
+                broker.publish(2, "task.updated", {"id": 7})
+
+                seen = [await _next(creator), await _next(creator)]
+                assert [event["data"]["id"] for event in seen] == [5, 6]
+                assert seen[0]["id"] < seen[1]["id"]
+
+                assert (await _next(worker))["data"]["id"] == 5
+                await asyncio.sleep(0.05)
+                assert worker.queue.empty() and creator.queue.empty()
+        finally:
+            await broker.stop()
+        assert broker.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_gets_resync():
+    async def scenario():
+        broker = EventBroker()
+        await broker.start()
+        try:
+            async with broker.subscribe(1, 10, True) as subscription:
+                for i in range(subscription.queue.maxsize + 1):
+                    broker.publish(1, "task.updated", {"id": i})
+                await asyncio.sleep(0.05)
+
+                event = await _next(subscription)
+                assert event["type"] == "resync"
+                assert subscription.queue.empty()
+        finally:
+            await broker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_no_events_without_subscribers():
+    async def scenario():
+        broker = EventBroker()
+        await broker.start()
+        try:
+            assert not broker.wants(1)
+            async with broker.subscribe(1, 10, True):
+                assert broker.wants(1)
+                assert not broker.wants(2)
+        finally:
+            await broker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_events_stream_checks_project_access(db, creator, project):
+    worker = User(telegram_id=2001, first_name="Петр", role=UserRole.WORKER)
+    db.add(worker)
+    db.commit()
+
+    app = FastAPI()
+    app.include_router(projects.router, prefix="/api/v1/projects")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user_for_stream] = lambda: worker
+    client = TestClient(app)
+
+    assert client.get(f"/api/v1/projects/{project.id}/events").status_code == 403
+    assert client.get("/api/v1/projects/999/events").status_code == 404
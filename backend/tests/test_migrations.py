@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.approval import approval_crud
+from app.models import Base
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+ACTION_INDEXES = {"ix_approval_requests_action_project", "ix_approval_requests_action_title"}
+
+# action_data до 006: произвольный текст
+LEGACY_ACTION_DATA = {
+    1: '{"title": "Замер", "project_id": 1}',
+    2: "Купить цемент",
+    3: "   ",
+    4: "[1, 2]",
+    5: None,
+}
+
+
+@pytest.fixture
+def alembic_db(tmp_path, monkeypatch):
+    """Файловая SQLite в рабочем каталоге теста (env.py берет settings.database_url)"""
+    monkeypatch.chdir(tmp_path)
+    # Без alembic.ini: fileConfig не перенастраивает логирование тестов
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.set_main_option("version_locations", str(BACKEND_DIR.parent / "migrations" / "versions"))
+    engine = create_engine(f"sqlite:///{tmp_path / 'project_manager.db'}")
+    yield config, engine
+    engine.dispose()
+
+
+def _indexes(engine) -> set:
+    with engine.connect() as conn:
+        return set(conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'approval_requests'"
+        )).scalars())
+
+
+def _action_data(engine) -> dict:
+    with engine.connect() as conn:
+        return dict(conn.execute(text("SELECT id, action_data FROM approval_requests")).all())
+
+
+def test_006_round_trips_legacy_action_data(alembic_db):
+    config, engine = alembic_db
+    # Схема ревизии 005: те же таблицы без индексов по action_data
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for name in ACTION_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+        for approval_id, value in LEGACY_ACTION_DATA.items():
+            conn.execute(text(
+                "INSERT INTO approval_requests (id, requester_id, approver_id, action_type, entity_type, "
+                "entity_id, action_data, status, project_id) "
+                "VALUES (:id, 1, 2, 'CREATE_TASK', 'task', 0, :data, 'PENDING', 1)"
+            ), {"id": approval_id, "data": value})
+    command.stamp(config, "005")
+
+    command.upgrade(config, "006")
+
+    assert ACTION_INDEXES <= _indexes(engine)
+    upgraded = {k: json.loads(v) if v is not None else None for k, v in _action_data(engine).items()}
+    assert upgraded == {
+        1: {"title": "Замер", "project_id": 1},
+        2: {"text": "Купить цемент"},
+        3: None,
+        4: {"text": "[1, 2]"},
+        5: None,
+    }
+    # Поиск дубля по выражениям индексов находит исходный JSON объект
+    with sessionmaker(bind=engine)() as session:
+        assert approval_crud.get_pending_task_request(session, 1, 1, "Замер").id == 1
+
+    command.downgrade(config, "005")
+    assert not ACTION_INDEXES & _indexes(engine)
+    # Данные после отката остаются текстом JSON и повторный upgrade их не меняет
+    downgraded = _action_data(engine)
+    assert json.loads(downgraded[2]) == {"text": "Купить цемент"}
+
+    command.upgrade(config, "006")
+    assert _action_data(engine) == downgraded
+    assert ACTION_INDEXES <= _indexes(engine)
@@ -0,0 +1,62 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import profiling
+from app.core.config import settings
+from app.core.profiling import QueryBudgetExceeded, QueryProfilerMiddleware, query_budget
+from app.models import Project
+
+
+@pytest.fixture
+def client(engine, creator):
+    """Приложение с профилировщиком: эндпоинты с бюджетом и без"""
+    profiling.instrument_engine(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    def get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.add_middleware(QueryProfilerMiddleware, engine=engine)
+
+    @app.get("/projects/n-plus-one", dependencies=[query_budget(2)])
+    def projects_n_plus_one(db: Session = Depends(get_db)):
+        # Отдельный запрос на каждый проект
+        ids = [project_id for (project_id,) in db.query(Project.id).all()]
+        return [db.get(Project, project_id).name for project_id in ids]
+
+    @app.get("/projects", dependencies=[query_budget(2)])
+    def projects(db: Session = Depends(get_db)):
+        return [project.name for project in db.query(Project).all()]
+
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([Project(name=f"Объект {i}", created_by=creator.id) for i in range(3)])
+        db.commit()
+    return TestClient(app)
+
+
+def test_endpoint_within_budget(client):
+    response = client.get("/projects")
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert response.headers["X-DB-Query-Budget"] == "2"
+    assert int(response.headers["X-DB-Queries"]) <= 2
+
+
+def test_endpoint_over_budget_raises_in_strict_mode(client):
+    assert settings.QUERY_BUDGET_STRICT
+    with pytest.raises(QueryBudgetExceeded, match="4 SQL запросов при бюджете 2"):
+        client.get("/projects/n-plus-one")
+
+
+def test_endpoint_over_budget_only_logged_by_default(client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "QUERY_BUDGET_STRICT", False)
+    response = client.get("/projects/n-plus-one")
+    assert response.status_code == 200
+    assert "Превышен бюджет SQL запросов" in caplog.text
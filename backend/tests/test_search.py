@@ -0,0 +1,29 @@
+import pytest
+
+from app.models import Project, Task
+from app.models.user import UserRole
+from app.services.search import SQLiteTaskSearch, task_search
+
+pytestmark = pytest.mark.skipif(
+    not isinstance(task_search, SQLiteTaskSearch), reason="Шарды-файлы SQLite"
+)
+
+
+def test_sharded_search_merges_by_relevance(db, creator, sharded_db):
+    weak, strong = Project(name="Склад", created_by=creator.id), Project(name="Стройка", created_by=creator.id)
+    db.add_all([weak, strong])
+    db.commit()
+
+    # В шарде первого проекта «цемент» только в описании, во втором - в названии
+    for i in range(2):
+        sharded_db.add(Task(title=f"Разгрузка {i}", description="Привезли цемент", project_id=weak.id, created_by=creator.id))
+        sharded_db.add(Task(title=f"Цемент М500 {i}", project_id=strong.id, created_by=creator.id))
+    sharded_db.commit()
+    assert len(sharded_db.router.shard_names()) == 2
+
+    found = task_search.search(sharded_db, "цемент", creator.id, UserRole.CREATOR, limit=2)
+    assert [task.project_id for task in found] == [strong.id, strong.id]
+
+    found = task_search.search(sharded_db, "цемент", creator.id, UserRole.CREATOR, limit=10)
+    assert len(found) == 4
+    assert [task.project_id for task in found[:2]] == [strong.id, strong.id]
@@ -0,0 +1,94 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.api.api_v1.endpoints import tasks
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.sharding import ShardRouter
+from app.models import Project, Task, TaskComment
+from app.services.auth import get_current_user
+from app.services.search import SQLiteTaskSearch, task_search
+
+pytestmark = pytest.mark.skipif(
+    not isinstance(task_search, SQLiteTaskSearch), reason="Шарды-файлы SQLite"
+)
+
+
+def _projects(db, creator, *names):
+    projects = [Project(name=name, created_by=creator.id) for name in names]
+    db.add_all(projects)
+    db.commit()
+    return projects
+
+
+def _task_ids(router, shard):
+    with router.engine(shard).connect() as conn:
+        return set(conn.execute(text("SELECT id FROM tasks")).scalars())
+
+
+def test_tasks_routed_to_project_shards(db, creator, sharded_db):
+    first, second = _projects(db, creator, "Склад", "Стройка")
+    a = Task(title="Разгрузка", project_id=first.id, created_by=creator.id)
+    b = Task(title="Кладка", project_id=second.id, created_by=creator.id)
+    sharded_db.add_all([a, b])
+    sharded_db.commit()
+    # Комментарий без project_id идет в шард своей задачи
+    sharded_db.add(TaskComment(task_id=b.id, author_id=creator.id, content="Раствор М200"))
+    sharded_db.commit()
+
+    router = sharded_db.router
+    assert sharded_db.shard_of(a) == f"project_{first.id}"
+    assert _task_ids(router, f"project_{first.id}") == {a.id}
+    assert _task_ids(router, f"project_{second.id}") == {b.id}
+    with router.engine(f"project_{second.id}").connect() as conn:
+        assert conn.execute(text("SELECT task_id FROM task_comments")).scalars().all() == [b.id]
+    # ID задач сквозные для всех шардов
+    assert a.id != b.id
+
+    # Другой процесс без кэша находит задачу перебором шардов
+    fresh = ShardRouter()
+    try:
+        assert fresh.shard_for_project(second.id) == f"project_{second.id}"
+        assert fresh.shard_for_task(b.id) == f"project_{second.id}"
+        assert fresh.shard_for_task(10_000) is None
+    finally:
+        fresh.dispose()
+
+    sharded_db.expire_all()
+    assert [task.id for task in sharded_db.query(Task).filter(Task.project_id == second.id)] == [b.id]
+    assert {task.id for task in sharded_db.query(Task)} == {a.id, b.id}
+
+
+def test_default_shard_without_per_project(db, creator, sharded_db, monkeypatch):
+    monkeypatch.setattr(settings, "SHARD_PER_PROJECT", False)
+    first, second = _projects(db, creator, "Склад", "Стройка")
+    sharded_db.add_all([
+        Task(title="Разгрузка", project_id=first.id, created_by=creator.id),
+        Task(title="Кладка", project_id=second.id, created_by=creator.id),
+    ])
+    sharded_db.commit()
+
+    assert sharded_db.router.shard_names() == [settings.SHARD_DEFAULT]
+    assert len(_task_ids(sharded_db.router, settings.SHARD_DEFAULT)) == 2
+
+
+def test_changes_require_project_when_sharded(db, creator, sharded_db, monkeypatch):
+    monkeypatch.setattr(settings, "SHARDING_ENABLED", True)
+    (project,) = _projects(db, creator, "Склад")
+    sharded_db.add(Task(title="Разгрузка", project_id=project.id, created_by=creator.id))
+    sharded_db.commit()
+
+    app = FastAPI()
+    app.include_router(tasks.router, prefix="/api/v1/tasks")
+    app.dependency_overrides[get_db] = lambda: sharded_db
+    app.dependency_overrides[get_current_user] = lambda: creator
+    client = TestClient(app)
+
+    # Курсоры разных шардов несравнимы
+    assert client.get("/api/v1/tasks/changes").status_code == 422
+
+    response = client.get("/api/v1/tasks/changes", params={"project_id": project.id})
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json()["tasks"]] == ["Разгрузка"]
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.startup import DEFAULT_VERSIONS_DIR, current_revision, head_revision, prepare_schema
+from app.models import Base
+
+HEAD = head_revision(DEFAULT_VERSIONS_DIR)
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_empty_database_created_and_stamped(file_engine):
+    assert prepare_schema(file_engine, Base.metadata) == f"создана схема, ревизия {HEAD}"
+    assert current_revision(file_engine) == HEAD
+
+
+def test_create_all_database_without_revision_suggests_stamp_head(file_engine, caplog):
+    Base.metadata.create_all(file_engine)
+
+    assert prepare_schema(file_engine, Base.metadata) == "create_all"
+    assert "alembic stamp head" in caplog.text
+    assert current_revision(file_engine) is None
+
+
+def test_baseline_database_needs_migrations(file_engine):
+    # Таблица задач исходной версии: без change_seq, reminder_sent_at и т.д.
+    with file_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE tasks (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL)"))
+
+    with pytest.raises(RuntimeError, match=r"alembic stamp 001 && alembic upgrade head") as error:
+        prepare_schema(file_engine, Base.metadata)
+    assert "tasks.change_seq" in str(error.value)
+    assert "stamp head" not in str(error.value)
+    # Таблицы будущих миграций не созданы - upgrade с 001 пройдет
+    assert inspect(file_engine).get_table_names() == ["tasks"]
+
+
+def test_partially_migrated_database_without_revision(file_engine):
+    Base.metadata.create_all(file_engine)
+    with file_engine.begin() as conn:
+        conn.execute(text("ALTER TABLE tasks DROP COLUMN reminder_sent_at"))
+
+    with pytest.raises(RuntimeError, match="tasks.reminder_sent_at") as error:
+        prepare_schema(file_engine, Base.metadata)
+    assert "stamp head" not in str(error.value)
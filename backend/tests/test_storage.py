@@ -0,0 +1,206 @@
+import asyncio
+import hashlib
+import hmac
+import io
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, quote, urlsplit
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.api_v1.endpoints import files
+from app.services.storage import LocalStorage, S3Storage, StorageBackend
+
+ACCESS_KEY = "minioadmin"
+SECRET_KEY = "minio-secret"
+BUCKET = "wepban"
+
+
+def _sigv4_valid(method: str, path: str, query: str, host: str) -> bool:
+    """Независимая проверка подписи SigV4 (query string) на стороне фейка"""
+    params = dict(parse_qsl(query, keep_blank_values=True))
+    signature = params.pop("X-Amz-Signature", "")
+    try:
+        access_key, datestamp, region, service, terminator = params["X-Amz-Credential"].split("/")
+        signed_at = datetime.strptime(params["X-Amz-Date"], "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        expires = int(params["X-Amz-Expires"])
+    except (KeyError, ValueError):
+        return False
+    if access_key != ACCESS_KEY or params.get("X-Amz-SignedHeaders") != "host":
+        return False
+    if signed_at + timedelta(seconds=expires) < datetime.now(timezone.utc):
+        return False
+
+    canonical_query = "&".join(
+        f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(params.items())
+    )
+    canonical_request = f"{method}\n{path}\n{canonical_query}\nhost:{host}\n\nhost\nUNSIGNED-PAYLOAD"
+    scope = f"{datestamp}/{region}/{service}/{terminator}"
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256", params["X-Amz-Date"], scope,
+        hashlib.sha256(canonical_request.encode()).hexdigest(),
+    ])
+    key = f"AWS4{SECRET_KEY}".encode()
+    for part in (datestamp, region, service, terminator):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    expected = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    """Минимальный S3: PUT/GET/HEAD/DELETE объектов по подписанным ссылкам"""
+
+    objects = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _authorized(self) -> bool:
+        url = urlsplit(self.path)
+        if _sigv4_valid(self.command, url.path, url.query, self.headers["Host"]):
+            return True
+        self._reply(403, b"SignatureDoesNotMatch")
+        return False
+
+    def _reply(self, status: int, body: bytes = b""):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_PUT(self):
+        if self._authorized():
+            self.objects[urlsplit(self.path).path] = self.rfile.read(int(self.headers["Content-Length"]))
+            self._reply(200)
+
+    def do_GET(self):
+        if self._authorized():
+            body = self.objects.get(urlsplit(self.path).path)
+            self._reply(200, body) if body is not None else self._reply(404, b"NoSuchKey")
+
+    def do_HEAD(self):
+        if self._authorized():
+            body = self.objects.get(urlsplit(self.path).path)
+            self._reply(200, body) if body is not None else self._reply(404)
+
+    def do_DELETE(self):
+        if self._authorized():
+            self.objects.pop(urlsplit(self.path).path, None)
+            self._reply(204)
+
+
+@pytest.fixture
+def s3_endpoint():
+    """Адрес локального фейка S3 в отдельном потоке"""
+    FakeS3Handler.objects = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeS3Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def s3(s3_endpoint):
+    return S3Storage(s3_endpoint, BUCKET, ACCESS_KEY, SECRET_KEY)
+
+
+def test_storage_backend_is_abstract():
+    with pytest.raises(TypeError):
+        StorageBackend()
+
+
+def test_s3_presigned_upload_and_download(s3):
+    key = s3.build_key("tasks/7", "фото акт.jpg")
+    upload = s3.presign_upload(key, "image/jpeg")
+
+    response = httpx.put(upload["url"], content=b"jpeg-bytes", headers=upload["headers"])
+    assert response.status_code == 200
+
+    response = httpx.get(s3.presign_download(key))
+    assert response.status_code == 200
+    assert response.content == b"jpeg-bytes"
+
+
+def test_s3_internal_operations(s3):
+    key = "tasks/7/report.pdf"
+    assert asyncio.run(s3.size(key)) is None
+    assert asyncio.run(s3.save(key, io.BytesIO(b"%PDF-1.4"), "application/pdf")) == 8
+    assert asyncio.run(s3.size(key)) == 8
+    assert asyncio.run(s3.delete(key)) is True
+    assert asyncio.run(s3.size(key)) is None
+
+
+def test_s3_rejects_bad_signatures(s3, s3_endpoint):
+    key = "tasks/7/photo.jpg"
+    asyncio.run(s3.save(key, io.BytesIO(b"data"), "image/jpeg"))
+
+    url = s3.presign_download(key)
+    tampered = url[:-1] + ("0" if url[-1] != "0" else "1")
+    assert httpx.get(tampered).status_code == 403
+
+    # Подпись другой ссылки не подходит к чужому ключу
+    other = s3.presign_download("tasks/7/other.jpg")
+    assert httpx.get(other.replace("other.jpg", "photo.jpg")).status_code == 403
+
+    wrong_secret = S3Storage(s3_endpoint, BUCKET, ACCESS_KEY, "wrong-secret")
+    assert httpx.get(wrong_secret.presign_download(key)).status_code == 403
+
+    expired = s3.presign("GET", key, 60, now=datetime.now(timezone.utc) - timedelta(hours=1))
+    assert httpx.get(expired).status_code == 403
+
+
+def test_s3_public_endpoint_is_signed_for_its_host(s3_endpoint):
+    # Ссылка для браузера подписана на публичный адрес, внутренние операции - на внутренний
+    public = s3_endpoint.replace("127.0.0.1", "localhost")
+    storage = S3Storage(s3_endpoint, BUCKET, ACCESS_KEY, SECRET_KEY, public_endpoint_url=public)
+    asyncio.run(storage.save("a/b.txt", io.BytesIO(b"hi"), "text/plain"))
+
+    url = storage.presign_download("a/b.txt")
+    assert url.startswith(public)
+    assert httpx.get(url).content == b"hi"
+
+
+@pytest.fixture
+def local(tmp_path):
+    return LocalStorage(str(tmp_path), "http://testserver", "test-secret-key")
+
+
+def test_local_signature_checks(local):
+    expires = int(time.time()) + 60
+    signature = local.sign("GET", "tasks/1/a.jpg", expires)
+
+    assert local.verify("GET", "tasks/1/a.jpg", expires, signature)
+    assert not local.verify("PUT", "tasks/1/a.jpg", expires, signature)
+    assert not local.verify("GET", "tasks/1/b.jpg", expires, signature)
+    assert not local.verify("GET", "tasks/1/a.jpg", expires + 1, signature)
+
+    past = int(time.time()) - 1
+    assert not local.verify("GET", "tasks/1/a.jpg", past, local.sign("GET", "tasks/1/a.jpg", past))
+
+
+def test_local_links_through_files_router(local, monkeypatch):
+    monkeypatch.setattr(files, "storage", local)
+    app = FastAPI()
+    app.include_router(files.router, prefix="/api/v1/files")
+    client = TestClient(app)
+
+    key = local.build_key("tasks/1", "photo.jpg")
+    upload = local.presign_upload(key, "image/jpeg")
+    response = client.put(upload["url"], content=b"jpeg-bytes", headers=upload["headers"])
+    assert response.status_code == 200
+    assert response.json()["size"] == 10
+
+    download = local.presign_download(key)
+    assert client.get(download).content == b"jpeg-bytes"
+
+    # GET-подпись не дает права на загрузку
+    assert client.put(download, content=b"other").status_code == 403
+    assert client.get(download.replace("signature=", "signature=0")).status_code == 403
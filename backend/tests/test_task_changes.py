@@ -0,0 +1,114 @@
+from app.crud.task import task_crud
+from app.models import User
+from app.models.user import UserRole
+from app.schemas.task import TaskCreate, TaskUpdate
+
+
+def _worker(db, telegram_id: int) -> User:
+    user = User(telegram_id=telegram_id, first_name="Петр", role=UserRole.WORKER)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_reassigned_task_tombstoned_for_previous_assignee(db, creator, project):
+    old, new = _worker(db, 2001), _worker(db, 2002)
+    task = task_crud.create(db, TaskCreate(title="Замер", project_id=project.id, assigned_to=old.id), creator.id)
+    cursor = task_crud.get_changes(db, 0, old.id, UserRole.WORKER)["cursor"]
+
+    task_crud.update(db, task.id, TaskUpdate(assigned_to=new.id))
+
+    changes = task_crud.get_changes(db, cursor, old.id, UserRole.WORKER)
+    assert changes["deleted"] == [task.id]
+    assert changes["tasks"] == []
+    assert [t.id for t in task_crud.get_changes(db, cursor, new.id, UserRole.WORKER)["tasks"]] == [task.id]
+
+    # Для создателя переназначение - обычное изменение, не удаление
+    changes = task_crud.get_changes(db, cursor, creator.id, UserRole.CREATOR)
+    assert changes["deleted"] == []
+    assert [t.id for t in changes["tasks"]] == [task.id]
+
+
+def test_task_assigned_back_is_not_deleted(db, creator, project):
+    old, new = _worker(db, 2001), _worker(db, 2002)
+    task = task_crud.create(db, TaskCreate(title="Замер", project_id=project.id, assigned_to=old.id), creator.id)
+    cursor = task_crud.get_changes(db, 0, old.id, UserRole.WORKER)["cursor"]
+
+    task_crud.update(db, task.id, TaskUpdate(assigned_to=new.id))
+    task_crud.update(db, task.id, TaskUpdate(assigned_to=old.id))
+
+    changes = task_crud.get_changes(db, cursor, old.id, UserRole.WORKER)
+    assert changes["deleted"] == []
+    assert [t.id for t in changes["tasks"]] == [task.id]
+
+
+def _create(db, creator, project, *titles):
+    return [task_crud.create(db, TaskCreate(title=title, project_id=project.id), creator.id).id for title in titles]
+
+
+def _sync(db, user, role, since=0, limit=500):
+    """Полная догрузка постранично: (задачи по ID, удаленные ID, курсор, число страниц)"""
+    tasks, deleted, pages = {}, [], 0
+    while True:
+        changes = task_crud.get_changes(db, since, user.id, role, limit=limit)
+        pages += 1
+        for task_id in changes["deleted"]:
+            tasks.pop(task_id, None)
+            deleted.append(task_id)
+        tasks.update({task.id: task.title for task in changes["tasks"]})
+        since = changes["cursor"]
+        if not changes["has_more"]:
+            return tasks, deleted, since, pages
+
+
+def test_changes_paginate_by_cursor(db, creator, project):
+    ids = _create(db, creator, project, *(f"Задача {i}" for i in range(5)))
+
+    first = task_crud.get_changes(db, 0, creator.id, UserRole.CREATOR, limit=2)
+    assert [task.id for task in first["tasks"]] == ids[:2]
+    assert first["has_more"]
+    second = task_crud.get_changes(db, first["cursor"], creator.id, UserRole.CREATOR, limit=2)
+    assert [task.id for task in second["tasks"]] == ids[2:4]
+
+    tasks, deleted, cursor, pages = _sync(db, creator, UserRole.CREATOR, limit=2)
+    assert sorted(tasks) == ids and deleted == [] and pages == 3
+
+    # Без изменений курсор стоит на месте
+    empty = task_crud.get_changes(db, cursor, creator.id, UserRole.CREATOR)
+    assert (empty["cursor"], empty["tasks"], empty["deleted"], empty["has_more"]) == (cursor, [], [], False)
+
+
+def test_changes_cursor_across_deletes(db, creator, project):
+    ids = _create(db, creator, project, "Замер", "Кладка", "Штукатурка", "Покраска")
+    _, _, cursor, _ = _sync(db, creator, UserRole.CREATOR)
+
+    task_crud.delete(db, ids[1])
+    task_crud.update(db, ids[2], TaskUpdate(title="Штукатурка стен"))
+    task_crud.delete(db, ids[3])
+
+    # Удаление и изменение идут в порядке номеров изменений, на разных страницах
+    page = task_crud.get_changes(db, cursor, creator.id, UserRole.CREATOR, limit=1)
+    assert (page["deleted"], page["tasks"], page["has_more"]) == ([ids[1]], [], True)
+    page = task_crud.get_changes(db, page["cursor"], creator.id, UserRole.CREATOR, limit=1)
+    assert [task.title for task in page["tasks"]] == ["Штукатурка стен"]
+    page = task_crud.get_changes(db, page["cursor"], creator.id, UserRole.CREATOR, limit=1)
+    assert (page["deleted"], page["has_more"]) == ([ids[3]], False)
+
+    # Клиент с нуля получает только живые задачи, какие бы страницы ни были
+    for limit in (1, 2, 500):
+        tasks, _, _, _ = _sync(db, creator, UserRole.CREATOR, limit=limit)
+        assert tasks == {ids[0]: "Замер", ids[2]: "Штукатурка стен"}
+
+
+def test_changes_visibility_of_deletes(db, creator, project):
+    worker = _worker(db, 2001)
+    own = task_crud.create(db, TaskCreate(title="Замер", project_id=project.id, assigned_to=worker.id), creator.id).id
+    other = _create(db, creator, project, "Кладка")[0]
+    _, _, cursor, _ = _sync(db, worker, UserRole.WORKER)
+
+    task_crud.delete(db, own)
+    task_crud.delete(db, other)
+
+    changes = task_crud.get_changes(db, cursor, worker.id, UserRole.WORKER)
+    assert changes["deleted"] == [own]
+    assert task_crud.get_changes(db, cursor, creator.id, UserRole.CREATOR)["deleted"] == [own, other]
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta, timezone
+
+from app.crud.task import task_crud
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.services.reminders import _as_utc
+
+MOSCOW = timezone(timedelta(hours=3))
+
+
+def test_create_stores_deadline_in_utc(db, creator, project):
+    deadline = datetime(2026, 10, 20, 10, 0, tzinfo=MOSCOW)
+    task = task_crud.create(db, TaskCreate(title="Замер", project_id=project.id, deadline=deadline), creator.id)
+
+    db.expire_all()
+    stored = task_crud.get(db, task.id).deadline
+    assert _as_utc(stored) == deadline
+    assert _as_utc(stored).hour == 7
+
+
+def test_update_stores_deadline_in_utc(db, creator, project):
+    task = task_crud.create(db, TaskCreate(title="Замер", project_id=project.id), creator.id)
+    deadline = datetime(2026, 10, 20, 10, 0, tzinfo=MOSCOW)
+    task_crud.update(db, task.id, TaskUpdate(deadline=deadline))
+
+    db.expire_all()
+    assert _as_utc(task_crud.get(db, task.id).deadline) == deadline
+
+
+def test_naive_deadline_kept_as_utc(db, creator, project):
+    deadline = datetime(2026, 10, 20, 10, 0)
+    task = task_crud.create(db, TaskCreate(title="Замер", project_id=project.id, deadline=deadline), creator.id)
+
+    db.expire_all()
+    assert _as_utc(task_crud.get(db, task.id).deadline) == deadline.replace(tzinfo=timezone.utc)
@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.task_parser import deadline_to_utc, parse_task_text, to_local
+
+NOW = datetime(2026, 10, 19, 12, 0)  # понедельник
+PROJECTS = [{"id": 1, "name": "Стройка"}, {"id": 2, "name": "Офис"}]
+
+
+@pytest.mark.parametrize("text, title, deadline", [
+    ("позвонить в 19:30 прорабу в офис", "Позвонить прорабу", datetime(2026, 10, 19, 19, 30)),
+    ("задача: в 9:00 открыть склад в офисе", "Открыть склад", datetime(2026, 10, 20, 9, 0)),
+    ("завтра к 10 купить цемент для офиса", "Купить цемент", datetime(2026, 10, 20, 10, 0)),
+    ("в 7 вечера позвонить в офис", "Позвонить", datetime(2026, 10, 19, 19, 0)),
+    ("к 10 марта сдать отчет для офиса", "Сдать отчет", datetime(2027, 3, 10, 18, 0)),
+])
+def test_time_followed_by_words(text, title, deadline):
+    parsed = parse_task_text(text, PROJECTS, NOW)
+    assert parsed.title == title
+    assert parsed.deadline == deadline
+    assert parsed.project_id == 2
+    assert parsed.is_complete
+
+
+@pytest.mark.parametrize("text", [
+    "задача: завтра в 10 купить цемент в офис",
+    "задача: до 10 числа сдать отчет в офис",
+])
+def test_leftover_time_goes_to_model(text):
+    parsed = parse_task_text(text, PROJECTS, NOW)
+    assert parsed.title is None
+    assert parsed.deadline is None
+    assert not parsed.is_complete
+
+
+@pytest.mark.parametrize("text", [
+    "сделать замер окон на стройке",
+    "сделать замер окон по стройке",
+    "сделать замер окон для стройки",
+])
+def test_project_strips_preposition(text):
+    parsed = parse_task_text(text, PROJECTS, NOW)
+    assert parsed.project_id == 1
+    assert parsed.title == "Сделать замер окон"
+
+
+def test_deadline_to_utc_uses_task_timezone():
+    # TASK_TIMEZONE по умолчанию - Europe/Moscow (UTC+3)
+    assert deadline_to_utc("2026-10-20 10:00") == datetime(2026, 10, 20, 7, 0, tzinfo=timezone.utc)
+    assert deadline_to_utc(None) is None
+    assert deadline_to_utc("когда-нибудь") is None
+
+
+def test_to_local_reads_naive_as_utc():
+    assert to_local(datetime(2026, 10, 20, 7, 0)).strftime("%H:%M") == "10:00"
+
+
+@pytest.mark.parametrize("text, deadline", [
+    ("задача: в среду залить фундамент", datetime(2026, 10, 21, 18, 0)),
+    ("задача: до пятницы сдать отчет", datetime(2026, 10, 23, 18, 0)),
+    ("задача: к воскресенью убрать склад", datetime(2026, 10, 25, 18, 0)),
+    ("задача: в следующий понедельник вывезти мусор", datetime(2026, 10, 26, 18, 0)),
+])
+def test_weekday_forms(text, deadline):
+    assert parse_task_text(text, PROJECTS, NOW).deadline == deadline
+
+
+@pytest.mark.parametrize("text, title", [
+    ("задача: купить моющее средство", "Купить моющее средство"),
+    ("задача: заказать средний перфоратор", "Заказать средний перфоратор"),
+    ("задача: организовать субботник", "Организовать субботник"),
+])
+def test_weekday_stem_inside_word_is_not_deadline(text, title):
+    parsed = parse_task_text(text, PROJECTS, NOW)
+    assert parsed.deadline is None
+    assert parsed.title == title
+
+
+@pytest.mark.parametrize("text, complete", [
+    ("спасибо", False),
+    ("ок, понял", False),
+    ("купить цемент завтра", True),
+    ("срочно купить цемент", True),
+    ("задача: купить цемент", True),
+])
+def test_short_text_needs_task_signal(text, complete):
+    # Единственный проект подставляется всегда - название без признаков поручения решает модель
+    assert parse_task_text(text, PROJECTS[:1], NOW).is_complete is complete
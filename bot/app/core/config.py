@@ -8,11 +8,37 @@ class Settings(BaseSettings):
     WEBAPP_URL: str = "https://projectmanager.chickenkiller.com"
     BACKEND_URL: str = "https://projectmanager.chickenkiller.com"
     
+    # Режим получения апдейтов: "polling" или "webhook"
+    BOT_MODE: str = "polling"
+    TELEGRAM_API_URL: Optional[str] = None  # Свой Bot API сервер (или локальный фейк для тестов)
+    
+    # Webhook
+    WEBHOOK_BASE_URL: Optional[str] = None  # Публичный HTTPS адрес, например https://bot.example.com
+    WEBHOOK_PATH: str = "/telegram/webhook"
+    WEBHOOK_SECRET: Optional[str] = None  # Обязателен в режиме webhook: проверяется заголовок X-Telegram-Bot-Api-Secret-Token
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8081
+    WEBHOOK_MAX_CONNECTIONS: int = 40
+    WEBHOOK_MAX_CONCURRENCY: int = 32
+    WEBHOOK_DROP_PENDING_UPDATES: bool = False
+    
     # OpenAI
     OPENAI_API_KEY: str
+
+    # Локальный классификатор намерений перед вызовом LLM
+    INTENT_MODEL_PATH: Optional[str] = None  # JSON модель; без нее обучается на встроенных примерах
+    INTENT_LOG_PATH: Optional[str] = None  # JSONL журнал сообщений с разметкой от LLM для дообучения
+    INTENT_THRESHOLD: float = 0.25  # Ниже порога сообщение не считается задачей и LLM не вызывается
+    TASK_TIMEZONE: str = "Europe/Moscow"  # Часовой пояс для показа дедлайнов (как на сервере)
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" или "text"
+    LOG_LEVELS: str = "aiogram.event=WARNING,httpx=WARNING"  # Уровни по модулям: "модуль=УРОВЕНЬ,..."
     
     # Monitoring
     SENTRY_DSN: Optional[str] = None
+    METRICS_PORT: Optional[int] = None  # Prometheus в режиме polling; в режиме webhook - /metrics на сервере вебхука
     
     # Environment
     ENVIRONMENT: str = "development"
@@ -0,0 +1,68 @@
+import re
+import time
+from typing import Any
+
+from aiohttp import web
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, REGISTRY, generate_latest, start_http_server
+
+UPDATES = Counter("bot_updates_total", "Полученные апдейты Telegram", ["type"])
+HANDLER_DURATION = Histogram(
+    "bot_handler_duration_seconds", "Время работы обработчика", ["handler", "status"]
+)
+BACKEND_REQUEST_DURATION = Histogram(
+    "bot_backend_request_duration_seconds", "Время запроса к backend API", ["method", "endpoint", "status"]
+)
+OPENAI_REQUEST_DURATION = Histogram(
+    "bot_openai_request_duration_seconds", "Время запроса к OpenAI", ["operation"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+)
+OPENAI_TOKENS = Counter("bot_openai_tokens_total", "Токены OpenAI", ["model", "type"])
+PENDING_UPDATES = Gauge("bot_pending_updates", "Апдейты вебхука в обработке и в очереди")
+
+_ID_RE = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_label(path: str) -> str:
+    """Путь без префикса API и идентификаторов: /api/v1/tasks/5 -> /tasks/{id}"""
+    if "/api/v1" not in path:
+        return "external"  # Загрузка в хранилище по presigned ссылке и т.п.
+    return _ID_RE.sub("/{id}", path.split("/api/v1", 1)[-1])
+
+
+async def _on_request(request):
+    request.extensions["started"] = time.perf_counter()
+
+
+async def _on_response(response):
+    request = response.request
+    started = request.extensions.get("started")
+    if started is not None:
+        BACKEND_REQUEST_DURATION.labels(
+            request.method, endpoint_label(request.url.path), str(response.status_code)
+        ).observe(time.perf_counter() - started)
+
+
+# Хуки httpx для клиентов backend API
+BACKEND_EVENT_HOOKS = {"request": [_on_request], "response": [_on_response]}
+
+
+def observe_openai(operation: str, started: float, response: Any = None):
+    """Время и токены запроса к OpenAI"""
+    OPENAI_REQUEST_DURATION.labels(operation).observe(time.perf_counter() - started)
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        model = getattr(response, "model", "unknown")
+        OPENAI_TOKENS.labels(model, "prompt").inc(usage.prompt_tokens or 0)
+        OPENAI_TOKENS.labels(model, "completion").inc(usage.completion_tokens or 0)
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    """/metrics для aiohttp-приложения вебхука"""
+    response = web.Response(body=generate_latest(REGISTRY))
+    response.content_type = CONTENT_TYPE_LATEST.split(";")[0]
+    return response
+
+
+def serve_metrics(port: int):
+    """Отдельный HTTP сервер метрик (режим polling)"""
+    start_http_server(port)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from app.core.config import settings
+from app.core.metrics import PENDING_UPDATES, metrics_handler
+
+logger = logging.getLogger(__name__)
+
+# Допустимый секрет вебхука по документации Bot API
+WEBHOOK_SECRET_RE = re.compile(r"^[A-Za-z0-9_-]{1,256}$")
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Обработчик вебхука с ограничением числа одновременно обрабатываемых апдейтов.
+
+    Telegram получает ответ сразу (handle_in_background), а сами апдейты
+    обрабатываются не более чем `max_concurrency` штук одновременно.
+    Апдейты неразрешенных типов отбрасываются без передачи в диспетчер.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        max_concurrency: int,
+        allowed_updates: Optional[List[str]] = None,
+        **kwargs: Any
+    ):
+        super().__init__(dispatcher=dispatcher, bot=bot, **kwargs)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.allowed_updates = set(allowed_updates) if allowed_updates else None
+
+    def _is_allowed(self, update: Dict[str, Any]) -> bool:
+        if self.allowed_updates is None:
+            return True
+        return any(key in self.allowed_updates for key in update if key != "update_id")
+
+    async def _background_feed_update(self, bot: Bot, update: Dict[str, Any]) -> None:
+        if not self._is_allowed(update):
+            logger.debug(f"Пропущен апдейт неразрешенного типа: {update.get('update_id')}")
+            return
+        async with self._semaphore:
+            try:
+                await super()._background_feed_update(bot=bot, update=update)
+            except Exception as e:
+                logger.error(f"Ошибка обработки апдейта {update.get('update_id')}: {e}", exc_info=True)
+
+    @property
+    def pending(self) -> int:
+        """Количество апдейтов в обработке и в очереди"""
+        return len(self._background_feed_update_tasks)
+
+
+def create_webhook_app(bot: Bot, dp: Dispatcher, allowed_updates: List[str]) -> web.Application:
+    """Создание aiohttp-приложения, принимающего вебхуки Telegram"""
+    # Без секрета любой, кто знает адрес, может присылать боту поддельные апдейты
+    if not settings.WEBHOOK_SECRET:
+        raise RuntimeError("Для BOT_MODE=webhook нужен WEBHOOK_SECRET (заголовок X-Telegram-Bot-Api-Secret-Token)")
+    if not WEBHOOK_SECRET_RE.match(settings.WEBHOOK_SECRET):
+        raise RuntimeError("WEBHOOK_SECRET: 1-256 символов A-Z, a-z, 0-9, _ и -")
+
+    app = web.Application()
+
+    handler = BoundedRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        max_concurrency=settings.WEBHOOK_MAX_CONCURRENCY,
+        allowed_updates=allowed_updates,
+        secret_token=settings.WEBHOOK_SECRET,
+    )
+    handler.register(app, path=settings.WEBHOOK_PATH)
+    app["webhook_handler"] = handler
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({"status": "healthy", "pending_updates": handler.pending})
+
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics_handler)
+    PENDING_UPDATES.set_function(lambda: handler.pending)
+
+    async def on_startup(*args: Any, **kwargs: Any) -> None:
+        url = f"{settings.WEBHOOK_BASE_URL.rstrip('/')}{settings.WEBHOOK_PATH}"
+        await bot.set_webhook(
+            url=url,
+            secret_token=settings.WEBHOOK_SECRET,
+            allowed_updates=allowed_updates,
+            max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+            drop_pending_updates=settings.WEBHOOK_DROP_PENDING_UPDATES,
+        )
+        logger.info(f"Вебхук установлен: {url}")
+
+    dp.startup.register(on_startup)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher, allowed_updates: List[str]) -> None:
+    """Запуск встроенного сервера приема вебхуков"""
+    if not settings.WEBHOOK_BASE_URL:
+        raise RuntimeError("Для BOT_MODE=webhook нужен WEBHOOK_BASE_URL")
+
+    app = create_webhook_app(bot, dp, allowed_updates)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=settings.WEBHOOK_HOST, port=settings.WEBHOOK_PORT)
+    await site.start()
+    logger.info(f"Прием вебхуков на {settings.WEBHOOK_HOST}:{settings.WEBHOOK_PORT}{settings.WEBHOOK_PATH}")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
@@ -149,6 +149,14 @@ async def admin_approvals(callback: CallbackQuery, user_data: Dict[str, Any] = N
                     InlineKeyboardButton(text=f"❌ Отклонить #{approval['id']}", callback_data=f"reject:{approval['id']}")
                 ])
             
+            if len(approvals) > 1:
+                # Только показанные запросы: пришедшие позже имеют больший ID
+                last_id = max(approval['id'] for approval in approvals)
+                keyboard_buttons.append([
+                    InlineKeyboardButton(text=f"✅ Одобрить все ({len(approvals)})", callback_data=f"approvals_all:approved:{last_id}"),
+                    InlineKeyboardButton(text="❌ Отклонить все", callback_data=f"approvals_all:rejected:{last_id}")
+                ])
+            
             keyboard_buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="admin_back")])
             keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
         
@@ -158,6 +166,46 @@ async def admin_approvals(callback: CallbackQuery, user_data: Dict[str, Any] = N
         logger.error(f"Ошибка получения запросов: {e}")
         await callback.message.edit_text(f"❌ Ошибка получения запросов: {str(e)}")
 
+@router.callback_query(F.data.startswith("approvals_all:"))
+async def admin_approvals_all(callback: CallbackQuery, user_data: Dict[str, Any] = None):
+    """Одобрение/отклонение всех показанных запросов одним пакетом"""
+    if not is_creator(user_data):
+        await callback.answer("❌ Доступ запрещен")
+        return
+    
+    _, status, last_id = callback.data.split(":")
+    await callback.answer("⏳ Обрабатываю запросы...")
+    
+    api_service = APIService()
+    
+    try:
+        auth_data = await api_service.authenticate_user(callback.from_user.id)
+        token = auth_data["access_token"]
+        
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            response = await client.get(f"{api_service.base_url}/api/v1/admin/approvals/pending", headers=headers)
+            response.raise_for_status()
+            approvals = [a for a in response.json() if a['id'] <= int(last_id)]
+        
+        if not approvals:
+            await callback.message.edit_text("⏳ Нет ожидающих запросов")
+            return
+        
+        reviewed = await api_service.review_approvals_batch(
+            callback.from_user.id, [{"id": a['id'], "status": status} for a in approvals]
+        )
+        if reviewed is None:
+            await callback.message.edit_text("❌ Не удалось обработать запросы")
+        elif status == "approved":
+            await callback.message.edit_text(f"✅ Одобрено запросов: {len(reviewed)}")
+        else:
+            await callback.message.edit_text(f"❌ Отклонено запросов: {len(reviewed)}")
+        
+    except Exception as e:
+        logger.error(f"Ошибка пакетной обработки запросов: {e}")
+        await callback.message.edit_text(f"❌ Ошибка обработки запросов: {str(e)}")
+
 @router.callback_query(F.data == "admin_add_user")
 async def admin_add_user(callback: CallbackQuery, user_data: Dict[str, Any] = None):
     """Добавление пользователя"""
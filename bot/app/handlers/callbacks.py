@@ -17,7 +17,7 @@ async def create_task_without_questions(callback: CallbackQuery):
         import json
         task_data = json.loads(task_data_str)
         
-        print(f"CALLBACK: Создаем задачу: {task_data}")
+        logger.debug(f"Создаем задачу: {task_data}")
         
         # Создаем задачу через API
         api_service = APIService()
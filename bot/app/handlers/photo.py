@@ -1,3 +1,4 @@
+import logging
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram import F
@@ -5,6 +6,8 @@ import tempfile
 import os
 from app.services.api import APIService
 
+logger = logging.getLogger(__name__)
+
 router = Router()
 
 
@@ -22,23 +25,23 @@ async def handle_photo(message: Message):
         
         # Сохраняем во временный файл
         temp_file_path = tempfile.mktemp(suffix=".jpg")
-        print(f"PHOTO HANDLER: Скачиваем файл в: {temp_file_path}")
+        logger.debug(f"Скачиваем файл в: {temp_file_path}")
         
         try:
             # В Aiogram 3.x используем bot.download_file
             await message.bot.download_file(file.file_path, temp_file_path)
-            print(f"PHOTO HANDLER: Файл успешно скачан: {temp_file_path}")
+            logger.debug(f"Файл успешно скачан: {temp_file_path}")
             
             # Проверяем, что файл существует и не пустой
             if os.path.exists(temp_file_path) and os.path.getsize(temp_file_path) > 0:
-                print(f"PHOTO HANDLER: Размер файла: {os.path.getsize(temp_file_path)} байт")
+                logger.debug(f"Размер файла: {os.path.getsize(temp_file_path)} байт")
             else:
-                print("PHOTO HANDLER: ОШИБКА - файл не существует или пустой!")
+                logger.error("ОШИБКА - файл не существует или пустой!")
                 await processing_msg.edit_text("❌ Ошибка загрузки фотографии")
                 return
                 
         except Exception as e:
-            print(f"PHOTO HANDLER: Ошибка скачивания файла: {e}")
+            logger.error(f"Ошибка скачивания файла: {e}")
             await processing_msg.edit_text("❌ Ошибка загрузки фотографии")
             return
         
@@ -110,7 +113,7 @@ async def create_task_with_photo(callback: CallbackQuery):
     photo_path = None
     if photo_hash and hasattr(create_task_with_photo, 'photo_cache'):
         photo_path = create_task_with_photo.photo_cache.get(photo_hash)
-        print(f"Retrieved photo path: {photo_path}")
+        logger.debug(f"Retrieved photo path: {photo_path}")
     
     await callback.answer("⏳ Создаю задачу с фото...")
     
@@ -145,7 +148,7 @@ async def create_task_with_photo(callback: CallbackQuery):
                     photo_path, 
                     created_task['id']
                 )
-                print(f"Photo saved: {photo_saved}")
+                logger.debug(f"Photo saved: {photo_saved}")
             
             success_text = f"✅ <b>Задача создана с фото!</b>\n\n"
             success_text += f"📋 <b>Название:</b> {created_task['title']}\n"
@@ -169,7 +172,7 @@ async def create_task_with_photo(callback: CallbackQuery):
             await callback.message.edit_text("❌ Не удалось создать задачу")
     
     except Exception as e:
-        print(f"PHOTO CALLBACK ERROR: {e}")
+        logger.error(f"Ошибка создания задачи с фото: {e}", exc_info=True)
         await callback.message.edit_text(f"❌ Ошибка создания задачи: {str(e)}")
 
 
@@ -1,8 +1,11 @@
+import logging
 from aiogram import Router, F
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.filters import CommandStart, Command
 from app.services.api import APIService
 
+logger = logging.getLogger(__name__)
+
 router = Router()
 
 
@@ -76,7 +79,7 @@ async def cmd_projects(message: Message):
     api_service = APIService()
     
     try:
-        print(f"PROJECTS: Using user ID: {message.from_user.id}")
+        logger.debug(f"Using user ID: {message.from_user.id}")
         projects = await api_service.get_user_projects(message.from_user.id)
         
         if not projects:
@@ -122,8 +125,8 @@ async def callback_ai_chat(callback):
 @router.callback_query(F.data == "my_projects")
 async def callback_projects(callback):
     """Обработчик кнопки проектов"""
-    print(f"CALLBACK: User ID: {callback.from_user.id}")
-    print(f"CALLBACK: Bot ID: {callback.bot.id}")
+    logger.debug(f"User ID: {callback.from_user.id}")
+    logger.debug(f"Bot ID: {callback.bot.id}")
     
     try:
         api_service = APIService()
@@ -2,32 +2,36 @@ import logging
 from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.filters import Command
-from app.services.ai import AIAssistant
 from app.services.api import APIService
+from app.services.intent import get_intent_classifier, log_intent
+from app.services.project_router import routed_projects
+from app.core.config import settings
 
 router = Router()
 logger = logging.getLogger(__name__)
 
+# Ответ на сообщения, которые не являются задачами
+NOT_TASK_REPLY = (
+    "🤖 Я понимаю только запросы на создание задач.\n\n"
+    "Попробуйте написать:\n"
+    "• \"Создай задачу: купить молоко\"\n"
+    "• \"Добавь задачу: позвонить клиенту\"\n"
+    "• \"Задача: подготовить презентацию\"\n"
+    "• Переслать сообщение с описанием проблемы"
+)
+
 @router.message(F.text & ~F.text.startswith('/'))
 async def handle_text_message(message: Message):
     """Обработка текстовых сообщений для создания задач (исключая команды)"""
-    logger.info(f"TEXT HANDLER: Получено текстовое сообщение от {message.from_user.id}: {message.text}")
-    print(f"TEXT HANDLER: Получено текстовое сообщение от {message.from_user.id}: {message.text}")
-        
-    logger.info(f"TEXT HANDLER: Обрабатываем текстовое сообщение: {message.text}")
-    print(f"TEXT HANDLER: Обрабатываем текстовое сообщение: {message.text}")
+    logger.debug(f"Текстовое сообщение от {message.from_user.id}: {message.text}")
     
     try:
         # Инициализируем сервисы
-        ai_service = AIAssistant()
         api_service = APIService()
         
-        # Проверяем, содержит ли сообщение запрос на создание задачи
-        task_keywords = ['создай', 'добавь', 'добавить', 'задача', 'задачи', 'todo', 'task', 'поломка', 'проблема', 'дефект', 'ремонт']
-        message_text = message.text.lower()
-        
-        print(f"Проверяем ключевые слова в: {message_text}")
-        print(f"Ключевые слова: {task_keywords}")
+        # Локальный классификатор отсекает сообщения, явно не являющиеся задачами
+        task_probability = get_intent_classifier().predict_proba(message.text)
+        logger.info(f"Вероятность задачи: {task_probability:.2f}")
         
         # Определяем, является ли это пересланным сообщением
         forwarded_from = None
@@ -38,7 +42,7 @@ async def handle_text_message(message: Message):
         
         # Расширенная логика определения задач
         is_task_request = (
-            any(keyword in message_text for keyword in task_keywords) or
+            task_probability >= settings.INTENT_THRESHOLD or
             message.photo or  # Сообщение с фото может быть задачей
             message.video or  # Сообщение с видео может быть задачей
             message.document or  # Документ может быть задачей
@@ -46,7 +50,6 @@ async def handle_text_message(message: Message):
         )
         
         if is_task_request:
-            print("Обнаружен запрос на создание задачи...")
             logger.info(f"Обнаружен запрос на создание задачи: {message.text}")
             
             # Отправляем сообщение о начале обработки
@@ -64,54 +67,50 @@ async def handle_text_message(message: Message):
                 await message.answer("❌ У вас нет доступных проектов. Обратитесь к администратору для получения доступа.")
                 return
             
-            # Используем AI для анализа и создания задачи
-            task_data = await ai_service.analyze_text_request(message.text, user_projects, forwarded_from)
-            
-            logger.info(f"AI анализ результата: {task_data}")
-            print(f"AI анализ результата: {task_data}")
+            # Разбор на сервере: короткие команды без модели, остальное - фоновая AI задача
+            result = await api_service.create_task_from_ai_data(
+                message.from_user.id, {"original_text": message.text}, routed_projects(message.text, user_projects)
+            )
+            logger.debug(f"Результат AI задачи: {result}")
             
-            if task_data.get("status") == "not_task":
-                await message.answer("❌ Это не похоже на задачу. Попробуйте написать что-то вроде: \"Создай задачу: купить молоко\"")
-            else:
-                # AI вернул данные задачи напрямую
-                logger.info("Создаем задачу через API...")
-                print("Создаем задачу через API...")
-                
-                # Извлекаем данные задачи из ответа AI
-                if "task" in task_data:
-                    task_payload = task_data["task"]
+            if result.get("status") == "task_created":
+                # Разметка для дообучения классификатора: сервер создал задачу
+                log_intent(message.text, True)
+                created_task = result["task"]
+                project = next((p for p in user_projects if p["id"] == created_task.get("project_id")), None)
+                await message.answer(
+                    f"✅ Задача создана!\n\n"
+                    f"📝 Название: {created_task.get('title', 'Без названия')}\n"
+                    f"📋 Описание: {created_task.get('description') or 'Без описания'}\n"
+                    f"📅 Статус: {created_task.get('status', 'Новая')}\n"
+                    f"🏷️ Проект: {project['name'] if project else 'Без проекта'}"
+                )
+                logger.info(f"Задача успешно создана: {created_task.get('id')}")
+            elif result.get("status") == "questions_needed":
+                questions = "\n".join(f"{i}. {q}" for i, q in enumerate(result["questions"], 1))
+                await message.answer(f"❓ Мне нужны уточнения:\n\n{questions}")
+            elif result.get("status") == "approval_requested":
+                log_intent(message.text, True)
+                if result.get("duplicate"):
+                    await message.answer("⏳ Такая задача уже ожидает одобрения создателя.")
                 else:
-                    task_payload = task_data
-                
-                print(f"Sending task payload: {task_payload}")
-                created_task = await api_service.create_task(task_payload, message.from_user.id)
-                
-                if created_task:
                     await message.answer(
-                        f"✅ Задача создана!\n\n"
-                        f"📝 Название: {created_task.get('title', 'Без названия')}\n"
-                        f"📋 Описание: {created_task.get('description', 'Без описания')}\n"
-                        f"📅 Статус: {created_task.get('status', 'Новая')}\n"
-                        f"🏷️ Проект: {created_task.get('project_name', 'Без проекта')}"
+                        f"⏳ Задача отправлена на одобрение создателю.\n\n"
+                        f"📝 Название: {result['suggested_task'].get('title') or 'Без названия'}"
                     )
-                    logger.info(f"Задача успешно создана: {created_task}")
-                else:
-                    await message.answer("❌ Не удалось создать задачу. Проверьте, что у вас есть доступные проекты.")
-                    logger.error("Не удалось создать задачу через API")
+            elif result.get("status") == "forbidden":
+                await message.answer(f"❌ {result['detail']}")
+            elif result.get("status") == "not_task":
+                # Разметка для дообучения: классификатор ошибся, сервер задачу не увидел
+                log_intent(message.text, False)
+                await message.answer(NOT_TASK_REPLY)
+            else:
+                await message.answer("❌ Не удалось создать задачу. Попробуйте сформулировать иначе.")
+                logger.error(f"Не удалось создать задачу: {result.get('error')}")
         else:
             # Если это не запрос на создание задачи, отвечаем общим сообщением
-            await message.answer(
-                "🤖 Я понимаю только запросы на создание задач.\n\n"
-                "Попробуйте написать:\n"
-                "• \"Создай задачу: купить молоко\"\n"
-                "• \"Добавь задачу: позвонить клиенту\"\n"
-                "• \"Задача: подготовить презентацию\"\n"
-                "• Переслать сообщение с описанием проблемы"
-            )
+            await message.answer(NOT_TASK_REPLY)
             
     except Exception as e:
         logger.error(f"Ошибка обработки текстового сообщения: {e}", exc_info=True)
-        print(f"Ошибка обработки текстового сообщения: {e}")
-        import traceback
-        traceback.print_exc()
         await message.answer("❌ Произошла ошибка при обработке сообщения. Попробуйте еще раз.")
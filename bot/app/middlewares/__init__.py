@@ -1,3 +1,4 @@
 from .auth import AuthMiddleware
+from .metrics import UpdateMetricsMiddleware, HandlerMetricsMiddleware
 
-__all__ = ["AuthMiddleware"]
+__all__ = ["AuthMiddleware", "UpdateMetricsMiddleware", "HandlerMetricsMiddleware"]
@@ -1,7 +1,13 @@
+import logging
 import httpx
 import asyncio
-from typing import Dict, List, Any
+import mimetypes
+import os
+from typing import Dict, List, Any, Optional
 from app.core.config import settings
+from app.core.metrics import BACKEND_EVENT_HOOKS
+
+logger = logging.getLogger(__name__)
 
 
 class APIService:
@@ -11,7 +17,7 @@ class APIService:
     
     async def _make_request(self, method: str, endpoint: str, data: Dict = None, params: Dict = None) -> Dict:
         """Базовый метод для HTTP запросов"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=BACKEND_EVENT_HOOKS) as client:
             url = f"{self.base_url}/api/v1{endpoint}"
             
             try:
@@ -30,12 +36,10 @@ class APIService:
                 return response.json()
             
             except httpx.HTTPError as e:
-                print(f"HTTP Error: {e}")
-                print(f"URL: {url}")
-                print(f"Data: {data}")
+                logger.error(f"HTTP Error: {e}")
                 raise Exception(f"Ошибка API запроса: {str(e)}")
             except Exception as e:
-                print(f"General Error: {e}")
+                logger.error(f"General Error: {e}")
                 raise Exception(f"Ошибка API запроса: {str(e)}")
     
     async def register_user(self, user_data: Dict) -> Dict:
@@ -53,64 +57,102 @@ class APIService:
         token = auth_data["access_token"]
         
         # Затем делаем запрос с токеном
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=BACKEND_EVENT_HOOKS) as client:
             headers = {"Authorization": f"Bearer {token}"}
             response = await client.get(f"{self.base_url}/api/v1/projects/", headers=headers)
             response.raise_for_status()
             return response.json()
     
+    async def get_task_changes(self, telegram_id: int, since: int = 0, project_id: int = None) -> Dict:
+        """Дельта-синхронизация задач: изменения после курсора `since`"""
+        auth_data = await self.authenticate_user(telegram_id)
+        token = auth_data["access_token"]
+        
+        params = {"since": since}
+        if project_id is not None:
+            params["project_id"] = project_id
+        
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=BACKEND_EVENT_HOOKS) as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            response = await client.get(f"{self.base_url}/api/v1/tasks/changes", headers=headers, params=params)
+            response.raise_for_status()
+            return response.json()
+    
     async def create_task(self, task_data: Dict, telegram_id: int) -> Dict:
         """Создание задачи"""
-        print(f"Creating task with data: {task_data}")
+        logger.debug(f"Creating task with data: {task_data}")
         
         # Получаем токен
         auth_data = await self.authenticate_user(telegram_id)
         token = auth_data["access_token"]
         
         # Создаем задачу
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=BACKEND_EVENT_HOOKS) as client:
             headers = {"Authorization": f"Bearer {token}"}
-            print(f"Sending POST to: {self.base_url}/api/v1/tasks/")
-            print(f"Headers: {headers}")
-            print(f"Data: {task_data}")
+            logger.debug(f"Sending POST to: {self.base_url}/api/v1/tasks/")
             
             response = await client.post(
                 f"{self.base_url}/api/v1/tasks/",
                 headers=headers,
                 json=task_data
             )
-            print(f"Response status: {response.status_code}")
-            print(f"Response body: {response.text}")
+            logger.debug(f"Response status: {response.status_code}")
+            logger.debug(f"Response body: {response.text}")
             
             response.raise_for_status()
             return response.json()
     
     async def save_photo_for_task(self, telegram_id: int, photo_path: str, task_id: int) -> bool:
-        """Сохранение фото для задачи"""
+        """Сохранение фото для задачи (прямая загрузка в хранилище по подписанной ссылке)"""
         try:
             # Получаем токен
             auth_data = await self.authenticate_user(telegram_id)
             token = auth_data["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            filename = os.path.basename(photo_path)
+            content_type = mimetypes.guess_type(filename)[0] or "image/jpeg"
             
-            # Открываем файл и отправляем
-            with open(photo_path, 'rb') as photo_file:
-                files = {'photo': photo_file}
+            async with httpx.AsyncClient(timeout=30.0, event_hooks=BACKEND_EVENT_HOOKS) as client:
+                # 1. Получаем подписанную ссылку
+                response = await client.post(
+                    f"{self.base_url}/api/v1/photos/tasks/{task_id}/upload-url",
+                    headers=headers,
+                    json={
+                        "filename": filename,
+                        "content_type": content_type,
+                        "file_size": os.path.getsize(photo_path)
+                    }
+                )
+                response.raise_for_status()
+                upload = response.json()
                 
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    headers = {"Authorization": f"Bearer {token}"}
-                    response = await client.post(
-                        f"{self.base_url}/api/v1/photos/tasks/{task_id}/photo/",
-                        headers=headers,
-                        files=files
+                # 2. Загружаем файл напрямую в хранилище, минуя API
+                with open(photo_path, 'rb') as photo_file:
+                    upload_response = await client.request(
+                        upload["method"],
+                        upload["url"],
+                        headers=upload["headers"],
+                        content=photo_file.read()
                     )
-                    
-                    print(f"Photo upload response: {response.status_code}")
-                    print(f"Photo upload response text: {response.text}")
-                    return response.status_code == 200
+                upload_response.raise_for_status()
+                
+                # 3. Регистрируем метаданные
+                confirm_response = await client.post(
+                    f"{self.base_url}/api/v1/photos/tasks/{task_id}/attachments",
+                    headers=headers,
+                    json={
+                        "key": upload["key"],
+                        "filename": filename,
+                        "mime_type": content_type
+                    }
+                )
+                
+                logger.debug(f"Photo upload response: {confirm_response.status_code}")
+                return confirm_response.status_code == 200
                     
         except Exception as e:
-                    print(f"Error saving photo: {e}")
-                    return False
+            logger.error(f"Error saving photo: {e}")
+            return False
 
     async def review_approval(self, approval_id: int, status: str) -> bool:
         """Одобрение или отклонение запроса"""
@@ -119,7 +161,7 @@ class APIService:
             auth_data = await self.authenticate_user(434532312)  # ID создателя
             token = auth_data["access_token"]
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with httpx.AsyncClient(timeout=30.0, event_hooks=BACKEND_EVENT_HOOKS) as client:
                 headers = {"Authorization": f"Bearer {token}"}
                 response = await client.post(
                     f"{self.base_url}/api/v1/admin/approvals/{approval_id}/review",
@@ -127,17 +169,41 @@ class APIService:
                     json={"status": status}
                 )
                 
-                print(f"Review approval response: {response.status_code}")
+                logger.debug(f"Review approval response: {response.status_code}")
                 return response.status_code == 200
                 
         except Exception as e:
-            print(f"Error reviewing approval: {e}")
+            logger.error(f"Error reviewing approval: {e}")
             return False
 
+    async def review_approvals_batch(self, telegram_id: int, decisions: List[Dict]) -> Optional[List[Dict]]:
+        """Пакетное одобрение/отклонение запросов одним запросом; None при ошибке"""
+        try:
+            auth_data = await self.authenticate_user(telegram_id)
+            token = auth_data["access_token"]
+            
+            async with httpx.AsyncClient(timeout=60.0, event_hooks=BACKEND_EVENT_HOOKS) as client:
+                headers = {"Authorization": f"Bearer {token}"}
+                response = await client.post(
+                    f"{self.base_url}/api/v1/admin/approvals/review-batch",
+                    headers=headers,
+                    json={"decisions": decisions}
+                )
+                
+                logger.debug(f"Review approvals batch response: {response.status_code}")
+                if response.status_code == 200:
+                    return response.json()
+                logger.error(f"Error reviewing approvals batch: {response.status_code} - {response.text}")
+                return None
+                
+        except Exception as e:
+            logger.error(f"Error reviewing approvals batch: {e}")
+            return None
+
     async def check_user_access(self, telegram_id: int) -> dict:
         """Проверка доступа пользователя к боту"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with httpx.AsyncClient(timeout=30.0, event_hooks=BACKEND_EVENT_HOOKS) as client:
                 response = await client.get(
                     f"{self.base_url}/api/v1/users/check-access/{telegram_id}"
                 )
@@ -148,25 +214,50 @@ class APIService:
                     return {"is_active": False}
                     
         except Exception as e:
-            print(f"Error checking user access: {e}")
+            logger.error(f"Error checking user access: {e}")
             return {"is_active": False}
     
-    async def create_task_from_ai_data(self, telegram_id: int, task_data: Dict) -> Dict:
-        """Создание задачи из данных AI"""
+    async def create_task_from_ai_data(
+        self, telegram_id: int, task_data: Dict, user_projects: Optional[List[Dict]] = None, wait_timeout: float = 60.0
+    ) -> Dict:
+        """Создание задачи из текста (фоновая AI задача на сервере).
+
+        Короткие команды сервер разбирает без модели; проекты нужны, чтобы
+        назначить задаче проект.
+        """
         # Получаем токен
         auth_data = await self.authenticate_user(telegram_id)
         token = auth_data["access_token"]
         
-        # Создаем задачу
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, event_hooks=BACKEND_EVENT_HOOKS) as client:
             headers = {"Authorization": f"Bearer {token}"}
+            # Сервер сразу возвращает ID задачи (202), обработка идет в фоне
             response = await client.post(
-                f"{self.base_url}/api/v1/ai/create-task-from-text/",
+                f"{self.base_url}/api/v1/ai/create-task-from-text",
                 headers=headers,
-                json={"text": task_data.get("original_text", "")}
+                json={
+                    "text": task_data.get("original_text", ""),
+                    "user_projects": [{"id": p["id"], "name": p["name"]} for p in user_projects or []]
+                }
             )
             response.raise_for_status()
-            return response.json()
+            job = response.json()
+            
+            # Короткие опросы статуса вместо одного долгого запроса
+            delay = 0.5
+            deadline = asyncio.get_running_loop().time() + wait_timeout
+            while job["status"] in ("queued", "running"):
+                if asyncio.get_running_loop().time() > deadline:
+                    raise Exception("Превышено время ожидания AI обработки")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5.0)
+                response = await client.get(f"{self.base_url}/api/v1/ai/jobs/{job['id']}", headers=headers)
+                response.raise_for_status()
+                job = response.json()
+            
+            if job["status"] == "failed":
+                return {"status": "error", "error": job.get("error")}
+            return job["result"]
     
     async def send_notification(self, telegram_id: int, message: str) -> bool:
         """Отправка уведомления пользователю"""
@@ -0,0 +1,161 @@
+import argparse
+import json
+import math
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from app.services.intent_seed import TASK_EXAMPLES, OTHER_EXAMPLES
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+DIGITS_RE = re.compile(r"\d")
+NGRAM_RANGE = (2, 4)
+
+
+def char_ngrams(text: str) -> Dict[str, int]:
+    """Символьные n-граммы слов (с границами слова) и частоты"""
+    text = DIGITS_RE.sub("0", text.lower().replace("ё", "е"))
+    counts: Dict[str, int] = {}
+    words = WORD_RE.findall(text) or [text.strip()]
+    for word in words:
+        padded = f" {word} "
+        for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1):
+            for i in range(len(padded) - n + 1):
+                gram = padded[i:i + n]
+                counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+class IntentClassifier:
+    """Классификатор «задача / не задача»: TF-IDF по символьным n-граммам и логистическая регрессия.
+
+    Работает без сети за десятки микросекунд и отсекает болтовню до вызова LLM.
+    """
+
+    def __init__(self, idf: Dict[str, float], weights: Dict[str, float], bias: float, default_idf: float):
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+        self.default_idf = default_idf
+
+    def vectorize(self, text: str) -> Dict[str, float]:
+        vector = {
+            gram: (1.0 + math.log(count)) * self.idf.get(gram, self.default_idf)
+            for gram, count in char_ngrams(text).items()
+        }
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {gram: v / norm for gram, v in vector.items()}
+
+    def predict_proba(self, text: str) -> float:
+        """Вероятность того, что сообщение - запрос на задачу"""
+        z = self.bias + sum(self.weights.get(gram, 0.0) * v for gram, v in self.vectorize(text).items())
+        return 1.0 / (1.0 + math.exp(-max(min(z, 30.0), -30.0)))
+
+    @classmethod
+    def train(cls, samples: Iterable[Tuple[str, bool]], epochs: int = 60,
+              learning_rate: float = 1.0, l2: float = 1e-4) -> "IntentClassifier":
+        samples = [(text, 1.0 if label else 0.0) for text, label in samples if text]
+        grams = [char_ngrams(text) for text, _ in samples]
+
+        document_frequency: Dict[str, int] = {}
+        for counts in grams:
+            for gram in counts:
+                document_frequency[gram] = document_frequency.get(gram, 0) + 1
+        total = len(samples)
+        idf = {gram: math.log((1 + total) / (1 + df)) + 1.0 for gram, df in document_frequency.items()}
+        model = cls(idf, {}, 0.0, math.log(1 + total) + 1.0)
+
+        vectors = [model.vectorize(text) for text, _ in samples]
+        for _ in range(epochs):
+            for vector, (_, label) in zip(vectors, samples):
+                z = model.bias + sum(model.weights.get(g, 0.0) * v for g, v in vector.items())
+                error = 1.0 / (1.0 + math.exp(-max(min(z, 30.0), -30.0))) - label
+                model.bias -= learning_rate * error
+                for gram, value in vector.items():
+                    weight = model.weights.get(gram, 0.0)
+                    model.weights[gram] = weight - learning_rate * (error * value + l2 * weight)
+        return model
+
+    def to_dict(self) -> Dict:
+        return {"idf": self.idf, "weights": self.weights, "bias": self.bias, "default_idf": self.default_idf}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IntentClassifier":
+        return cls(data["idf"], data["weights"], data["bias"], data["default_idf"])
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def seed_samples() -> List[Tuple[str, bool]]:
+    return [(text, True) for text in TASK_EXAMPLES] + [(text, False) for text in OTHER_EXAMPLES]
+
+
+def read_log(path: str) -> List[Tuple[str, bool]]:
+    """Размеченные сообщения из журнала: строки {"text": ..., "is_task": ...}"""
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                samples.append((record["text"], bool(record["is_task"])))
+    return samples
+
+
+_classifier: Optional[IntentClassifier] = None
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """Модель из INTENT_MODEL_PATH или обученная на встроенных примерах"""
+    global _classifier
+    if _classifier is None:
+        from app.core.config import settings
+        if settings.INTENT_MODEL_PATH and os.path.exists(settings.INTENT_MODEL_PATH):
+            _classifier = IntentClassifier.load(settings.INTENT_MODEL_PATH)
+        else:
+            _classifier = IntentClassifier.train(seed_samples())
+    return _classifier
+
+
+def log_intent(text: str, is_task: bool):
+    """Запись разметки от LLM в журнал для последующего дообучения"""
+    from app.core.config import settings
+    if not settings.INTENT_LOG_PATH:
+        return
+    try:
+        with open(settings.INTENT_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"text": text, "is_task": is_task}, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"Не удалось записать журнал намерений: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Обучение классификатора намерений")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    train_parser = subparsers.add_parser("train", help="Обучить модель на журналах и встроенных примерах")
+    train_parser.add_argument("logs", nargs="*", help="JSONL журналы INTENT_LOG_PATH")
+    train_parser.add_argument("--out", default="intent_model.json", help="Путь для сохранения модели")
+    args = parser.parse_args()
+
+    samples = seed_samples()
+    for path in args.logs:
+        samples.extend(read_log(path))
+    model = IntentClassifier.train(samples)
+    model.save(args.out)
+
+    correct = sum((model.predict_proba(text) >= 0.5) == label for text, label in samples)
+    print(f"Обучено на {len(samples)} примерах, точность на обучающей выборке {correct / len(samples):.1%}")
+    print(f"Модель сохранена в {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Встроенные примеры для начального обучения классификатора намерений.
+# Дообучение на реальных сообщениях: python -m app.services.intent train <журнал.jsonl>
+
+TASK_EXAMPLES = [
+    "создай задачу купить молоко",
+    "добавь задачу позвонить клиенту",
+    "задача: подготовить презентацию",
+    "купить цемент завтра срочно",
+    "нужно купить 10 мешков цемента",
+    "привезти кирпич на объект",
+    "поломка экскаватора, фото прилагается",
+    "сломался перфоратор, нужна замена",
+    "дефект на стене во второй комнате",
+    "проблема с насосом на стройке",
+    "отремонтировать кран в ванной",
+    "помыть посуду",
+    "убрать в квартире до пятницы",
+    "позвонить врачу в понедельник",
+    "записаться на курсы английского",
+    "подготовить отчет для клиента к среде",
+    "отправить счет бизнес партнеру",
+    "назначить встречу с подрядчиком",
+    "проверить арматуру перед заливкой бетона",
+    "заказать краску для фасада",
+    "сделать замер окон",
+    "установить кондиционер в офисе",
+    "надо заменить масло в машине",
+    "не забыть забрать документы",
+    "напомни оплатить аренду",
+    "todo: обновить сайт",
+    "task: fix the login page",
+    "срочно вызвать электрика",
+    "важно согласовать смету до вечера",
+    "починить дверь на складе",
+    "закупить инструмент для бригады",
+    "организовать доставку бетона на 9 утра",
+    "проверить работу крана",
+    "оформить договор с поставщиком",
+    "добавить в план покраску забора",
+    "выгрузить материалы на участок",
+]
+
+OTHER_EXAMPLES = [
+    "привет",
+    "привет как дела",
+    "спасибо",
+    "спасибо большое",
+    "ок",
+    "окей",
+    "да",
+    "нет",
+    "хорошо",
+    "понятно",
+    "ясно",
+    "доброе утро",
+    "добрый день",
+    "добрый вечер",
+    "спокойной ночи",
+    "пока",
+    "до свидания",
+    "кто ты",
+    "что ты умеешь",
+    "как тебя зовут",
+    "ты бот?",
+    "ха ха",
+    "лол",
+    "))",
+    "👍",
+    "🙂",
+    "ааа",
+    "тест",
+    "проверка связи",
+    "как погода",
+    "hello",
+    "thanks",
+    "ok",
+    "отлично, молодец",
+    "круто",
+    "неважно, забудь",
+    "всё нормально",
+]
@@ -0,0 +1,170 @@
+from collections import deque
+from functools import lru_cache
+import re
+from typing import Dict, List, Optional, Tuple, Iterable
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Ключевые слова категорий; категория относится к проектам, в названии которых она встречается
+PROJECT_KEYWORDS = {
+    "дом": ["дом", "убрать", "помыть", "почистить", "приготовить", "посуда", "полы", "комната", "квартира", "ремонт", "мебель"],
+    "работа": ["работа", "клиент", "проект", "встреча", "презентация", "отчет", "звонок", "офис", "бизнес", "дело", "конференция"],
+    "личное": ["врач", "курсы", "спорт", "магазин", "покупка", "личное", "здоровье", "учеба", "хобби", "отдых", "путешествие"],
+    "стройка": ["стройка", "строительство", "кирпич", "цемент", "бетон", "арматура", "краска", "инструмент", "оборудование", "техника"],
+    "техника": ["техника", "оборудование", "машина", "инструмент", "ремонт", "поломка", "дефект", "замена", "установка"]
+}
+
+NAME_WEIGHT = 3.0
+KEYWORD_WEIGHT = 1.0
+MIN_STEM_LENGTH = 3
+
+_ENDINGS = sorted("""
+    ами ями ого его ому ему ыми ими ией иях ием ать ять ить еть уть ешь ишь ете ите ют ут ят ла ли ло
+    ов ев ей ой ий ый ая яя ое ее ие ые ую юю ом ем ам ям ах ях ию ья ье ия ть
+    а я о е и ы у ю ь й
+""".split(), key=len, reverse=True)
+
+
+def stem(word: str) -> str:
+    """Грубая основа слова: отбрасываем окончание, сохраняя не меньше MIN_STEM_LENGTH букв.
+
+    Основа используется как префикс, поэтому «цемент» находит «цементом» и «цемента».
+    """
+    word = word.lower().replace("ё", "е")
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+            return word[:-len(ending)]
+    return word
+
+
+def _stems(value: str) -> List[str]:
+    return [stem(token) for token in WORD_RE.findall(value.lower()) if len(token) >= MIN_STEM_LENGTH]
+
+
+class AhoCorasick:
+    """Автомат Ахо-Корасик: поиск всех шаблонов за один проход по тексту"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(pattern)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> Iterable[Tuple[int, str]]:
+        """Пары (позиция начала, шаблон)"""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pattern in self._out[state]:
+                yield i - len(pattern) + 1, pattern
+
+
+class ProjectMatcher:
+    """Выбор проекта по тексту задачи.
+
+    Основы слов из названий проектов и ключевых слов категорий компилируются
+    в один автомат Ахо-Корасик, поэтому разбор сообщения линеен по его длине
+    и не зависит от числа проектов и ключевых слов.
+    """
+
+    def __init__(self, projects: Iterable[Tuple[int, str]]):
+        self.project_ids: List[int] = []
+        # Основа -> [(project_id, вес)]
+        self._index: Dict[str, List[Tuple[int, float]]] = {}
+
+        keyword_stems = {
+            category: {stem(k) for k in keywords}
+            for category, keywords in PROJECT_KEYWORDS.items()
+        }
+
+        for project_id, name in projects:
+            self.project_ids.append(project_id)
+            name_stems = set(_stems(name))
+            for name_stem in name_stems:
+                self._add(name_stem, project_id, NAME_WEIGHT)
+
+            for category, stems in keyword_stems.items():
+                category_stem = stem(category)
+                if any(s.startswith(category_stem) for s in name_stems):
+                    for keyword_stem in stems - name_stems:
+                        self._add(keyword_stem, project_id, KEYWORD_WEIGHT)
+
+        self._automaton = AhoCorasick(self._index)
+
+    def _add(self, pattern: str, project_id: int, weight: float):
+        targets = self._index.setdefault(pattern, [])
+        if all(pid != project_id for pid, _ in targets):
+            targets.append((project_id, weight))
+
+    def rank(self, text: str) -> List[Tuple[int, float]]:
+        """Проекты-кандидаты по убыванию релевантности"""
+        text = text.lower().replace("ё", "е")
+        matched = set()
+        for start, pattern in self._automaton.find(text):
+            # Основа должна начинать слово
+            if start == 0 or not text[start - 1].isalnum():
+                matched.add(pattern)
+
+        scores: Dict[int, float] = {}
+        for pattern in matched:
+            for project_id, weight in self._index[pattern]:
+                scores[project_id] = scores.get(project_id, 0.0) + weight
+
+        order = {project_id: i for i, project_id in enumerate(self.project_ids)}
+        return sorted(scores.items(), key=lambda item: (-item[1], order[item[0]]))
+
+    def best(self, text: str) -> Optional[int]:
+        """Лучший проект; при отсутствии совпадений - первый проект пользователя"""
+        ranked = self.rank(text)
+        if ranked:
+            return ranked[0][0]
+        return self.project_ids[0] if self.project_ids else None
+
+
+@lru_cache(maxsize=256)
+def _compile(projects: Tuple[Tuple[int, str], ...]) -> ProjectMatcher:
+    return ProjectMatcher(projects)
+
+
+def get_project_matcher(user_projects: List[Dict]) -> ProjectMatcher:
+    """Матчер для набора проектов; перестраивается только при изменении набора"""
+    return _compile(tuple((p["id"], p["name"]) for p in user_projects))
+
+
+def routed_projects(text: str, user_projects: List[Dict]) -> List[Dict]:
+    """Проекты для разбора текста на сервере: только выбранный матчером.
+
+    Сервер назначает задаче единственный переданный проект, поэтому проект
+    по-прежнему выбирает матчер бота, а не модель.
+    """
+    project_id = get_project_matcher(user_projects).best(text)
+    return [{"id": p["id"], "name": p["name"]} for p in user_projects if p["id"] == project_id]
@@ -0,0 +1,243 @@
+"""Нагрузочный тест бота: сколько апдейтов в секунду выдерживает диспетчер.
+
+Синтетические апдейты подаются в Dispatcher из main.create_dispatcher() (те же
+роутеры и middleware, что в проде). Telegram Bot API, backend и OpenAI заменены
+локальными заглушками с настраиваемой задержкой (benchmarks/fakes.py).
+
+Для каждого типа апдейтов и уровня конкурентности апдейты подаются в течение
+--duration секунд; время - от приема апдейта до завершения обработчика.
+Точка насыщения - уровень, после которого пропускная способность растет меньше чем на 10%.
+
+Запуск из каталога bot:
+    python -m benchmarks.bot_bench
+    python -m benchmarks.bot_bench --kinds text,voice --concurrency 1,4,16,64 --openai-latency 0.3
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.fakes import FakeServices, Latency
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+
+TASK_TEXTS = [
+    "Нужно залить фундамент на стройке до пятницы",
+    "Срочно заказать арматуру на склад",
+    "Проверить проводку в офисе завтра утром",
+    "Сделать фотоотчет по кровле, важно",
+]
+CHAT_TEXTS = ["привет", "спасибо, понял", "ок", "как дела?"]
+KINDS = ("text", "chat", "voice", "photo", "mix")
+SATURATION_GAIN = 1.1
+
+
+def message_update(update_id: int, user_id: int, **content) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Нагрузка", "username": f"bench{user_id}"},
+            **content,
+        },
+    }
+
+
+def make_update(kind: str, update_id: int, rng: random.Random, mix: Dict[str, float]) -> dict:
+    """Сырой апдейт Telegram (как в теле вебхука)"""
+    if kind == "mix":
+        kind = rng.choices(list(mix), weights=list(mix.values()))[0]
+    user_id = 100_000 + rng.randrange(1000)
+    if kind == "text":
+        return message_update(update_id, user_id, text=rng.choice(TASK_TEXTS))
+    if kind == "chat":
+        return message_update(update_id, user_id, text=rng.choice(CHAT_TEXTS))
+    if kind == "voice":
+        return message_update(update_id, user_id, voice={
+            "file_id": f"voice{update_id}", "file_unique_id": f"v{update_id}", "duration": 5,
+        })
+    if kind == "photo":
+        return message_update(update_id, user_id, photo=[
+            {"file_id": f"photo{update_id}s", "file_unique_id": f"p{update_id}s", "width": 90, "height": 90},
+            {"file_id": f"photo{update_id}", "file_unique_id": f"p{update_id}", "width": 1280, "height": 960},
+        ])
+    raise ValueError(f"Неизвестный тип апдейта: {kind}")
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_level(dp, bot, fakes: FakeServices, kind: str, concurrency: int,
+                    duration: float, mix: Dict[str, float], seed: int) -> dict:
+    """Замкнутый цикл: `concurrency` отправителей подают апдейты, пока не выйдет время"""
+    rng = random.Random(seed)
+    counter = iter(range(1, 10 ** 9))
+    latencies: List[float] = []
+    errors = 0
+    fakes.reset()
+
+    async def sender(deadline: float):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            update = make_update(kind, next(counter), rng, mix)
+            started = time.perf_counter()
+            try:
+                await dp.feed_raw_update(bot, update)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(sender(started + duration) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    processed = len(latencies)
+    return {
+        "kind": kind,
+        "concurrency": concurrency,
+        "updates": processed,
+        "errors": errors,
+        "failed_replies": len(fakes.failures),
+        "ups": round(processed / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "calls_per_update": {
+            name: round(count / processed, 2) for name, count in fakes.counts().items()
+        } if processed else {},
+    }
+
+
+def find_saturation(rows: List[dict]) -> Optional[dict]:
+    """Первый уровень, после которого рост конкурентности почти не дает пропускной способности"""
+    for previous, current in zip(rows, rows[1:]):
+        if current["ups"] < previous["ups"] * SATURATION_GAIN:
+            return {"concurrency": previous["concurrency"], "ups": previous["ups"]}
+    return None
+
+
+def format_row(row: dict) -> str:
+    line = (
+        f"{row['kind']:<6} c={row['concurrency']:<4} {row['ups']:>8.2f} upd/s  "
+        f"p50 {row['p50_ms']:>8.1f}  p95 {row['p95_ms']:>8.1f}  p99 {row['p99_ms']:>8.1f} ms  "
+        f"n={row['updates']}"
+    )
+    if row["errors"] or row["failed_replies"]:
+        line += f"  исключений: {row['errors']}, ответов с ошибкой: {row['failed_replies']}"
+    return line
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """'text=0.6,voice=0.2,photo=0.2' -> {'text': 0.6, 'voice': 0.2, 'photo': 0.2}"""
+    mix = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный тест диспетчера бота")
+    parser.add_argument("--kinds", default="text,chat,voice,photo", help=f"Типы апдейтов: {', '.join(KINDS)}")
+    parser.add_argument("--mix", default="text=0.5,chat=0.2,voice=0.2,photo=0.1", help="Доли типов для kind=mix")
+    parser.add_argument("--concurrency", default="1,8,32", help="Уровни конкурентности через запятую")
+    parser.add_argument("--duration", type=float, default=5.0, help="Секунд на уровень")
+    parser.add_argument("--telegram-latency", type=float, default=Latency.telegram, help="Задержка Bot API, с")
+    parser.add_argument("--backend-latency", type=float, default=Latency.backend, help="Задержка backend, с")
+    parser.add_argument("--openai-latency", type=float, default=Latency.openai_chat, help="Задержка chat completions, с")
+    parser.add_argument("--whisper-latency", type=float, default=Latency.openai_transcription,
+                        help="Задержка распознавания речи, с")
+    parser.add_argument("--output", help="Куда записать результаты в JSON")
+    return parser.parse_args(argv)
+
+
+async def run(args, fakes: FakeServices) -> List[dict]:
+    from aiogram import Bot
+    from main import create_bot, create_dispatcher
+    from app.services.intent import get_intent_classifier
+
+    bot: Bot = create_bot()
+    dp = create_dispatcher()
+    get_intent_classifier()
+    mix = parse_mix(args.mix)
+    levels = [int(level) for level in args.concurrency.split(",") if level]
+
+    results = []
+    try:
+        for kind in [k.strip() for k in args.kinds.split(",") if k.strip()]:
+            await run_level(dp, bot, fakes, kind, 1, min(1.0, args.duration), mix, seed=0)  # прогрев
+            rows = []
+            for concurrency in levels:
+                row = await run_level(dp, bot, fakes, kind, concurrency, args.duration, mix, seed=concurrency)
+                rows.append(row)
+                print(format_row(row), flush=True)
+            saturation = find_saturation(rows)
+            if saturation:
+                print(f"{kind:<6} насыщение при c={saturation['concurrency']}: ~{saturation['ups']} upd/s", flush=True)
+            results.append({"kind": kind, "levels": rows, "saturation": saturation})
+    finally:
+        await bot.session.close()
+    return results
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    latency = Latency(
+        telegram=args.telegram_latency,
+        backend=args.backend_latency,
+        openai_chat=args.openai_latency,
+        openai_transcription=args.whisper_latency,
+    )
+    fakes = FakeServices(latency)
+    fakes.start()
+
+    # Настройки бота читаются при импорте - адреса заглушек задаются до него
+    os.environ.update({
+        "BOT_TOKEN": "123456:benchmark",
+        "OPENAI_API_KEY": "benchmark",
+        "TELEGRAM_API_URL": fakes.base_url,
+        "BACKEND_URL": fakes.base_url,
+        "OPENAI_BASE_URL": f"{fakes.base_url}/v1",
+        "BOT_MODE": "polling",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "ERROR"),
+        "INTENT_LOG_PATH": "",
+    })
+    sys.path.insert(0, str(BOT_DIR))
+
+    try:
+        results = asyncio.run(run(args, fakes))
+    finally:
+        fakes.stop()
+
+    if args.output:
+        report = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "latency": asdict(latency),
+                "duration": args.duration,
+            },
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
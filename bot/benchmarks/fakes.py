@@ -0,0 +1,234 @@
+"""Локальные заглушки внешних сервисов бота для нагрузочного теста.
+
+Одно aiohttp-приложение отвечает за Telegram Bot API, backend и OpenAI.
+Сервер работает в отдельном потоке со своим event loop: синхронный клиент
+OpenAI блокирует loop бота, и заглушка в том же loop не смогла бы ответить.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+PROJECTS = [
+    {"id": 1, "name": "Стройка", "description": "Основной объект"},
+    {"id": 2, "name": "Склад", "description": "Склад материалов"},
+    {"id": 3, "name": "Офис", "description": "Ремонт офиса"},
+]
+
+VOICE_TEXT = "Срочно проверить опалубку на стройке до пятницы"
+# Тексты, которые «модель» на сервере не считает задачами
+NOT_TASK_TEXTS = {"привет", "спасибо, понял", "ок", "как дела?"}
+FILE_PAYLOAD = b"\0" * 16 * 1024
+
+
+@dataclass
+class Latency:
+    """Задержки ответа заглушек, секунды"""
+    telegram: float = 0.03
+    backend: float = 0.01
+    openai_chat: float = 0.8
+    openai_transcription: float = 1.5
+
+
+class FakeServices:
+    """Telegram Bot API + backend + OpenAI на одном локальном порту"""
+
+    def __init__(self, latency: Latency, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.calls: Counter = Counter()
+        self.failures: List[str] = []  # Ответы пользователю с ошибкой (текст с "❌")
+        self.last_forms: Dict[str, dict] = {}  # Параметры последнего вызова каждого метода Bot API
+        self._message_id = 0
+        self._ai_jobs: Dict[str, tuple] = {}  # id -> (время готовности, задача)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def reset(self):
+        self.calls.clear()
+        self.failures.clear()
+        self.last_forms.clear()
+        self._ai_jobs.clear()
+
+    # Telegram Bot API
+
+    async def telegram_method(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[f"telegram.{method}"] += 1
+        form = dict(await request.post()) if request.body_exists else {}
+        self.last_forms[method] = form
+        await asyncio.sleep(self.latency.telegram)
+
+        if method in ("sendMessage", "editMessageText"):
+            text = str(form.get("text", ""))
+            if "❌" in text:
+                self.failures.append(text[:200])
+            self._message_id += 1
+            result = {
+                "message_id": self._message_id,
+                "date": int(time.time()),
+                "chat": {"id": int(form.get("chat_id") or 1), "type": "private"},
+                "text": text,
+            }
+        elif method == "getFile":
+            file_id = str(form.get("file_id", "file"))
+            result = {
+                "file_id": file_id,
+                "file_unique_id": file_id,
+                "file_size": len(FILE_PAYLOAD),
+                "file_path": f"files/{file_id}",
+            }
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    async def telegram_file(self, request: web.Request) -> web.Response:
+        self.calls["telegram.file"] += 1
+        await asyncio.sleep(self.latency.telegram)
+        return web.Response(body=FILE_PAYLOAD, content_type="application/octet-stream")
+
+    # Backend
+
+    async def backend_check_access(self, request: web.Request) -> web.Response:
+        self.calls["backend.check_access"] += 1
+        await asyncio.sleep(self.latency.backend)
+        telegram_id = int(request.match_info["telegram_id"])
+        return web.json_response({"telegram_id": telegram_id, "role": "foreman", "is_active": True})
+
+    async def backend_auth(self, request: web.Request) -> web.Response:
+        self.calls["backend.auth"] += 1
+        await asyncio.sleep(self.latency.backend)
+        return web.json_response({"access_token": "benchmark", "token_type": "bearer"})
+
+    async def backend_projects(self, request: web.Request) -> web.Response:
+        self.calls["backend.projects"] += 1
+        await asyncio.sleep(self.latency.backend)
+        return web.json_response(PROJECTS)
+
+    async def backend_create_task(self, request: web.Request) -> web.Response:
+        self.calls["backend.create_task"] += 1
+        task = await request.json()
+        await asyncio.sleep(self.latency.backend)
+        return web.json_response({**task, "id": self.calls["backend.create_task"], "status": "todo"})
+
+    async def backend_ai_text_job(self, request: web.Request) -> web.Response:
+        """Фоновая AI задача: модель на сервере отвечает через latency.openai_chat"""
+        self.calls["backend.ai_text_job"] += 1
+        body = await request.json()
+        await asyncio.sleep(self.latency.backend)
+        job_id = f"job-{self.calls['backend.ai_text_job']}"
+        project_id = body["user_projects"][0]["id"] if body.get("user_projects") else None
+        task = None if body["text"] in NOT_TASK_TEXTS else {
+            "id": self.calls["backend.ai_text_job"],
+            "title": "Проверить опалубку",
+            "description": body["text"],
+            "status": "todo",
+            "priority": "high",
+            "project_id": project_id,
+            "deadline": None,
+        }
+        self._ai_jobs[job_id] = (time.monotonic() + self.latency.openai_chat, task)
+        return web.json_response({"id": job_id, "kind": "text", "status": "queued"}, status=202)
+
+    async def backend_ai_job(self, request: web.Request) -> web.Response:
+        self.calls["backend.ai_job"] += 1
+        await asyncio.sleep(self.latency.backend)
+        job_id = request.match_info["job_id"]
+        ready_at, task = self._ai_jobs[job_id]
+        if time.monotonic() < ready_at:
+            return web.json_response({"id": job_id, "kind": "text", "status": "running"})
+        if task is None:
+            return web.json_response({
+                "id": job_id, "kind": "text", "status": "succeeded", "task_id": None,
+                "result": {"status": "not_task", "original_text": None},
+            })
+        return web.json_response({
+            "id": job_id, "kind": "text", "status": "succeeded", "task_id": task["id"],
+            "result": {"status": "task_created", "task": task, "original_text": None},
+        })
+
+    # OpenAI
+
+    async def openai_chat(self, request: web.Request) -> web.Response:
+        self.calls["openai.chat"] += 1
+        await request.read()
+        await asyncio.sleep(self.latency.openai_chat)
+        content = json.dumps({
+            "title": "Проверить опалубку",
+            "description": "Проверить опалубку на объекте",
+            "project_id": PROJECTS[0]["id"],
+            "priority": "high",
+            "deadline": None,
+        }, ensure_ascii=False)
+        return web.json_response({
+            "id": "chatcmpl-benchmark",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 600, "completion_tokens": 60, "total_tokens": 660},
+        })
+
+    async def openai_transcription(self, request: web.Request) -> web.Response:
+        self.calls["openai.transcription"] += 1
+        await request.read()
+        await asyncio.sleep(self.latency.openai_transcription)
+        return web.json_response({"text": VOICE_TEXT})
+
+    def create_app(self) -> web.Application:
+        app = web.Application(client_max_size=10 * 1024 * 1024)
+        app.router.add_post("/bot{token}/{method}", self.telegram_method)
+        app.router.add_get("/file/bot{token}/{path:.*}", self.telegram_file)
+        app.router.add_get("/api/v1/users/check-access/{telegram_id}", self.backend_check_access)
+        app.router.add_post("/api/v1/users/auth", self.backend_auth)
+        app.router.add_get("/api/v1/projects/", self.backend_projects)
+        app.router.add_post("/api/v1/tasks/", self.backend_create_task)
+        app.router.add_post("/api/v1/ai/create-task-from-text", self.backend_ai_text_job)
+        app.router.add_get("/api/v1/ai/jobs/{job_id}", self.backend_ai_job)
+        app.router.add_post("/v1/chat/completions", self.openai_chat)
+        app.router.add_post("/v1/audio/transcriptions", self.openai_transcription)
+        return app
+
+    def start(self):
+        """Запуск сервера в фоновом потоке; возвращается, когда порт уже слушается"""
+        ready = threading.Event()
+
+        async def serve():
+            self._runner = web.AppRunner(self.create_app(), access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+            self.port = site._server.sockets[0].getsockname()[1]
+            ready.set()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(serve())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-services", daemon=True)
+        self._thread.start()
+        if not ready.wait(10):
+            raise RuntimeError("Заглушки сервисов не запустились")
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+        self._loop = None
+
+    def counts(self) -> Dict[str, int]:
+        return dict(sorted(self.calls.items()))
@@ -2,43 +2,82 @@ import asyncio
 import logging
 import os
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 from dotenv import load_dotenv
 
 from app.handlers import router
-from app.middlewares import AuthMiddleware
+from app.middlewares import AuthMiddleware, UpdateMetricsMiddleware, HandlerMetricsMiddleware
 from app.core.config import settings
+from app.services.intent import get_intent_classifier
+from app.core.metrics import serve_metrics
+from app.core.logging_config import setup_logging
 
 # Загружаем переменные окружения
 load_dotenv()
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Настройка логирования (JSON через очередь, см. LOG_* в настройках)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 
-async def main():
-    # Создаем бота и диспетчер
-    bot = Bot(
+def create_bot() -> Bot:
+    """Создание бота (с поддержкой собственного Bot API сервера)"""
+    session = None
+    if settings.TELEGRAM_API_URL:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(settings.TELEGRAM_API_URL))
+    return Bot(
         token=settings.BOT_TOKEN,
+        session=session,
         parse_mode=ParseMode.HTML
     )
+
+
+def create_dispatcher() -> Dispatcher:
+    """Создание диспетчера с middleware и роутерами"""
     dp = Dispatcher()
     
     # Регистрируем middleware
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
     dp.message.middleware(AuthMiddleware())
     dp.callback_query.middleware(AuthMiddleware())
+    # Метрики обработчиков (после авторизации - измеряется только сам обработчик)
+    dp.message.middleware(HandlerMetricsMiddleware())
+    dp.callback_query.middleware(HandlerMetricsMiddleware())
     
     # Регистрируем роутеры
     dp.include_router(router)
+    return dp
+
+
+async def main():
+    # Создаем бота и диспетчер
+    bot = create_bot()
+    dp = create_dispatcher()
+    
+    # Классификатор намерений загружается/обучается до первого сообщения
+    get_intent_classifier()
+    
+    # Telegram будет присылать только те типы апдейтов, которые мы обрабатываем
+    allowed_updates = dp.resolve_used_update_types()
+    
+    if settings.BOT_MODE == "webhook":
+        from app.core.webhook import run_webhook
+        
+        logger.info("Запуск Telegram Bot в режиме webhook...")
+        await run_webhook(bot, dp, allowed_updates)
+        return
+    
+    if settings.METRICS_PORT:
+        serve_metrics(settings.METRICS_PORT)
     
     # Запускаем бота
     logger.info("Запуск Telegram Bot...")
     try:
-        await dp.start_polling(bot)
+        # Вебхук и long polling взаимоисключающие
+        await bot.delete_webhook()
+        await dp.start_polling(bot, allowed_updates=allowed_updates)
     finally:
         await bot.session.close()
 
@@ -0,0 +1,19 @@
+import os
+
+# Обязательные настройки - до импорта бота
+os.environ.setdefault("BOT_TOKEN", "123456:test")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("LOG_FORMAT", "text")
+
+import pytest  # noqa: E402
+
+from benchmarks.fakes import FakeServices, Latency  # noqa: E402
+
+
+@pytest.fixture
+def fakes():
+    """Локальный фейк Telegram Bot API (и backend/OpenAI) без задержек"""
+    services = FakeServices(Latency(telegram=0, backend=0, openai_chat=0, openai_transcription=0))
+    services.start()
+    yield services
+    services.stop()
@@ -0,0 +1,38 @@
+import asyncio
+import json
+
+from aiogram import Bot, Dispatcher, F
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from app.core.config import settings
+from app.handlers import text
+from benchmarks.bot_bench import message_update
+
+
+def test_not_task_verdict_reaches_user_and_intent_log(fakes, monkeypatch, tmp_path):
+    log_path = tmp_path / "intent.jsonl"
+    monkeypatch.setattr(settings, "BACKEND_URL", fakes.base_url)
+    monkeypatch.setattr(settings, "INTENT_LOG_PATH", str(log_path))
+    # Классификатор пропускает все - решает сервер
+    monkeypatch.setattr(settings, "INTENT_THRESHOLD", 0.0)
+
+    async def scenario():
+        bot = Bot(token=settings.BOT_TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(fakes.base_url)))
+        dp = Dispatcher()
+        # Роутер обработчиков уже подключен к общему роутеру app.handlers
+        dp.message.register(text.handle_text_message, F.text)
+        try:
+            await dp.feed_raw_update(bot, message_update(1, 42, text="Срочно заказать арматуру на склад"))
+            await dp.feed_raw_update(bot, message_update(2, 42, text="спасибо, понял"))
+        finally:
+            await bot.session.close()
+
+    asyncio.run(scenario())
+
+    assert fakes.last_forms["sendMessage"]["text"] == text.NOT_TASK_REPLY
+    assert not fakes.failures
+    assert [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()] == [
+        {"text": "Срочно заказать арматуру на склад", "is_task": True},
+        {"text": "спасибо, понял", "is_task": False},
+    ]
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.types import Message
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.core import webhook
+from app.core.config import settings
+
+SECRET = "test_webhook-secret"
+
+
+def _update(update_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 42, "type": "private"},
+            "from": {"id": 42, "is_bot": False, "first_name": "Иван"},
+            "text": text,
+        },
+    }
+
+
+def _bot(fakes) -> Bot:
+    return Bot(token=settings.BOT_TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(fakes.base_url)))
+
+
+def _dispatcher(received: list) -> Dispatcher:
+    dp = Dispatcher()
+
+    @dp.message()
+    async def echo(message: Message):
+        received.append(message.text)
+        await message.answer("ok")
+
+    return dp
+
+
+@pytest.fixture
+def webhook_settings(monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_BASE_URL", "https://bot.example.com")
+    monkeypatch.setattr(settings, "WEBHOOK_SECRET", SECRET)
+
+
+@pytest.mark.parametrize("secret", [None, "", "with space", "x" * 257])
+def test_webhook_refuses_to_start_without_valid_secret(fakes, webhook_settings, monkeypatch, secret):
+    monkeypatch.setattr(settings, "WEBHOOK_SECRET", secret)
+
+    async def start():
+        bot = _bot(fakes)
+        try:
+            with pytest.raises(RuntimeError, match="WEBHOOK_SECRET"):
+                await webhook.run_webhook(bot, _dispatcher([]), ["message"])
+        finally:
+            await bot.session.close()
+
+    asyncio.run(start())
+    assert "telegram.setWebhook" not in fakes.calls
+
+
+def test_webhook_checks_secret_header(fakes, webhook_settings):
+    received = []
+
+    async def scenario():
+        bot = _bot(fakes)
+        app = webhook.create_webhook_app(bot, _dispatcher(received), ["message"])
+        async with TestClient(TestServer(app)) as client:
+            path = settings.WEBHOOK_PATH
+            no_header = await client.post(path, json=_update(1, "без секрета"))
+            wrong = await client.post(
+                path, json=_update(2, "чужой секрет"), headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"}
+            )
+            ok = await client.post(
+                path, json=_update(3, "от Telegram"), headers={"X-Telegram-Bot-Api-Secret-Token": SECRET}
+            )
+            # Апдейт обрабатывается в фоне после ответа Telegram
+            for _ in range(100):
+                if fakes.calls["telegram.sendMessage"]:
+                    break
+                await asyncio.sleep(0.01)
+            return no_header.status, wrong.status, ok.status
+
+    assert asyncio.run(scenario()) == (401, 401, 200)
+    assert received == ["от Telegram"]
+    assert fakes.calls["telegram.sendMessage"] == 1
+    # Telegram получает тот же секрет при установке вебхука
+    assert fakes.last_forms["setWebhook"]["secret_token"] == SECRET
+    assert fakes.last_forms["setWebhook"]["url"] == f"https://bot.example.com{settings.WEBHOOK_PATH}"
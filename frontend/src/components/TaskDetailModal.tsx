@@ -30,7 +30,8 @@ interface TaskDetailModalProps {
 export function TaskDetailModal({ taskId, isOpen, onClose, onStatusChange }: TaskDetailModalProps) {
   const [task, setTask] = useState<TaskDetail | null>(null)
   const [loading, setLoading] = useState(false)
-  const [photoExists, setPhotoExists] = useState(false)
+  // Подписанная ссылка на фото в хранилище (скачивание напрямую, минуя API)
+  const [photoUrl, setPhotoUrl] = useState<string | null>(null)
   const [showPhoto, setShowPhoto] = useState(false)
 
   useEffect(() => {
@@ -59,11 +60,11 @@ export function TaskDetailModal({ taskId, isOpen, onClose, onStatusChange }: Tas
     if (!taskId) return
     
     try {
-      // Проверяем наличие фото
-      await apiService.getTaskPhoto(taskId)
-      setPhotoExists(true)
+      // Проверяем наличие фото и получаем ссылку на него
+      const response = await apiService.getTaskPhoto(taskId)
+      setPhotoUrl(response.data.photo_url)
     } catch (error) {
-      setPhotoExists(false)
+      setPhotoUrl(null)
     }
   }
 
@@ -208,7 +209,7 @@ export function TaskDetailModal({ taskId, isOpen, onClose, onStatusChange }: Tas
           </div>
 
           {/* Фото */}
-          {photoExists && (
+          {photoUrl && (
             <Card>
               <CardContent className="p-4">
                 <div className="flex items-center justify-between mb-3">
@@ -228,7 +229,7 @@ export function TaskDetailModal({ taskId, isOpen, onClose, onStatusChange }: Tas
                 {showPhoto && (
                   <div className="relative">
                     <img 
-                      src={`https://projectmanager.chickenkiller.com/api/v1/photos/tasks/${task.id}/photo/`}
+                      src={photoUrl}
                       alt={`Фото для задачи ${task.title}`}
                       className="w-full rounded-lg border"
                       onError={(e) => {
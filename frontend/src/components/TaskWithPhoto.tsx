@@ -4,6 +4,7 @@ import { Button } from '@/components/ui/button'
 import { Badge } from '@/components/ui/badge'
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog'
 import { Eye, Calendar, User, Flag } from 'lucide-react'
+import { apiService } from '@/lib/api'
 
 interface TaskWithPhoto {
   id: number
@@ -24,6 +25,20 @@ interface TaskWithPhotoProps {
 
 export function TaskWithPhoto({ task, onStatusChange }: TaskWithPhotoProps) {
   const [showPhoto, setShowPhoto] = useState(false)
+  // Подписанная ссылка на фото в хранилище (скачивание напрямую, минуя API)
+  const [photoUrl, setPhotoUrl] = useState<string | null>(null)
+
+  const loadPhoto = async (open: boolean) => {
+    setShowPhoto(open)
+    if (!open) return
+    try {
+      // Ссылка действует ограниченное время - запрашиваем при каждом открытии
+      const response = await apiService.getTaskPhoto(task.id)
+      setPhotoUrl(response.data.photo_url)
+    } catch (error) {
+      setPhotoUrl('/placeholder-image.png')
+    }
+  }
 
   const getPriorityColor = (priority: string) => {
     switch (priority) {
@@ -69,7 +84,7 @@ export function TaskWithPhoto({ task, onStatusChange }: TaskWithPhotoProps) {
             <p className="text-sm text-gray-600 mt-1">{task.description}</p>
           </div>
           {task.has_photo && (
-            <Dialog>
+            <Dialog open={showPhoto} onOpenChange={loadPhoto}>
               <DialogTrigger asChild>
                 <Button variant="outline" size="sm">
                   <Eye className="h-4 w-4 mr-2" />
@@ -81,15 +96,17 @@ export function TaskWithPhoto({ task, onStatusChange }: TaskWithPhotoProps) {
                   <DialogTitle>Фото задачи: {task.title}</DialogTitle>
                 </DialogHeader>
                 <div className="flex justify-center">
-                  <img 
-                    src={`https://projectmanager.chickenkiller.com/api/v1/photos/tasks/${task.id}/photo/`}
-                    alt={`Фото для задачи ${task.title}`}
-                    className="max-w-full max-h-96 object-contain rounded-lg"
-                    onError={(e) => {
-                      e.currentTarget.src = '/placeholder-image.png'
-                      e.currentTarget.alt = 'Фото недоступно'
-                    }}
-                  />
+                  {photoUrl && (
+                    <img 
+                      src={photoUrl}
+                      alt={`Фото для задачи ${task.title}`}
+                      className="max-w-full max-h-96 object-contain rounded-lg"
+                      onError={(e) => {
+                        e.currentTarget.src = '/placeholder-image.png'
+                        e.currentTarget.alt = 'Фото недоступно'
+                      }}
+                    />
+                  )}
                 </div>
               </DialogContent>
             </Dialog>
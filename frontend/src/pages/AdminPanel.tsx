@@ -41,7 +41,7 @@ interface ApprovalRequest {
   action_type: string
   entity_type: string
   entity_id: number
-  action_data: string
+  action_data: Record<string, unknown> | null
   status: 'pending' | 'approved' | 'rejected'
   created_at: string
   reviewed_at?: string
@@ -562,7 +562,7 @@ function ApprovalReviewModal({
           <div>
             <Label>Данные действия</Label>
             <pre className="bg-gray-100 p-4 rounded text-sm overflow-auto">
-              {JSON.stringify(JSON.parse(approval.action_data || '{}'), null, 2)}
+              {JSON.stringify(approval.action_data ?? {}, null, 2)}
             </pre>
           </div>
 
@@ -250,7 +250,10 @@ Type=simple
 User=www-data
 WorkingDirectory=${PROJECT_DIR}/backend
 Environment=PATH=${PROJECT_DIR}/backend/venv/bin
-ExecStart=${PROJECT_DIR}/backend/venv/bin/python main.py
+ExecStart=${PROJECT_DIR}/backend/venv/bin/gunicorn -c gunicorn.conf.py main:app
+ExecReload=/bin/kill -HUP \$MAINPID
+KillMode=mixed
+TimeoutStopSec=40
 Restart=always
 RestartSec=3
 
@@ -0,0 +1,52 @@
+"""Task change sequence and tombstones for delta sync
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('change_seq', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_tasks_change_seq'), 'tasks', ['change_seq'], unique=False)
+    op.create_index('ix_tasks_project_change_seq', 'tasks', ['project_id', 'change_seq'], unique=False)
+
+    op.create_table('sync_counters',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    op.create_table('task_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('assigned_to', sa.Integer(), nullable=True),
+    sa.Column('change_seq', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_task_tombstones_change_seq'), 'task_tombstones', ['change_seq'], unique=False)
+
+    # Существующие задачи получают номера по порядку ID
+    op.execute('UPDATE tasks SET change_seq = id')
+    op.execute("INSERT INTO sync_counters (name, value) SELECT 'tasks', COALESCE(MAX(id), 0) FROM tasks")
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_task_tombstones_change_seq'), table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.drop_table('sync_counters')
+    op.drop_index('ix_tasks_project_change_seq', table_name='tasks')
+    op.drop_index(op.f('ix_tasks_change_seq'), table_name='tasks')
+    op.drop_column('tasks', 'change_seq')
@@ -0,0 +1,50 @@
+"""AI job queue
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.Enum('AUDIO', 'TEXT', name='aijobkind'), nullable=False),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='aijobstatus'), nullable=False),
+    sa.Column('input_hash', sa.String(length=64), nullable=False),
+    sa.Column('input_text', sa.Text(), nullable=True),
+    sa.Column('input_path', sa.String(), nullable=True),
+    sa.Column('input_projects', sa.Text(), nullable=True),
+    sa.Column('notify', sa.Boolean(), nullable=False),
+    sa.Column('model_output', sa.Text(), nullable=True),
+    sa.Column('result', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('task_id', sa.Integer(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ai_jobs_user_input_hash', 'ai_jobs', ['user_id', 'input_hash'], unique=False)
+    op.create_index('ix_ai_jobs_status', 'ai_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ai_jobs_status', table_name='ai_jobs')
+    op.drop_index('ix_ai_jobs_user_input_hash', table_name='ai_jobs')
+    op.drop_table('ai_jobs')
+    op.execute('DROP TYPE IF EXISTS aijobstatus')
+    op.execute('DROP TYPE IF EXISTS aijobkind')
@@ -0,0 +1,31 @@
+"""Deadline reminders: reminder_sent_at and partial deadline index
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+OPEN_DEADLINE_CONDITION = "status != 'DONE' AND deadline IS NOT NULL"
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('reminder_sent_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_tasks_open_deadline', 'tasks', ['deadline'], unique=False,
+        sqlite_where=sa.text(OPEN_DEADLINE_CONDITION),
+        postgresql_where=sa.text(OPEN_DEADLINE_CONDITION),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_open_deadline', table_name='tasks')
+    op.drop_column('tasks', 'reminder_sent_at')
@@ -0,0 +1,51 @@
+"""Approval requests table
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Таблица создавалась через create_all до появления этой миграции
+    if sa.inspect(op.get_bind()).has_table('approval_requests'):
+        return
+
+    op.create_table('approval_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('requester_id', sa.Integer(), nullable=False),
+    sa.Column('approver_id', sa.Integer(), nullable=False),
+    sa.Column('action_type', sa.Enum(
+        'CREATE_TASK', 'UPDATE_TASK', 'DELETE_TASK', 'CREATE_PROJECT', 'UPDATE_PROJECT', 'DELETE_PROJECT',
+        'ADD_USER_TO_PROJECT', 'REMOVE_USER_FROM_PROJECT', name='actiontype'
+    ), nullable=False),
+    sa.Column('entity_type', sa.String(length=50), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('action_data', sa.Text(), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'APPROVED', 'REJECTED', name='approvalstatus'), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('reviewed_at', sa.DateTime(), nullable=True),
+    sa.Column('review_comment', sa.Text(), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['approver_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['requester_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_approval_requests_id'), 'approval_requests', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    # Таблица могла существовать до этой миграции (create_all), и отличить это
+    # при откате нельзя: на ревизии 004 приложение тоже работает с approval_requests.
+    # Поэтому откат ничего не удаляет, а upgrade() при повторном применении ее пропускает.
+    pass
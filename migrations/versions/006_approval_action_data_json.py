@@ -0,0 +1,82 @@
+"""Approval action_data as JSON/JSONB with expression indexes
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+# Выражения совпадают с тем, что SQLAlchemy строит для action_field(...) в app/models/approval.py
+INDEX_EXPRESSIONS = {
+    'postgresql': {
+        'ix_approval_requests_action_project': "(CAST(action_data ->> 'project_id' AS INTEGER))",
+        'ix_approval_requests_action_title': "(CAST(action_data ->> 'title' AS VARCHAR))",
+    },
+    'sqlite': {
+        'ix_approval_requests_action_project': "JSON_EXTRACT(action_data, '$.\"project_id\"')",
+        'ix_approval_requests_action_title': "JSON_EXTRACT(action_data, '$.\"title\"')",
+    },
+}
+
+
+def _normalize_rows(bind) -> None:
+    """Строки, которые не разбираются как JSON объект, сохраняем как {"text": ...}, пустые - NULL"""
+    approvals = sa.table('approval_requests', sa.column('id', sa.Integer), sa.column('action_data', sa.Text))
+    rows = bind.execute(
+        sa.select(approvals.c.id, approvals.c.action_data).where(approvals.c.action_data.isnot(None))
+    ).all()
+    for approval_id, value in rows:
+        if not value.strip():
+            fixed = None
+        else:
+            try:
+                if isinstance(json.loads(value), dict):
+                    continue
+            except ValueError:
+                pass
+            fixed = json.dumps({'text': value}, ensure_ascii=False)
+        bind.execute(approvals.update().where(approvals.c.id == approval_id).values(action_data=fixed))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    _normalize_rows(bind)
+
+    if bind.dialect.name == 'postgresql':
+        op.alter_column(
+            'approval_requests', 'action_data', type_=postgresql.JSONB(),
+            postgresql_using='action_data::jsonb'
+        )
+    else:
+        # SQLite хранит JSON текстом - данные не меняются, только тип колонки
+        with op.batch_alter_table('approval_requests') as batch_op:
+            batch_op.alter_column('action_data', type_=sa.JSON(), existing_type=sa.Text())
+
+    for name, expression in INDEX_EXPRESSIONS.get(bind.dialect.name, {}).items():
+        op.create_index(name, 'approval_requests', [sa.text(expression)], unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for name in INDEX_EXPRESSIONS.get(bind.dialect.name, {}):
+        op.drop_index(name, table_name='approval_requests')
+
+    if bind.dialect.name == 'postgresql':
+        op.alter_column(
+            'approval_requests', 'action_data', type_=sa.Text(),
+            postgresql_using='action_data::text'
+        )
+    else:
+        with op.batch_alter_table('approval_requests') as batch_op:
+            batch_op.alter_column('action_data', type_=sa.Text(), existing_type=sa.JSON())
@@ -0,0 +1,110 @@
+"""Task archive tables and index of done tasks
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+DONE_CONDITION = "status = 'DONE'"
+
+TASK_STATUSES = ('TODO', 'IN_PROGRESS', 'IN_REVIEW', 'DONE')
+TASK_PRIORITIES = ('LOW', 'MEDIUM', 'HIGH', 'URGENT')
+
+
+def _enum(values, name):
+    # Типы taskstatus/taskpriority в PostgreSQL уже созданы таблицей tasks
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), 'postgresql'
+    )
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_tasks_done_at', 'tasks', [sa.text('coalesce(updated_at, created_at)')], unique=False,
+        sqlite_where=sa.text(DONE_CONDITION),
+        postgresql_where=sa.text(DONE_CONDITION),
+    )
+
+    op.create_table('archived_tasks',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', _enum(TASK_STATUSES, 'taskstatus'), nullable=False),
+    sa.Column('priority', _enum(TASK_PRIORITIES, 'taskpriority'), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('assigned_to', sa.Integer(), nullable=True),
+    sa.Column('deadline', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('reminder_sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('change_seq', sa.Integer(), nullable=True),
+    sa.Column('photo_url', sa.String(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archived_tasks_project_id', 'archived_tasks', ['project_id'], unique=False)
+    op.create_index('ix_archived_tasks_created_by', 'archived_tasks', ['created_by'], unique=False)
+    op.create_index('ix_archived_tasks_assigned_to', 'archived_tasks', ['assigned_to'], unique=False)
+
+    op.create_table('archived_task_comments',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archived_task_comments_task_id'), 'archived_task_comments', ['task_id'], unique=False)
+
+    op.create_table('archived_task_attachments',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('filename', sa.String(), nullable=False),
+    sa.Column('file_path', sa.String(), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=False),
+    sa.Column('mime_type', sa.String(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('uploaded_by', sa.Integer(), nullable=False),
+    sa.Column('uploaded_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archived_task_attachments_task_id'), 'archived_task_attachments', ['task_id'], unique=False)
+
+
+def downgrade() -> None:
+    # Архивные задачи возвращаются в рабочие таблицы, иначе они пропадут вместе с архивом
+    op.execute(
+        'INSERT INTO tasks (id, title, description, status, priority, project_id, created_by, assigned_to, '
+        'deadline, reminder_sent_at, created_at, updated_at, change_seq, photo_url) '
+        'SELECT id, title, description, status, priority, project_id, created_by, assigned_to, '
+        'deadline, reminder_sent_at, created_at, updated_at, change_seq, photo_url FROM archived_tasks'
+    )
+    op.execute(
+        'INSERT INTO task_comments (id, content, task_id, author_id, created_at) '
+        'SELECT id, content, task_id, author_id, created_at FROM archived_task_comments'
+    )
+    op.execute(
+        'INSERT INTO task_attachments (id, filename, file_path, file_size, mime_type, task_id, uploaded_by, uploaded_at) '
+        'SELECT id, filename, file_path, file_size, mime_type, task_id, uploaded_by, uploaded_at '
+        'FROM archived_task_attachments'
+    )
+
+    op.drop_index(op.f('ix_archived_task_attachments_task_id'), table_name='archived_task_attachments')
+    op.drop_table('archived_task_attachments')
+    op.drop_index(op.f('ix_archived_task_comments_task_id'), table_name='archived_task_comments')
+    op.drop_table('archived_task_comments')
+    op.drop_index('ix_archived_tasks_assigned_to', table_name='archived_tasks')
+    op.drop_index('ix_archived_tasks_created_by', table_name='archived_tasks')
+    op.drop_index('ix_archived_tasks_project_id', table_name='archived_tasks')
+    op.drop_table('archived_tasks')
+    op.drop_index('ix_tasks_done_at', table_name='tasks')
@@ -0,0 +1,39 @@
+"""Project shard map and global ID sequences
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('project_shards',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.String(length=48), nullable=False),
+    sa.Column('assigned_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+    op.create_index(op.f('ix_project_shards_shard'), 'project_shards', ['shard'], unique=False)
+
+    op.create_table('global_sequences',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    # Данные шардов не возвращаются: перед откатом проекты переносятся обратно (split_shards.py --merge)
+    op.drop_table('global_sequences')
+    op.drop_index(op.f('ix_project_shards_shard'), table_name='project_shards')
+    op.drop_table('project_shards')